@@ -0,0 +1,89 @@
+"""Concurrent writers sharing one score file and one profile file.
+
+Each of ``--writers`` processes records ``--records`` scores through its own
+:class:`ScoreManager` and :class:`ProfileManager`; afterwards every record must
+be present. Run from the repository root::
+
+    python -m benchmarks.bench_concurrency --writers 4 --records 200 --min-throughput 500
+
+The exit status is non-zero if an update was lost or the combined throughput
+(records per second across all writers) is below ``--min-throughput``.
+"""
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from src.profile import ProfileManager
+from src.score import ScoreManager
+
+
+def _writer(directory: str, worker: int, records: int) -> None:
+    scores = ScoreManager(Path(directory) / "scores.json", compact_every=50)
+    scores.load()
+    profiles = ProfileManager(Path(directory) / "profiles.json")
+    profiles.load()
+    for i in range(records):
+        score = 1 + (worker * records + i) % 30
+        scores.record(score)
+        profiles.record_score(f"player{worker}", score)
+    scores.wait_for_compaction()
+
+
+def run(writers: int, records: int) -> dict:
+    """Run the writers and return totals, elapsed time and lost updates."""
+    with tempfile.TemporaryDirectory() as tmp:
+        procs = [
+            multiprocessing.Process(target=_writer, args=(tmp, w, records))
+            for w in range(writers)
+        ]
+        start = time.perf_counter()
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join()
+        elapsed = time.perf_counter() - start
+
+        scores = ScoreManager(Path(tmp) / "scores.json")
+        scores.load()
+        profiles = ProfileManager(Path(tmp) / "profiles.json")
+        profiles.load()
+        expected = writers * records
+        profile_count = sum(p.history.count for p in profiles.profiles.values())
+    return {
+        "writers": writers,
+        "records": expected,
+        "elapsed_s": elapsed,
+        "throughput": expected / elapsed,
+        "lost_scores": expected - scores.history.count,
+        "lost_profile_scores": expected - profile_count,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent score/profile writer benchmark")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--records", type=int, default=200, help="records per writer")
+    parser.add_argument("--min-throughput", type=float, default=0.0,
+                        help="fail below this many records per second")
+    args = parser.parse_args(argv)
+    result = run(args.writers, args.records)
+    print(
+        f"{result['writers']} writers, {result['records']} records in "
+        f"{result['elapsed_s']:.3f}s ({result['throughput']:.0f} records/s); "
+        f"lost {result['lost_scores']} scores, {result['lost_profile_scores']} profile scores"
+    )
+    if result["lost_scores"] or result["lost_profile_scores"]:
+        return 1
+    if result["throughput"] < args.min_throughput:
+        print(f"throughput below target of {args.min_throughput:.0f} records/s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
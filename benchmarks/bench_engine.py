@@ -0,0 +1,45 @@
+"""Games per second through the headless :class:`~src.engine.GameSession`.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_engine --games 200000 --levels 5
+"""
+
+import argparse
+import random
+import time
+from typing import List, Optional
+
+from src.engine import GameSession, perfect_bot, random_bot
+
+
+def run(games: int, levels: int, seeded: bool = False, accuracy: Optional[float] = None) -> float:
+    """Play ``games`` games on one reused session; returns games per second."""
+    game = GameSession(levels=levels, seed=1 if seeded else None)
+    rng = random.Random(0)
+    start = time.perf_counter()
+    for _ in range(games):
+        game.reset()
+        if accuracy is None:
+            perfect_bot(game)
+        else:
+            random_bot(game, accuracy, rng)
+    return games / (time.perf_counter() - start)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Headless game engine throughput")
+    parser.add_argument("--games", type=int, default=200000)
+    parser.add_argument("--levels", type=int, default=5)
+    args = parser.parse_args(argv)
+    for label, seeded, accuracy in (
+        ("perfect, random notes", False, None),
+        ("perfect, seeded notes", True, None),
+        ("80% accurate, random notes", False, 0.8),
+    ):
+        rate = run(args.games, args.levels, seeded, accuracy)
+        print(f"{label:<28}{rate:>14,.0f} games/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Compare JSON and binary profile storage.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_formats --profiles 10000 --history 200
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from src.profile import ProfileManager
+
+
+def _best_of(repeat: int, func: Callable[[], None]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _populate(manager: ProfileManager, count: int, history: int, seed: int) -> None:
+    rng = random.Random(seed)
+    for i in range(count):
+        profile = manager.get_profile(f"player{i}")
+        profile.history.extend(rng.randrange(1, 30) for _ in range(history))
+        profile.high_score = profile.history.best
+        profile.settings.update({"difficulty": "easy", "tempo": 0.5, "step": 1})
+    manager.rebuild_leaderboard()
+
+
+def run(count: int, history: int, repeat: int = 3, seed: int = 0) -> List[dict]:
+    """Time save and load for each format; returns one result row per format."""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for file_format, name in (("json", "profiles.json"), ("binary", "profiles.bin")):
+            path = Path(tmp) / name
+            manager = ProfileManager(path, history_limit=history, file_format=file_format)
+            _populate(manager, count, history, seed)
+            save = _best_of(repeat, manager.save)
+
+            def load() -> None:
+                ProfileManager(path, history_limit=history).load()
+
+            results.append(
+                {
+                    "format": file_format,
+                    "profiles": count,
+                    "history": history,
+                    "bytes": path.stat().st_size,
+                    "save_s": save,
+                    "load_s": _best_of(repeat, load),
+                }
+            )
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="JSON vs binary profile storage benchmark")
+    parser.add_argument("--profiles", type=int, default=10000)
+    parser.add_argument("--history", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+    print(f"{'format':<8}{'bytes':>14}{'save s':>10}{'load s':>10}")
+    for row in run(args.profiles, args.history, args.repeat):
+        print(f"{row['format']:<8}{row['bytes']:>14}{row['save_s']:>10.3f}{row['load_s']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
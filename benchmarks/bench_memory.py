@@ -0,0 +1,99 @@
+"""Memory footprint of :class:`musical_memory.MusicalMemory` against a list of str.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_memory --notes 1000000 --instances 10000
+
+Two shapes are measured with :mod:`tracemalloc`: one long sequence of
+``--notes`` notes, and ``--instances`` memories of ``--notes-each`` notes.
+The baseline is the previous storage, one ``list`` of note strings per
+instance. Single-letter note names are shared string objects in CPython, so
+the list pays one 8-byte reference per note; longer or parsed names would
+also cost a string object per note. The time of ``recall()`` (a copy) and of
+reading a ``recall_view()`` is reported for the long sequence.
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+from typing import Callable, List, Optional
+
+from musical_memory import MusicalMemory
+
+NOTES = ("C", "D", "E", "F", "G", "A", "B")
+
+
+def _notes(count: int, rng: random.Random) -> List[str]:
+    return [rng.choice(NOTES) for _ in range(count)]
+
+
+def _allocated(build: Callable[[], object]) -> int:
+    """Bytes still allocated by whatever ``build`` returns."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def _as_list(notes: List[str]) -> List[str]:
+    stored: List[str] = []
+    for note in notes:
+        stored.append(note)
+    return stored
+
+
+def _as_memory(notes: List[str]) -> MusicalMemory:
+    memory = MusicalMemory()
+    memory.extend(notes)
+    return memory
+
+
+def _report(label: str, count: int, as_list: int, as_memory: int) -> None:
+    print(
+        f"{label:<28}list {as_list / count:7.2f} B/note   "
+        f"MusicalMemory {as_memory / count:6.2f} B/note   ({as_list / as_memory:.1f}x smaller)"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Note storage memory footprint")
+    parser.add_argument("--notes", type=int, default=1_000_000)
+    parser.add_argument("--instances", type=int, default=10_000)
+    parser.add_argument("--notes-each", type=int, default=20)
+    args = parser.parse_args(argv)
+    rng = random.Random(0)
+    MusicalMemory().extend(NOTES)  # intern the alphabet outside the measurement
+
+    notes = _notes(args.notes, rng)
+    _report(
+        f"1 x {args.notes} notes",
+        args.notes,
+        _allocated(lambda: _as_list(notes)),
+        _allocated(lambda: _as_memory(notes)),
+    )
+    groups = [_notes(args.notes_each, rng) for _ in range(args.instances)]
+    total = args.instances * args.notes_each
+    _report(
+        f"{args.instances} x {args.notes_each} notes",
+        total,
+        _allocated(lambda: [_as_list(group) for group in groups]),
+        _allocated(lambda: [_as_memory(group) for group in groups]),
+    )
+
+    memory = _as_memory(notes)
+    start = time.perf_counter()
+    memory.recall()
+    copied = time.perf_counter() - start
+    start = time.perf_counter()
+    view = memory.recall_view()
+    view[len(view) // 2]
+    viewed = time.perf_counter() - start
+    print(f"recall() {copied * 1e3:.2f} ms, recall_view() + one read {viewed * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Startup import time of ``python -m src.main`` against a budget.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_startup --help-budget 75 --cli-budget 75
+
+Each path runs in a fresh interpreter under ``-X importtime``. The time
+counted is the sum of the self times of every module the path imports
+beyond a bare ``python -c pass``, so interpreter start-up is excluded.
+The best of ``--repeat`` runs is compared with the budget (in ms).
+
+* ``help`` is ``python -m src.main --help``.
+* ``cli`` imports everything the CLI mode loads before its first prompt
+  when ``--audio`` is off.
+
+Neither path may import an optional or mode-specific dependency
+(:data:`FORBIDDEN`). The exit status is 1 when a path is over budget or
+imports one of them.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional, Set, Tuple
+
+PATHS: Dict[str, List[str]] = {
+    "help": ["-m", "src.main", "--help"],
+    "cli": ["-c", "import src.main, src.cli; src.cli.parse_args(['--levels', '1'])"],
+}
+# Only --audio, --mode web/gui and the SQLite backend need these.
+FORBIDDEN = ("numpy", "simpleaudio", "colorama", "asyncio", "sqlite3", "tkinter")
+
+
+def _importtime(args: List[str]) -> Dict[str, int]:
+    """Run ``python -X importtime *args``; returns ``{module: self microseconds}``."""
+    env = dict(os.environ)
+    # Measure with bytecode caches, as an installed copy would run.
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        env=env,
+        text=True,
+        check=True,
+    )
+    modules: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(self_us)
+    return modules
+
+
+def measure(args: List[str], baseline: Set[str], repeat: int) -> Tuple[float, List[str]]:
+    """Return the best import time in ms and the forbidden modules imported."""
+    _importtime(args)  # warm the bytecode cache
+    best = float("inf")
+    for _ in range(repeat):
+        modules = _importtime(args)
+        best = min(best, sum(us for name, us in modules.items() if name not in baseline) / 1000)
+    forbidden = sorted({name.split(".")[0] for name in modules} & set(FORBIDDEN) - baseline)
+    return best, forbidden
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Startup import-time budget")
+    parser.add_argument("--help-budget", type=float, default=75.0, help="ms for --help")
+    parser.add_argument("--cli-budget", type=float, default=75.0, help="ms for the CLI path")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    baseline = set(_importtime(["-c", "pass"]))
+    budgets = {"help": args.help_budget, "cli": args.cli_budget}
+    failed = False
+    for label, path in PATHS.items():
+        ms, forbidden = measure(path, baseline, args.repeat)
+        over = ms > budgets[label]
+        print(f"{label:<6}{ms:>8.1f} ms  (budget {budgets[label]:.0f} ms){'  OVER' if over else ''}")
+        if forbidden:
+            print(f"      imports {', '.join(forbidden)}")
+        failed |= over or bool(forbidden)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""Benchmark suite for the game, score and profile hot paths.
+
+Run from the repository root::
+
+    python -m benchmarks.run --save results.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.25
+
+Each benchmark reports the best wall time of ``--repeat`` runs. Results are
+written as JSON. Given a baseline file, any benchmark slower than
+``baseline * (1 + threshold)`` is reported and the exit status is 1.
+Sub-millisecond baselines (``--min-seconds``) are not gated because they
+are mostly timer noise.
+Benchmarks that are missing on either side (for example because numpy is
+not installed) are skipped in the comparison.
+
+Profile benchmarks run at every size in ``--profiles`` (default
+``1000,10000``; add ``100000,1000000`` for the full range). The numbers are
+only comparable between runs on the same machine.
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from src import game
+from src.history import ScoreHistory
+from src.profile import ProfileManager
+from src.score import ScoreManager
+
+Benchmark = Tuple[str, Callable[[], None]]
+
+
+def _best_of(repeat: int, func: Callable[[], None]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def sequence_benchmarks(length: int) -> Iterator[Benchmark]:
+    random.seed(0)
+    expected = game.generate_sequence(length)
+    actual = list(expected)
+    # Differ only at the end, the worst case for a comparison.
+    actual[-1] = "X"
+    yield f"generate_sequence[{length}]", lambda: game.generate_sequence(length)
+    yield f"check_sequence[{length}]", lambda: game.check_sequence(expected, actual)
+
+
+class _StubPlayback:
+    def wait_done(self) -> None:
+        pass
+
+
+class _StubAudio:
+    """Stands in for simpleaudio so synthesis is timed without a sound device."""
+
+    @staticmethod
+    def play_buffer(audio, channels, width, rate) -> _StubPlayback:
+        return _StubPlayback()
+
+
+def tone_benchmarks() -> Iterator[Benchmark]:
+    if game.np is None:
+        return
+    frequencies = [game._freq_of(note) for note in game.DIFFICULTY_NOTES["hard"]]
+
+    def play(cold: bool) -> Callable[[], None]:
+        def run() -> None:
+            saved = game.sa
+            game.sa = _StubAudio
+            try:
+                if cold:
+                    game.TONE_CACHE.clear()
+                for frequency in frequencies:
+                    game._play_tone(frequency)
+            finally:
+                game.sa = saved
+
+        return run
+
+    yield f"play_tone_cold[{len(frequencies)}]", play(True)
+    yield f"play_tone_cached[{len(frequencies)}]", play(False)
+    sequence = game.DIFFICULTY_NOTES["hard"] * 16
+    yield f"render_sequence[{len(sequence)}]", lambda: game.render_sequence(sequence, gap=0.1)
+
+
+def score_benchmarks(tmp: Path, history: int, records: int = 1000) -> Iterator[Benchmark]:
+    rng = random.Random(0)
+    scores = [rng.randrange(1, 30) for _ in range(history)]
+
+    def record() -> None:
+        path = tmp / "scores.json"
+        for suffix in ("", ".log"):
+            Path(str(path) + suffix).unlink(missing_ok=True)
+        manager = ScoreManager(
+            path, history=ScoreHistory(scores, history), history_limit=history, compact_every=None
+        )
+        for i in range(records):
+            manager.record(i % 30)
+
+    def compact() -> None:
+        manager = ScoreManager(
+            tmp / "compact.json", history=ScoreHistory(scores, history), history_limit=history
+        )
+        manager.compact()
+
+    yield f"score_record[{history}x{records}]", record
+    yield f"score_compact[{history}]", compact
+
+
+def profile_benchmarks(tmp: Path, count: int, history: int = 20) -> Iterator[Benchmark]:
+    rng = random.Random(0)
+    path = tmp / f"profiles-{count}.json"
+    dump = tmp / f"dump-{count}.jsonl"
+    source = ProfileManager(path, history_limit=history)
+    for i in range(count):
+        profile = source.get_profile(f"player{i}")
+        profile.history.extend(rng.randrange(1, 30) for _ in range(history))
+        profile.high_score = profile.history.best
+    source.rebuild_leaderboard()
+    source.save()
+    source.export_data(dump)
+    loaded = ProfileManager(path, history_limit=history)
+    loaded.load()
+
+    def load() -> None:
+        ProfileManager(path, history_limit=history).load()
+
+    def import_data() -> None:
+        ProfileManager(tmp / "import.json", history_limit=history).import_data(dump)
+
+    yield f"profile_save[{count}]", source.save
+    yield f"profile_load[{count}]", load
+    yield f"profile_leaderboard_rebuild[{count}]", loaded.rebuild_leaderboard
+    yield f"profile_leaderboard_top10[{count}]", lambda: loaded.top(10)
+    yield f"profile_import[{count}]", import_data
+
+
+def run(
+    profile_sizes: List[int], history: int = 100_000, length: int = 1_000_000, repeat: int = 3
+) -> Dict[str, float]:
+    """Run every benchmark; returns ``{name: best seconds}``."""
+    results: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        groups = [sequence_benchmarks(length), tone_benchmarks(), score_benchmarks(Path(tmp), history)]
+        groups += [profile_benchmarks(Path(tmp), count) for count in profile_sizes]
+        for group in groups:
+            for name, func in group:
+                results[name] = _best_of(repeat, func)
+                print(f"{name:<40}{results[name]:>12.6f}s", file=sys.stderr)
+    return results
+
+
+def compare(
+    results: Dict[str, float],
+    baseline: Dict[str, float],
+    threshold: float,
+    min_seconds: float = 0.0,
+) -> List[Tuple[str, float, float]]:
+    """Return ``(name, baseline, current)`` for every regression beyond ``threshold``.
+
+    Benchmarks whose baseline is under ``min_seconds`` are too noisy to
+    gate on and are ignored.
+    """
+    return [
+        (name, baseline[name], seconds)
+        for name, seconds in results.items()
+        if name in baseline
+        and baseline[name] >= min_seconds
+        and seconds > baseline[name] * (1 + threshold)
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Musical Memory benchmark suite")
+    parser.add_argument("--profiles", default="1000,10000", help="comma-separated profile counts")
+    parser.add_argument("--history", type=int, default=100_000, help="score history entries")
+    parser.add_argument("--length", type=int, default=1_000_000, help="sequence length")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="compare against this results JSON")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown as a fraction of the baseline")
+    parser.add_argument("--min-seconds", type=float, default=0.001,
+                        help="ignore benchmarks whose baseline is faster than this")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.profiles.split(",") if size]
+    results = run(sizes, args.history, args.length, args.repeat)
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    if args.save:
+        args.save.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        regressions = compare(results, baseline, args.threshold, args.min_seconds)
+        for name, before, after in regressions:
+            print(f"REGRESSION {name}: {before:.6f}s -> {after:.6f}s ({after / before - 1:+.0%})")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,3 @@
-from .core import MusicalMemory
+from .core import MusicalMemory, NoteView
 
-__all__ = ["MusicalMemory"]
+__all__ = ["MusicalMemory", "NoteView"]
@@ -1,34 +1,170 @@
-"""Simple module for managing a sequence of musical notes."""
+"""Simple module for managing a sequence of musical notes.
 
-from typing import List
+Notes are stored as one-byte codes into an alphabet of note names shared by
+every :class:`MusicalMemory` in the process, so a stored note costs one byte
+instead of a reference to a string object. The alphabet holds at most 65536
+names; a memory given a name beyond that keeps its notes as plain strings.
+"""
+
+import threading
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Union, overload
+
+# Interned note names; a note's code is its index here. Grows as new names
+# appear and never shrinks, so codes stay valid for every instance.
+_ALPHABET: List[str] = []
+_CODES: Dict[str, int] = {}
+_ALPHABET_LOCK = threading.Lock()
+# Codes above this need two bytes per note.
+_BYTE_CODES = 256
+_MAX_CODES = 65536
+
+
+def _code(note: str) -> Optional[int]:
+    """Return the code for ``note``, adding it to the alphabet if needed.
+
+    Returns ``None`` if ``note`` is new and the alphabet is full.
+    """
+    if not isinstance(note, str) or not note:
+        raise ValueError("note must be a non-empty string")
+    code = _CODES.get(note)
+    if code is not None:
+        return code
+    with _ALPHABET_LOCK:
+        code = _CODES.get(note)
+        if code is None:
+            if len(_ALPHABET) >= _MAX_CODES:
+                return None
+            code = len(_ALPHABET)
+            _ALPHABET.append(note)
+            _CODES[note] = code
+        return code
 
 
 class MusicalMemory:
     """Store and recall a sequence of musical notes.
 
-    Notes are represented as strings.
+    Notes are represented as strings and stored as codes in an
+    ``array('B')``. The array switches to two-byte codes only if the process
+    has seen more than 256 distinct note names, and to a list of strings if
+    a note is added after the shared alphabet filled up with 65536 names.
     """
 
+    __slots__ = ("_codes",)
+
     def __init__(self) -> None:
-        self._sequence: List[str] = []
+        self._codes = array("B")
+
+    def __len__(self) -> int:
+        return len(self._codes)
 
     def add_note(self, note: str) -> None:
         """Add a note to the memory.
 
+        Any number of distinct names is accepted. Past the 65536 names the
+        shared alphabet can hold, this memory stores its notes as strings.
+
         Args:
             note: A non-empty string representing a musical note.
 
         Raises:
             ValueError: If ``note`` is not a non-empty string.
         """
-        if not isinstance(note, str) or not note:
-            raise ValueError("note must be a non-empty string")
-        self._sequence.append(note)
+        code = _code(note)
+        if code is None or type(self._codes) is list:
+            self._spill()
+            self._codes.append(note)
+            return
+        if code >= _BYTE_CODES and self._codes.typecode == "B":
+            self._widen()
+        self._codes.append(code)
+
+    def extend(self, notes: Iterable[str]) -> None:
+        """Add several notes at once.
+
+        Args:
+            notes: Non-empty strings representing musical notes.
+
+        Raises:
+            ValueError: If any note is not a non-empty string. No note is
+                added in that case.
+        """
+        notes = list(notes)
+        codes = [_code(note) for note in notes]
+        if type(self._codes) is list or None in codes:
+            self._spill()
+            self._codes.extend(notes)
+            return
+        if codes and max(codes) >= _BYTE_CODES and self._codes.typecode == "B":
+            self._widen()
+        self._codes.extend(codes)
+
+    def _widen(self) -> None:
+        self._codes = array("H", self._codes)
+
+    def _spill(self) -> None:
+        """Switch to storing note strings once the alphabet cannot grow."""
+        if type(self._codes) is not list:
+            self._codes = list(map(_ALPHABET.__getitem__, self._codes))
 
     def recall(self) -> List[str]:
         """Return a copy of the stored sequence."""
-        return list(self._sequence)
+        if type(self._codes) is list:
+            return list(self._codes)
+        return list(map(_ALPHABET.__getitem__, self._codes))
+
+    def recall_view(self) -> "NoteView":
+        """Return a read-only view of the stored sequence without copying it.
+
+        The view decodes notes as they are read and reflects later changes
+        to this memory.
+        """
+        return NoteView(self)
 
     def clear(self) -> None:
         """Clear the stored sequence."""
-        self._sequence.clear()
+        del self._codes[:]
+
+
+class NoteView(Sequence):
+    """Read-only sequence of the notes in a :class:`MusicalMemory`."""
+
+    __slots__ = ("_memory",)
+
+    def __init__(self, memory: MusicalMemory) -> None:
+        self._memory = memory
+
+    def __len__(self) -> int:
+        return len(self._memory._codes)
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[str]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        codes = self._memory._codes[index]
+        if type(codes) is list or type(codes) is str:
+            return codes
+        if isinstance(index, slice):
+            return list(map(_ALPHABET.__getitem__, codes))
+        return _ALPHABET[codes]
+
+    def __iter__(self) -> Iterator[str]:
+        codes = self._memory._codes
+        if type(codes) is list:
+            return iter(codes)
+        return map(_ALPHABET.__getitem__, codes)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, NoteView) and type(self._memory._codes) is type(other._memory._codes):
+            return self._memory._codes == other._memory._codes
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"NoteView({list(self)!r})"
@@ -6,9 +6,12 @@ that they can be easily imported for use in applications or tests.
 
 from .game import (
     NOTES,
+    SequenceVerifier,
     check_sequence,
     generate_level_sequence,
     generate_sequence,
+    generate_sequences_batch,
+    sequence_from_seed,
     sequence_length,
 )
 
@@ -16,6 +19,9 @@ __all__ = [
     "NOTES",
     "generate_sequence",
     "check_sequence",
+    "SequenceVerifier",
     "sequence_length",
     "generate_level_sequence",
+    "sequence_from_seed",
+    "generate_sequences_batch",
 ]
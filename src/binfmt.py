@@ -0,0 +1,237 @@
+"""Compact binary storage format for profiles and scores.
+
+Both :class:`~src.profile.ProfileManager` and :class:`~src.score.ScoreManager`
+can store their data in this format instead of JSON. It is selected per file
+with ``file_format="binary"`` (or a ``.bin`` suffix) and detected from the
+magic bytes on load.
+
+Layout (little endian)::
+
+    header   magic "MMBF", version u16, kind u8 (1 profiles, 2 scores),
+             reserved u8, record count u32
+    profile  name length u16, UTF-8 name,
+             high score u32, stats, settings length u32, settings JSON,
+             history
+    scores   high score u32, log seq u64, stats, history
+    stats    count u64, total u64, best u16, bin count u16,
+             bins x (score u16, games u64)
+    history  score count u32, padding to an even offset,
+             scores as raw u16 values
+
+Histories are stored as raw arrays so :func:`iter_profile_records` can hand
+them out as ``memoryview`` slices of the input buffer without copying.
+
+Files can be converted with::
+
+    python -m src.binfmt to-binary src/profiles.json src/profiles.bin
+    python -m src.binfmt to-json src/profiles.bin src/profiles.json
+"""
+
+import argparse
+import json
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .history import ScoreHistory
+
+MAGIC = b"MMBF"
+VERSION = 1
+KIND_PROFILES = 1
+KIND_SCORES = 2
+# File suffixes that select the binary format for new files.
+BINARY_SUFFIXES = (".bin",)
+
+_HEADER = struct.Struct("<4sHBBI")
+_NAME = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_SCORES = struct.Struct("<IQ")
+_STATS = struct.Struct("<QQHH")
+_BIN = struct.Struct("<HQ")
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class ProfileRecord(NamedTuple):
+    """One decoded profile; ``history`` is a zero-copy view of u16 scores."""
+
+    name: str
+    high_score: int
+    stats: Dict[str, Any]
+    settings: Dict[str, Any]
+    history: memoryview
+
+
+def is_binary(path: Path) -> bool:
+    """Return ``True`` if ``path`` exists and starts with the binary magic."""
+    if not path.exists():
+        return False
+    with path.open("rb") as fh:
+        return fh.read(len(MAGIC)) == MAGIC
+
+
+def choose_format(path: Path, file_format: Optional[str]) -> str:
+    """Resolve ``file_format`` for ``path``: explicit, detected, then by suffix."""
+    if file_format is not None:
+        if file_format not in ("json", "binary"):
+            raise ValueError(f"unknown file format: {file_format}")
+        return file_format
+    if path.exists():
+        return "binary" if is_binary(path) else "json"
+    return "binary" if path.suffix in BINARY_SUFFIXES else "json"
+
+
+# -- Encoding ------------------------------------------------------------------
+def _pack_stats(out: bytearray, history: ScoreHistory) -> None:
+    state = history.stats_state()
+    bins = state["histogram"]
+    out += _STATS.pack(state["count"], state["total"], state["best"], len(bins))
+    for score, games in bins.items():
+        out += _BIN.pack(int(score), games)
+
+
+def _pack_history(out: bytearray, history: ScoreHistory) -> None:
+    scores = history.to_array()
+    if sys.byteorder == "big":
+        scores.byteswap()
+    out += _U32.pack(len(scores))
+    if len(out) % 2:
+        out += b"\0"
+    out += scores.tobytes()
+
+
+def encode_profiles(profiles: Iterable[Any]) -> bytes:
+    """Serialise :class:`~src.profile.UserProfile` objects."""
+    out = bytearray(_HEADER.size)
+    count = 0
+    for profile in profiles:
+        name = profile.name.encode("utf-8")
+        settings = json.dumps(profile.settings).encode("utf-8")
+        out += _NAME.pack(len(name)) + name + _U32.pack(profile.high_score)
+        _pack_stats(out, profile.history)
+        out += _U32.pack(len(settings)) + settings
+        _pack_history(out, profile.history)
+        count += 1
+    out[: _HEADER.size] = _HEADER.pack(MAGIC, VERSION, KIND_PROFILES, 0, count)
+    return bytes(out)
+
+
+def encode_scores(high_score: int, seq: int, history: ScoreHistory) -> bytes:
+    """Serialise a :class:`~src.score.ScoreManager` snapshot."""
+    out = bytearray(_HEADER.size)
+    out += _SCORES.pack(high_score, seq)
+    _pack_stats(out, history)
+    _pack_history(out, history)
+    out[: _HEADER.size] = _HEADER.pack(MAGIC, VERSION, KIND_SCORES, 0, 1)
+    return bytes(out)
+
+
+# -- Decoding ------------------------------------------------------------------
+def _read_header(buf: Buffer, kind: int) -> int:
+    magic, version, found_kind, _, count = _HEADER.unpack_from(buf)
+    if magic != MAGIC:
+        raise ValueError("not a Musical Memory binary file")
+    if version != VERSION:
+        raise ValueError(f"unsupported binary format version {version}")
+    if found_kind != kind:
+        raise ValueError(f"expected binary kind {kind}, found {found_kind}")
+    return count
+
+
+def _unpack_stats(buf: Buffer, pos: int) -> Tuple[Dict[str, Any], int]:
+    count, total, best, bins = _STATS.unpack_from(buf, pos)
+    pos += _STATS.size
+    histogram = {}
+    for _ in range(bins):
+        score, games = _BIN.unpack_from(buf, pos)
+        histogram[score] = games
+        pos += _BIN.size
+    return {"count": count, "total": total, "best": best, "histogram": histogram}, pos
+
+
+def _unpack_history(buf: Buffer, pos: int) -> Tuple[memoryview, int]:
+    (length,) = _U32.unpack_from(buf, pos)
+    pos += _U32.size
+    pos += pos % 2
+    end = pos + 2 * length
+    view = memoryview(buf)[pos:end].cast("B").cast("H")
+    if sys.byteorder == "big":
+        swapped = array("H", view)
+        swapped.byteswap()
+        view = memoryview(swapped)
+    return view, end
+
+
+def iter_profile_records(buf: Buffer) -> Iterator[ProfileRecord]:
+    """Decode profiles from ``buf`` without copying their histories."""
+    count = _read_header(buf, KIND_PROFILES)
+    pos = _HEADER.size
+    for _ in range(count):
+        (name_length,) = _NAME.unpack_from(buf, pos)
+        pos += _NAME.size
+        name = bytes(buf[pos:pos + name_length]).decode("utf-8")
+        pos += name_length
+        (high_score,) = _U32.unpack_from(buf, pos)
+        stats, pos = _unpack_stats(buf, pos + _U32.size)
+        (settings_length,) = _U32.unpack_from(buf, pos)
+        pos += _U32.size
+        settings = json.loads(bytes(buf[pos:pos + settings_length]))
+        history, pos = _unpack_history(buf, pos + settings_length)
+        yield ProfileRecord(name, high_score, stats, settings, history)
+
+
+def decode_scores(buf: Buffer) -> Tuple[int, int, Dict[str, Any], memoryview]:
+    """Decode a scores snapshot into ``(high_score, seq, stats, history)``."""
+    _read_header(buf, KIND_SCORES)
+    high_score, seq = _SCORES.unpack_from(buf, _HEADER.size)
+    stats, pos = _unpack_stats(buf, _HEADER.size + _SCORES.size)
+    history, _ = _unpack_history(buf, pos)
+    return high_score, seq, stats, history
+
+
+# -- Conversion ----------------------------------------------------------------
+def _kind_of(path: Path) -> int:
+    if is_binary(path):
+        with path.open("rb") as fh:
+            return _HEADER.unpack(fh.read(_HEADER.size))[2]
+    with path.open("r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    return KIND_PROFILES if "profiles" in data else KIND_SCORES
+
+
+def convert(source: Path, target: Path, file_format: str) -> int:
+    """Rewrite ``source`` as ``target`` in ``file_format``; returns the record count."""
+    from .profile import ProfileManager
+    from .score import ScoreManager
+
+    if _kind_of(source) == KIND_PROFILES:
+        profiles = ProfileManager(source)
+        profiles.load()
+        out = ProfileManager(target, file_format=file_format)
+        out.profiles = profiles.profiles
+        out.save()
+        return len(out.profiles)
+    scores = ScoreManager(source, compact_every=None)
+    scores.load()
+    out_scores = ScoreManager(target, compact_every=None, file_format=file_format)
+    out_scores.high_score, out_scores.history = scores.high_score, scores.history
+    out_scores.save()
+    return 1
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Convert profile and score files between JSON and binary."""
+    parser = argparse.ArgumentParser(description="Convert Musical Memory data files")
+    parser.add_argument("command", choices=["to-binary", "to-json"])
+    parser.add_argument("source", type=Path, help="profiles or scores file to read")
+    parser.add_argument("target", type=Path, help="file to write")
+    args = parser.parse_args(argv)
+    file_format = "binary" if args.command == "to-binary" else "json"
+    count = convert(args.source, args.target, file_format)
+    print(f"Wrote {count} record(s) to {args.target} ({file_format})")
+
+
+if __name__ == "__main__":
+    main()
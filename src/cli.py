@@ -9,34 +9,71 @@ import sys
 from pathlib import Path
 from typing import List
 
+from . import metrics
+from .engine import GAMES_STARTED, GameSession, iter_guess, record_game
 from .score import ScoreManager
 from .profile import ProfileManager
 
+# Number of leaderboard entries shown after each game.
+LEADERBOARD_SIZE = 10
+# File suffixes that select the SQLite profile backend for ``--profiles``.
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
 # Optional colour support ----------------------------------------------------
-try:  # pragma: no cover - optional dependency
-    from colorama import Fore, Style, init as colorama_init
+class Fore:
+    """Colour names for :func:`_colour`, resolved through colorama when used."""
+
+    CYAN = "CYAN"
+    YELLOW = "YELLOW"
+    RED = "RED"
+    GREEN = "GREEN"
+    MAGENTA = "MAGENTA"
+
 
-    colorama_init()
+_colorama = None
 
-    def _colour(text: str, colour: str) -> str:
-        return f"{colour}{text}{Style.RESET_ALL}" if sys.stdout.isatty() else text
 
-except Exception:  # pragma: no cover - colour is optional
-    class _DummyFore:
-        CYAN = YELLOW = RED = GREEN = MAGENTA = ""
+def _load_colorama():
+    """Import and initialise colorama on first use; ``False`` if unavailable."""
+    global _colorama
+    if _colorama is None:
+        try:  # pragma: no cover - optional dependency
+            import colorama
 
-    Fore = _DummyFore()  # type: ignore
+            colorama.init()
+            _colorama = colorama
+        except Exception:  # pragma: no cover - colour is optional
+            _colorama = False
+    return _colorama
 
-    def _colour(text: str, colour: str) -> str:
+
+def _colour(text: str, colour: str) -> str:
+    if not sys.stdout.isatty():
+        return text
+    colorama = _load_colorama()
+    if not colorama:
         return text
+    return f"{getattr(colorama.Fore, colour)}{text}{colorama.Style.RESET_ALL}"
 
 
 # Support running as module or script ----------------------------------------
 try:  # pragma: no cover - import resolution
-    from .game import generate_next_note, play_sequence, check_sequence
+    from .game import (
+        TONE_CACHE,
+        SequenceRenderer,
+        generate_next_note,
+        play_sequence,
+        play_sequence_async,
+    )
 except ImportError:  # pragma: no cover
     sys.path.append(str(Path(__file__).resolve().parent))
-    from game import generate_next_note, play_sequence, check_sequence
+    from game import (  # type: ignore
+        TONE_CACHE,
+        SequenceRenderer,
+        generate_next_note,
+        play_sequence,
+        play_sequence_async,
+    )
 
 
 def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
@@ -73,6 +110,23 @@ def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
         default="player",
         help="profile name for saving progress",
     )
+    parser.add_argument(
+        "--profiles",
+        type=Path,
+        help="profile store to use; .db/.sqlite files use the SQLite backend",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        metavar="N",
+        help="store profiles in N hash-keyed shard files under the --profiles directory",
+    )
+    parser.add_argument(
+        "--write-behind",
+        type=float,
+        metavar="SECONDS",
+        help="flush profile changes on a timer instead of after every game",
+    )
     parser.add_argument(
         "--import-data",
         type=Path,
@@ -81,22 +135,83 @@ def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
     parser.add_argument(
         "--export-data",
         type=Path,
-        help="export profile data to file after playing",
+        help="export profile data to file after playing (.jsonl streams, .gz compresses)",
     )
     parser.add_argument(
         "--audio",
         action="store_true",
         help="play tones using simpleaudio if available",
     )
+    parser.add_argument(
+        "--gapless",
+        action="store_true",
+        help="with --audio, render each sequence into one buffer for exact tempo",
+    )
+    parser.add_argument(
+        "--type-ahead",
+        action="store_true",
+        help="play in the background so the answer can be typed during playback",
+    )
     parser.add_argument(
         "--mode",
         choices=["cli", "gui", "web"],
         default="cli",
         help="choose interaction mode",
     )
+    parser.add_argument("--host", default="127.0.0.1", help="address for --mode web")
+    parser.add_argument("--port", type=int, default=8000, help="port for --mode web")
+    parser.add_argument(
+        "--sessions",
+        type=Path,
+        help="with --mode web, journal game sessions to this file so they survive restarts",
+    )
+    parser.add_argument(
+        "--clip-cache",
+        type=Path,
+        metavar="DIR",
+        help="with --mode web, directory caching rendered audio clips "
+        "(default: ~/.cache/musical-memory/clips)",
+    )
+    parser.add_argument(
+        "--session-ttl",
+        type=float,
+        default=30 * 60,
+        metavar="SECONDS",
+        help="with --mode web, expire games idle for this long",
+    )
+    parser.add_argument(
+        "--metrics-dump",
+        type=Path,
+        metavar="PATH",
+        help="record timing metrics and write them to PATH as JSON on exit",
+    )
     return parser.parse_args(argv)
 
 
+def _open_profiles(
+    path: Path | None, write_behind: float | None = None, shards: int | None = None
+) -> ProfileManager:
+    """Return the profile manager for ``path``, choosing a backend by suffix.
+
+    ``shards`` (or an existing shard directory) selects the sharded backend.
+    """
+    if shards is not None or (path is not None and path.is_dir()):
+        from .profile_shards import DEFAULT_SHARDS, ShardedProfileManager
+
+        options = {"shards": shards or DEFAULT_SHARDS, "write_behind": write_behind}
+        if path is None:
+            return ShardedProfileManager(**options)
+        return ShardedProfileManager(path, **options)
+    if path is not None and path.suffix in SQLITE_SUFFIXES:
+        from .profile_sqlite import SQLiteProfileManager
+
+        return SQLiteProfileManager(path, write_behind=write_behind)
+    # A session only touches one player, so load profiles on demand.
+    if path is None:
+        return ProfileManager(write_behind=write_behind, lazy=True)
+    return ProfileManager(path, write_behind=write_behind, lazy=True)
+
+
 def _run_cli(args: argparse.Namespace) -> None:
     """Run the interactive command-line version of the game."""
 
@@ -104,118 +219,268 @@ def _run_cli(args: argparse.Namespace) -> None:
 
     manager = ScoreManager()
     manager.load()
-    profiles = ProfileManager()
+    profiles = _open_profiles(args.profiles, args.write_behind, args.shards)
     profiles.load()
     if args.import_data:
         profiles.import_data(args.import_data)
+    if args.audio:
+        # Render the whole note pool up front so playback is a buffer lookup.
+        TONE_CACHE.warm_up(args.difficulty)
 
-    while True:
-        sequence: List[int] = []
-        score = 0
-        for level in range(1, args.levels + 1):
-            for _ in range(args.step):
-                sequence.append(generate_next_note(args.difficulty))
-            print(_colour(f"Level {level}. Listen to the sequence:", Fore.YELLOW))
-            play_sequence(sequence, use_audio=args.audio, delay=args.tempo)
-            guess = input("Repeat the sequence separated by spaces: ").strip()
-            try:
-                user_sequence = [int(x) for x in guess.split()]
-            except ValueError:
-                print(
-                    _colour(
-                        f"Invalid input, numbers only. Game over. Provided: {guess}",
-                        Fore.RED,
+    # Reused across games; each game only synthesises the notes it adds.
+    renderer = SequenceRenderer(gap=args.tempo) if args.audio and args.gapless else None
+
+    try:
+        while True:
+            game = GameSession(
+                args.levels, args.step, args.difficulty, note_source=generate_next_note
+            )
+            GAMES_STARTED.inc()
+            while not game.finished:
+                sequence = game.next_level()
+                print(_colour(f"Level {game.level}. Listen to the sequence:", Fore.YELLOW))
+                if args.type_ahead:
+                    playback = play_sequence_async(
+                        sequence,
+                        use_audio=args.audio,
+                        delay=args.tempo,
+                        on_progress=lambda _index, note: print(note),
                     )
-                )
-                break
-            if check_sequence(sequence, user_sequence):
-                print(_colour("Correct!\n", Fore.GREEN))
-                score = level
+                else:
+                    playback = None
+                    play_sequence(
+                        sequence,
+                        use_audio=args.audio,
+                        delay=args.tempo,
+                        gapless=args.gapless,
+                        renderer=renderer,
+                    )
+                guess = input("Repeat the sequence separated by spaces: ").strip()
+                if playback is not None:
+                    # The answer is in; the rest of the replay is no longer needed.
+                    playback.cancel()
+                    playback.wait()
+                # Check note by note; parsing stops at the first wrong note.
+                verifier = game.verifier()
+                try:
+                    verifier.feed_many(iter_guess(guess))
+                except ValueError:
+                    print(
+                        _colour(
+                            f"Invalid input, numbers only. Game over. Provided: {guess}",
+                            Fore.RED,
+                        )
+                    )
+                    game.finish()
+                else:
+                    if game.submit(verifier):
+                        print(_colour("Correct!\n", Fore.GREEN))
+                    else:
+                        expected = " ".join(map(str, sequence))
+                        print(
+                            _colour(f"Wrong sequence. Game over. Expected {expected}", Fore.RED)
+                        )
+            if game.completed:
+                print(_colour("Congratulations! You completed all levels.", Fore.CYAN))
+            score = game.score
+
+            if renderer is not None:
+                renderer.reset()
+            # One profile write for the score and the settings together.
+            is_high = record_game(
+                manager,
+                profiles,
+                args.user,
+                score,
+                {"difficulty": args.difficulty, "tempo": args.tempo, "step": args.step},
+            )
+            if is_high:
+                print(_colour(f"New high score: {manager.high_score}!", Fore.MAGENTA))
             else:
                 print(
                     _colour(
-                        f"Wrong sequence. Game over. Expected {' '.join(map(str, sequence))}",
-                        Fore.RED,
+                        f"Your score: {score}. High score: {manager.high_score}.", Fore.MAGENTA
                     )
                 )
-                break
-        else:
-            print(_colour("Congratulations! You completed all levels.", Fore.CYAN))
-            score = args.levels
 
-        is_high = manager.save_score(score)
-        if is_high:
-            print(_colour(f"New high score: {manager.high_score}!", Fore.MAGENTA))
-        else:
-            print(
-                _colour(
-                    f"Your score: {score}. High score: {manager.high_score}.", Fore.MAGENTA
-                )
-            )
-
-        profiles.record_score(args.user, score)
-        profile = profiles.get_profile(args.user)
-        profile.settings.update(
-            {"difficulty": args.difficulty, "tempo": args.tempo, "step": args.step}
-        )
-        profiles.save()
-        lb = profiles.leaderboard()
-        print(_colour("Leaderboard:", Fore.CYAN))
-        for name, hs in lb:
-            print(f"  {name}: {hs}")
-
-        if args.export_data:
-            profiles.export_data(args.export_data)
+            print(_colour("Leaderboard:", Fore.CYAN))
+            for name, hs in profiles.top(LEADERBOARD_SIZE):
+                print(f"  {name}: {hs}")
+            rank = profiles.rank(args.user)
+            if rank is not None and rank > LEADERBOARD_SIZE:
+                print("  ...")
+                for name, hs in profiles.neighbours(args.user, radius=1):
+                    print(f"  {name}: {hs}")
+
+            if args.export_data:
+                profiles.export_data(args.export_data)
+
+            again = input("Play again? (y/n): ").strip().lower()
+            if again != "y":
+                print(_colour("Thanks for playing!", Fore.CYAN))
+                break
 
-        again = input("Play again? (y/n): ").strip().lower()
-        if again != "y":
-            print(_colour("Thanks for playing!", Fore.CYAN))
-            break
+    finally:
+        profiles.close()
 
 
 def _run_gui(args: argparse.Namespace) -> None:  # pragma: no cover - manual mode
-    """Run a very small experimental Tk GUI."""
+    """Run a small Tk front end over :class:`~src.engine.GameSession`.
+
+    Notes are checked as they are typed: the game ends as soon as a
+    completed (space-terminated) note is wrong.
+    """
 
     import tkinter as tk
 
+    manager = ScoreManager()
+    manager.load()
+    profiles = _open_profiles(args.profiles, args.write_behind, args.shards)
+    profiles.load()
+    game = GameSession(args.levels, args.step, args.difficulty, note_source=generate_next_note)
+
     root = tk.Tk()
     root.title("Musical Memory")
-    tk.Label(root, text="GUI mode is under construction").pack(padx=20, pady=20)
-    root.mainloop()
+    status = tk.StringVar()
+    notes = tk.StringVar()
+    tk.Label(root, textvariable=status).pack(padx=20, pady=(20, 5))
+    tk.Label(root, textvariable=notes, font=("TkFixedFont", 16)).pack(padx=20)
+    entry = tk.Entry(root)
+    entry.pack(padx=20, pady=10)
+    button = tk.Button(root)
+    button.pack(pady=(0, 20))
+    # Verifier for the current level and how many typed notes it has seen.
+    live = {"verifier": None, "fed": 0}
+
+    def show_level() -> None:
+        sequence = game.next_level()
+        live["verifier"], live["fed"] = game.verifier(), 0
+        status.set(f"Level {game.level}: memorise the notes, then type them")
+        notes.set(" ".join(map(str, sequence)))
+        if args.audio:
+            play_sequence_async(sequence, use_audio=True, delay=args.tempo)
+        # Hide the notes once they have been shown for one tempo beat each.
+        root.after(int(args.tempo * 1000 * len(sequence)) + 500, lambda: notes.set(""))
+
+    def end(message: str) -> None:
+        is_high = record_game(
+            manager,
+            profiles,
+            args.user,
+            game.score,
+            {"difficulty": args.difficulty, "tempo": args.tempo, "step": args.step},
+        )
+        suffix = " New high score!" if is_high else f" High score: {manager.high_score}."
+        status.set(f"{message} Score: {game.score}.{suffix}")
+        button.config(text="Play again", command=restart)
+
+    def check_typed(_event: object = None) -> None:
+        if game.finished or live["verifier"] is None:
+            return
+        # The last word may still be growing; check the finished ones only.
+        typed = [word for word in entry.get().split(" ")[:-1] if word]
+        verifier = live["verifier"]
+        if len(typed) < live["fed"]:
+            verifier.reset()
+            live["fed"] = 0
+        try:
+            ok = verifier.feed_many(map(int, typed[live["fed"]:]))
+        except ValueError:
+            return  # reported on submit, like the CLI
+        live["fed"] = len(typed)
+        if not ok:
+            entry.delete(0, tk.END)
+            game.submit(verifier)
+            end(
+                f"Wrong note {verifier.error_index + 1}. "
+                f"Expected {' '.join(map(str, game.sequence))}."
+            )
+
+    def submit(_event: object = None) -> None:
+        if game.finished:
+            return
+        text = entry.get()
+        entry.delete(0, tk.END)
+        verifier = game.verifier()
+        try:
+            verifier.feed_many(iter_guess(text))
+        except ValueError:
+            game.finish()
+            end("Invalid input, numbers only.")
+            return
+        if not game.submit(verifier):
+            end(f"Wrong sequence. Expected {' '.join(map(str, game.sequence))}.")
+        elif game.finished:
+            end("Congratulations! You completed all levels.")
+        else:
+            show_level()
+
+    def restart() -> None:
+        game.reset()
+        GAMES_STARTED.inc()
+        button.config(text="Submit", command=submit)
+        show_level()
+
+    entry.bind("<Return>", submit)
+    entry.bind("<KeyRelease>", check_typed)
+    restart()
+    try:
+        root.mainloop()
+    finally:
+        profiles.close()
 
 
 def _run_web(args: argparse.Namespace) -> None:  # pragma: no cover - manual mode
-    """Start a minimal HTTP server announcing the web mode."""
+    """Serve the game's JSON API on an asyncio event loop.
 
-    from http.server import BaseHTTPRequestHandler, HTTPServer
+    Metrics are always recorded in this mode; ``GET /metrics`` serves them.
+    """
 
-    class Handler(BaseHTTPRequestHandler):
-        def do_GET(self) -> None:  # noqa: D401 - small handler
-            self.send_response(200)
-            self.send_header("Content-type", "text/html")
-            self.end_headers()
-            self.wfile.write(
-                b"<html><body><h1>Musical Memory web mode is under construction</h1></body></html>"
-            )
+    from .clips import ClipCache
+    from .sessions import FileSessionStore, MemorySessionStore
+    from .web import WebApp, run
 
-    server = HTTPServer(("127.0.0.1", 8000), Handler)
-    print("Serving on http://127.0.0.1:8000 - press Ctrl+C to stop")
+    manager = ScoreManager()
+    manager.load()
+    profiles = _open_profiles(args.profiles, args.write_behind, args.shards)
+    profiles.load()
+    if args.sessions is not None:
+        sessions = FileSessionStore(args.sessions, ttl=args.session_ttl)
+    else:
+        sessions = MemorySessionStore(ttl=args.session_ttl)
+    app = WebApp(
+        manager,
+        profiles,
+        difficulty=args.difficulty,
+        step=args.step,
+        levels=args.levels,
+        sessions=sessions,
+        clips=ClipCache(args.clip_cache),
+    )
+    print(f"Serving on http://{args.host}:{args.port} - press Ctrl+C to stop")
     try:
-        server.serve_forever()
-    except KeyboardInterrupt:
-        pass
+        run(app, args.host, args.port)
+    finally:
+        sessions.close()
+        profiles.close()
 
 
 def main(argv: List[str] | None = None) -> None:
     """Entry point choosing between CLI, GUI and web modes."""
 
     args = parse_args(argv)
-    if args.mode == "cli":
-        _run_cli(args)
-    elif args.mode == "gui":
-        _run_gui(args)
-    else:
-        _run_web(args)
+    if args.metrics_dump is not None or args.mode == "web":
+        metrics.enable()
+    try:
+        if args.mode == "cli":
+            _run_cli(args)
+        elif args.mode == "gui":
+            _run_gui(args)
+        else:
+            _run_web(args)
+    finally:
+        if args.metrics_dump is not None:
+            metrics.REGISTRY.dump(args.metrics_dump)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,212 @@
+"""Rendered audio clips for web clients.
+
+Browsers cannot use :mod:`simpleaudio`, so web mode serves sequences as WAV
+or raw PCM. The audio comes from the same synthesis as local playback
+(:func:`~src.game.iter_sequence_chunks`): 16-bit little-endian mono.
+
+Clips are cached on disk under the SHA-256 of everything that determines
+their bytes (notes, tempo, sample rate, format, ...). That key doubles as a
+strong ETag. A miss renders chunk by chunk, streaming each chunk to the
+client while also writing it to a temporary file that becomes the cache
+entry once complete. A hit streams the file back in blocks. Neither path
+ever holds a whole clip in memory. The cache lives in the user's cache
+directory (:func:`default_directory`) unless another one is given.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+from .game import SAMPLE_RATE, TONE_DURATION, Note, iter_sequence_chunks
+
+FORMATS = {"wav": "audio/wav", "pcm": "application/octet-stream"}
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Bytes per read when streaming a cached clip.
+READ_BLOCK = 64 * 1024
+# Bump when the synthesis changes so old cache entries are not served.
+CLIP_VERSION = 1
+
+_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+
+
+def default_directory() -> Path:
+    """``$XDG_CACHE_HOME/musical-memory/clips``, or under ``~/.cache``."""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "musical-memory" / "clips"
+
+
+def clip_key(
+    sequence: Sequence[Note],
+    gap: float,
+    sample_rate: int = SAMPLE_RATE,
+    fmt: str = "wav",
+    duration: float = TONE_DURATION,
+    waveform: str = "sine",
+) -> str:
+    """Return the content address of a clip: a SHA-256 hex digest."""
+    spec = [CLIP_VERSION, list(sequence), gap, sample_rate, fmt, duration, waveform]
+    return hashlib.sha256(json.dumps(spec).encode("utf-8")).hexdigest()
+
+
+def clip_length(
+    notes: int,
+    gap: float,
+    sample_rate: int = SAMPLE_RATE,
+    fmt: str = "wav",
+    duration: float = TONE_DURATION,
+) -> int:
+    """Size in bytes of a clip of ``notes`` notes, known before rendering."""
+    stride = int(sample_rate * duration) + int(sample_rate * gap)
+    data = notes * stride * 2
+    return data + _WAV_HEADER.size if fmt == "wav" else data
+
+
+def wav_header(data_size: int, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """RIFF header for ``data_size`` bytes of 16-bit mono PCM."""
+    return _WAV_HEADER.pack(
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", data_size,
+    )
+
+
+def iter_clip(
+    sequence: Sequence[Note],
+    gap: float,
+    sample_rate: int = SAMPLE_RATE,
+    fmt: str = "wav",
+    duration: float = TONE_DURATION,
+    waveform: str = "sine",
+) -> Iterator[bytes]:
+    """Yield a clip's bytes: the WAV header (if any), then one block per chunk of notes."""
+    if fmt == "wav":
+        data_size = clip_length(len(sequence), gap, sample_rate, "pcm", duration)
+        yield wav_header(data_size, sample_rate)
+    for chunk in iter_sequence_chunks(sequence, gap, duration, sample_rate, waveform):
+        yield chunk.astype("<i2", copy=False).tobytes()
+
+
+class ClipCache:
+    """Content-addressed clip files in ``directory``, bounded to ``max_bytes``.
+
+    ``directory`` defaults to :func:`default_directory`.
+
+    Entries are evicted least recently used first. The directory is scanned
+    once on start-up (oldest modification first), so the bound holds across
+    restarts. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.directory = Path(directory) if directory is not None else default_directory()
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.directory.is_dir():
+            files = sorted(
+                (p for p in self.directory.glob("*/*") if p.is_file() and not p.name.startswith(".")),
+                key=lambda p: p.stat().st_mtime_ns,
+            )
+            for path in files:
+                size = path.stat().st_size
+                self._entries[path.name] = size
+                self.bytes += size
+
+    def path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._entries
+
+    def stream(self, key: str, render: Iterator[bytes]) -> Iterator[bytes]:
+        """Yield the clip for ``key``, from disk or from ``render`` on a miss.
+
+        ``render`` is only consumed on a miss; its chunks are written to the
+        cache as they are yielded and committed just before the last one. An
+        abandoned stream leaves no entry behind.
+        """
+        with self._lock:
+            hit = key in self._entries
+            if hit:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if hit:
+            try:
+                fh = self.path(key).open("rb")
+            except FileNotFoundError:
+                with self._lock:
+                    self.bytes -= self._entries.pop(key, 0)
+            else:
+                with fh:
+                    yield from iter(lambda: fh.read(READ_BLOCK), b"")
+                return
+        yield from self._fill(key, render)
+
+    def _fill(self, key: str, render: Iterator[bytes]) -> Iterator[bytes]:
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{key}.", suffix=".tmp")
+        fh = os.fdopen(fd, "wb")
+        size = 0
+        committed = False
+        try:
+            chunks = iter(render)
+            chunk = next(chunks, None)
+            while chunk is not None:
+                fh.write(chunk)
+                size += len(chunk)
+                following = next(chunks, None)
+                if following is None:
+                    # Commit before the last chunk goes out, so a client that
+                    # has the whole clip can rely on it being cached.
+                    fh.close()
+                    os.replace(tmp, path)
+                    committed = True
+                    self._add(key, size)
+                yield chunk
+                chunk = following
+        finally:
+            # Also runs on GeneratorExit when the client goes away mid-stream.
+            if not committed:
+                fh.close()
+                os.unlink(tmp)
+
+    def _add(self, key: str, size: int) -> None:
+        with self._lock:
+            self.bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                old, old_size = self._entries.popitem(last=False)
+                self.bytes -= old_size
+                self.evictions += 1
+                try:
+                    self.path(old).unlink()
+                except FileNotFoundError:
+                    pass
+
+    def info(self) -> dict:
+        """Return hit/miss/eviction counters and the cache's size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+            }
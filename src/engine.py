@@ -0,0 +1,200 @@
+"""Headless game engine shared by the CLI, GUI and web front ends.
+
+:class:`GameSession` is the whole game flow as an I/O-free state machine::
+
+    game = GameSession(levels=5, step=1, difficulty="easy")
+    while not game.finished:
+        sequence = game.next_level()     # present it to the player
+        game.submit(guess)               # False ends the game
+    score = game.score
+
+Front ends only present :attr:`GameSession.sequence` and collect guesses;
+:func:`parse_guess` and :func:`record_game` cover the shared text parsing and
+score/profile bookkeeping. A guess can also be checked note by note as it
+is typed with :meth:`GameSession.verifier`, then handed to
+:meth:`GameSession.submit`. A session keeps nothing but a few integers and the
+sequence list, and :meth:`GameSession.reset` reuses both, so bots can play
+games back to back without allocating (see ``benchmarks/bench_engine.py``).
+"""
+
+import random
+from random import random as _random
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+from . import metrics
+from .game import _MASK64, Note, SequenceVerifier, _note_pool, _seeded_index, check_sequence
+
+# Front ends count starts; record_game counts the ends.
+GAMES_STARTED = metrics.counter("games_started_total", "Games started")
+GAMES_FINISHED = metrics.counter("games_finished_total", "Games finished and recorded")
+HIGH_SCORES = metrics.counter("high_scores_total", "Finished games that set a new high score")
+
+
+class GameSession:
+    """One game: a growing sequence, the current level and the score.
+
+    Each :meth:`next_level` appends ``step`` notes (``base_length`` for the
+    first level, ``step`` by default). The notes come from
+    ``note_source(difficulty)`` if given, otherwise they are drawn uniformly
+    from the difficulty's note pool with the :mod:`random` module.
+    With a ``seed`` they are instead derived from ``(seed, index)`` exactly
+    like :func:`~src.game.sequence_from_seed`, so a game can be rebuilt from
+    its seed and level.
+    """
+
+    __slots__ = (
+        "levels", "step", "base_length", "difficulty", "seed", "sequence",
+        "level", "score", "finished", "_note_source", "_pool",
+    )
+
+    def __init__(
+        self,
+        levels: int = 5,
+        step: int = 1,
+        difficulty: str = "easy",
+        note_source: Optional[Callable[[str], Note]] = None,
+        seed: Optional[int] = None,
+        base_length: Optional[int] = None,
+    ) -> None:
+        if levels < 1 or step < 1 or (base_length is not None and base_length < 1):
+            raise ValueError("levels, step and base_length must be at least 1")
+        self.levels = levels
+        self.step = step
+        self.base_length = step if base_length is None else base_length
+        self.difficulty = difficulty
+        self.seed = None if seed is None else seed & _MASK64
+        self.sequence: List[Note] = []
+        self.level = 0
+        self.score = 0
+        self.finished = False
+        self._note_source = note_source
+        self._pool = _note_pool(difficulty)
+
+    @classmethod
+    def resume(
+        cls, seed: int, level: int, score: int, levels: int, step: int = 1, difficulty: str = "easy"
+    ) -> "GameSession":
+        """Rebuild a seeded game that is at ``level`` with ``score``."""
+        game = cls(levels, step, difficulty, seed=seed)
+        while game.level < level:
+            game.next_level()
+        game.score = score
+        return game
+
+    @property
+    def completed(self) -> bool:
+        """``True`` once every level has been passed."""
+        return self.score == self.levels
+
+    def reset(self) -> None:
+        """Start a new game with the same options, reusing the sequence list."""
+        self.sequence.clear()
+        self.level = self.score = 0
+        self.finished = False
+
+    def next_level(self) -> List[Note]:
+        """Advance to the next level and return the (shared) sequence to repeat."""
+        if self.finished:
+            raise RuntimeError("game is finished")
+        start = len(self.sequence)
+        count = self.step if start else self.base_length
+        append = self.sequence.append
+        if self._note_source is not None:
+            source, difficulty = self._note_source, self.difficulty
+            for _ in range(count):
+                append(source(difficulty))
+        elif self.seed is None:
+            # Same distribution as generate_next_note without its per-call overhead.
+            pool = self._pool
+            size = len(pool)
+            for _ in range(count):
+                append(pool[int(_random() * size)])
+        else:
+            pool, seed = self._pool, self.seed
+            size = len(pool)
+            self.sequence.extend(
+                pool[_seeded_index(seed, i, size)] for i in range(start, start + count)
+            )
+        self.level += 1
+        return self.sequence
+
+    def verifier(self) -> SequenceVerifier:
+        """Return a verifier for the current level, to check a guess as it is typed."""
+        if self.finished or not self.level:
+            raise RuntimeError("no level to answer")
+        return SequenceVerifier(self.sequence)
+
+    def submit(self, guess: Union[Sequence[Note], SequenceVerifier]) -> bool:
+        """Check ``guess`` for the current level.
+
+        ``guess`` is the notes or a :meth:`verifier` that has been fed
+        them. A correct guess scores the level and finishes the game after
+        the last one; a wrong guess finishes it.
+        """
+        if self.finished or not self.level:
+            raise RuntimeError("no level to answer")
+        if type(guess) is list:
+            correct = guess == self.sequence
+        elif isinstance(guess, SequenceVerifier):
+            correct = guess.complete
+        else:
+            correct = check_sequence(self.sequence, guess)
+        if correct:
+            self.score = self.level
+            self.finished = self.level == self.levels
+        else:
+            self.finished = True
+        return correct
+
+    def finish(self) -> int:
+        """End the game early (e.g. unreadable input) and return the score."""
+        self.finished = True
+        return self.score
+
+    def __repr__(self) -> str:
+        return (
+            f"GameSession(level={self.level}/{self.levels}, score={self.score}, "
+            f"finished={self.finished})"
+        )
+
+
+def parse_guess(text: str) -> List[int]:
+    """Parse a space-separated guess; raises :class:`ValueError` on non-numbers."""
+    return [int(x) for x in text.split()]
+
+
+def iter_guess(text: str) -> Iterator[int]:
+    """Lazy :func:`parse_guess`: a non-number raises only when it is reached."""
+    return map(int, text.split())
+
+
+def record_game(scores: Any, profiles: Any, user: str, score: int, settings: Dict[str, Any]) -> bool:
+    """Store a finished game's score and the player's settings.
+
+    ``scores`` is a :class:`~src.score.ScoreManager` and ``profiles`` a
+    :class:`~src.profile.ProfileManager`; the profile update is one write.
+    Returns ``True`` for a new overall high score.
+    """
+    is_high = scores.save_score(score)
+    with profiles.batch():
+        profiles.record_score(user, score)
+        profiles.update_settings(user, settings)
+    GAMES_FINISHED.inc()
+    if is_high:
+        HIGH_SCORES.inc()
+    return is_high
+
+
+def perfect_bot(game: GameSession) -> int:
+    """Play ``game`` to the end, always answering correctly; returns the score."""
+    while not game.finished:
+        game.submit(game.next_level())
+    return game.score
+
+
+def random_bot(game: GameSession, accuracy: float, rng: random.Random = random) -> int:
+    """Play ``game`` answering each level correctly with probability ``accuracy``."""
+    while not game.finished:
+        sequence = game.next_level()
+        game.submit(sequence if rng.random() < accuracy else ())
+    return game.score
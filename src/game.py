@@ -1,17 +1,48 @@
 from __future__ import annotations
 
+import importlib
 import random
+import threading
 import time
+from collections import OrderedDict
+from collections.abc import Sequence as _SequenceABC
 from pathlib import Path
-from typing import Iterable, Sequence, List, Union, Optional
+from typing import Callable, Iterable, Sequence, List, Union, Optional
 
 # ==== 可选的声音播放依赖（没有就静默睡眠模拟时长）====
+# 首次用到时才导入，不播放声音的启动路径不为 numpy 付出导入时间。
+# 模块属性 np / sa 仍可读写（见 __getattr__），赋值即可替换实现。
+_OPTIONAL = {"np": "numpy", "sa": "simpleaudio"}
+
+def _optional(alias: str):
+    """导入并缓存 alias 对应的可选依赖；未安装返回 None。"""
+    try:
+        return globals()[alias]
+    except KeyError:
+        pass
+    try:
+        module = importlib.import_module(_OPTIONAL[alias])
+    except Exception:
+        module = None
+    globals()[alias] = module
+    return module
+
+def _numpy():
+    return _optional("np")
+
+def _simpleaudio():
+    return _optional("sa")
+
+def __getattr__(name: str):
+    if name in _OPTIONAL:
+        return _optional(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# ---- 埋点：未启用时每次调用只多一次函数调用（见 metrics.py）----
 try:
-    import numpy as np
-    import simpleaudio as sa
-except Exception:
-    np = None
-    sa = None
+    from .metrics import timed
+except ImportError:  # 以脚本方式运行（见 cli.py）
+    from metrics import timed
 
 # ---- 类型别名：既可用数字音阶，也可用字母音名 ----
 Note = Union[int, str]
@@ -48,19 +79,263 @@ def _freq_of(note: Note) -> float:
         return NOTE_FREQUENCIES_LETTER.get(note.upper(), 440.0)
     return 440.0
 
-def _play_tone(frequency: float, duration: float = 0.4) -> None:
-    """用 simpleaudio 播放；若不可用，睡一会儿模拟时长。"""
-    if not sa or not np:
+# ---- 音频合成参数 ----
+SAMPLE_RATE = 44100
+TONE_DURATION = 0.4
+WAVEFORMS: Sequence[str] = ("sine", "square", "triangle")
+
+@timed("tone_render_seconds", "Synthesis time of one tone buffer (tone cache misses)")
+def _render_tone(
+    frequency: float,
+    duration: float = TONE_DURATION,
+    sample_rate: int = SAMPLE_RATE,
+    waveform: str = "sine",
+):
+    """合成一个归一化的 int16 单声道音调缓冲（只读），需要 numpy。"""
+    np = _numpy()
+    if np is None:
+        raise RuntimeError("numpy is required to render tones")
+    t = np.linspace(0, duration, int(sample_rate * duration), False)
+    phase = 2 * np.pi * frequency * t
+    if waveform == "sine":
+        tone = np.sin(phase)
+    elif waveform == "square":
+        tone = np.sign(np.sin(phase))
+    elif waveform == "triangle":
+        tone = 2 / np.pi * np.arcsin(np.sin(phase))
+    else:
+        raise ValueError(f"unknown waveform: {waveform}")
+    peak = np.max(np.abs(tone)) if tone.size else 0.0
+    if peak:
+        tone = tone / peak
+    audio = (tone * (2**15 - 1)).astype(np.int16)
+    audio.setflags(write=False)
+    return audio
+
+class ToneCache:
+    """有界、线程安全的音调缓冲 LRU 缓存。
+
+    键为 ``(frequency, duration, sample_rate, waveform)``；缓冲只读，可在线程间共享。
+    合成在锁外进行，避免阻塞其他线程的命中查询。
+    """
+
+    def __init__(self, maxsize: int = 64) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._buffers: "OrderedDict[tuple, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    def get(
+        self,
+        frequency: float,
+        duration: float = TONE_DURATION,
+        sample_rate: int = SAMPLE_RATE,
+        waveform: str = "sine",
+    ):
+        """返回缓存的音调缓冲；未命中则合成并按 LRU 淘汰最旧条目。"""
+        key = (float(frequency), float(duration), int(sample_rate), waveform)
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is not None:
+                self._buffers.move_to_end(key)
+                self.hits += 1
+                return buffer
+            self.misses += 1
+        buffer = _render_tone(*key)
+        with self._lock:
+            existing = self._buffers.get(key)
+            if existing is not None:
+                # 另一线程已抢先合成，沿用同一份缓冲
+                self._buffers.move_to_end(key)
+                return existing
+            self._buffers[key] = buffer
+            while len(self._buffers) > self.maxsize:
+                self._buffers.popitem(last=False)
+                self.evictions += 1
+        return buffer
+
+    def warm_up(
+        self,
+        difficulty: str = "easy",
+        notes: Optional[Sequence[Note]] = None,
+        duration: float = TONE_DURATION,
+        sample_rate: int = SAMPLE_RATE,
+        waveform: str = "sine",
+    ) -> int:
+        """预先合成整个难度音符池（或自定义 notes）的音调，返回合成数量；无 numpy 时为 0。"""
+        if _numpy() is None:
+            return 0
+        pool = notes if notes is not None else DIFFICULTY_NOTES.get(difficulty, DIFFICULTY_NOTES["easy"])
+        frequencies = {_freq_of(note) for note in pool}
+        for frequency in frequencies:
+            self.get(frequency, duration, sample_rate, waveform)
+        return len(frequencies)
+
+    def clear(self) -> None:
+        """清空缓存并重置计数器。"""
+        with self._lock:
+            self._buffers.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> dict:
+        """返回命中/未命中/淘汰计数与当前容量。"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._buffers),
+                "maxsize": self.maxsize,
+            }
+
+# 全局共享缓存：8 个数字音 + 7 个字母音远小于默认容量
+TONE_CACHE = ToneCache()
+
+def _play_tone(
+    frequency: float,
+    duration: float = TONE_DURATION,
+    sample_rate: int = SAMPLE_RATE,
+    waveform: str = "sine",
+) -> None:
+    """用 simpleaudio 播放（缓冲取自 TONE_CACHE）；若不可用，睡一会儿模拟时长。"""
+    sa = _simpleaudio()
+    if not sa or not _numpy():
         time.sleep(duration)
         return
-    sample_rate = 44100
-    t = np.linspace(0, duration, int(sample_rate * duration), False)
-    tone = np.sin(2 * np.pi * frequency * t)
-    audio = (tone * (2**15 - 1) / np.max(np.abs(tone))).astype(np.int16)
+    audio = TONE_CACHE.get(frequency, duration, sample_rate, waveform)
     sa.play_buffer(audio, 1, 2, sample_rate).wait_done()
 
-def play_sequence(sequence: Sequence[Note], use_audio: bool = False, delay: float = 0.5) -> None:
-    """依次打印并（可选）播放序列。"""
+# 无缝模式下单次提交的最大音符数；更长的序列按块流式合成，内存保持有界
+GAPLESS_CHUNK_NOTES = 32
+
+@timed("sequence_render_seconds", "Synthesis time of a gapless sequence buffer")
+def render_sequence(
+    sequence: Sequence[Note],
+    gap: float = 0.0,
+    duration: float = TONE_DURATION,
+    sample_rate: int = SAMPLE_RATE,
+    waveform: str = "sine",
+):
+    """把整段序列（每个音符后接 gap 秒静音）合成为一个连续的 int16 缓冲，需要 numpy。"""
+    np = _numpy()
+    if np is None:
+        raise RuntimeError("numpy is required to render sequences")
+    note_len = int(sample_rate * duration)
+    stride = note_len + int(sample_rate * gap)
+    audio = np.zeros(len(sequence) * stride, dtype=np.int16)
+    for i, note in enumerate(sequence):
+        start = i * stride
+        audio[start:start + note_len] = TONE_CACHE.get(_freq_of(note), duration, sample_rate, waveform)
+    return audio
+
+def iter_sequence_chunks(
+    sequence: Sequence[Note],
+    gap: float = 0.0,
+    duration: float = TONE_DURATION,
+    sample_rate: int = SAMPLE_RATE,
+    waveform: str = "sine",
+    chunk_notes: int = GAPLESS_CHUNK_NOTES,
+):
+    """流式版本：每次产出最多 chunk_notes 个音符的连续缓冲，拼接后与 render_sequence 一致。"""
+    if chunk_notes < 1:
+        raise ValueError("chunk_notes must be at least 1")
+    for start in range(0, len(sequence), chunk_notes):
+        yield render_sequence(sequence[start:start + chunk_notes], gap, duration, sample_rate, waveform)
+
+class SequenceRenderer:
+    """单局游戏的增量合成器：保留已合成的前缀缓冲，每关只合成并追加新增的尾部音符。
+
+    序列每关只在末尾增长，因此整局的合成量是 O(n) 而非 O(n²)。
+    若传入的序列不再以已合成前缀开头，则自动丢弃缓冲重新合成。
+    """
+
+    def __init__(
+        self,
+        gap: float = 0.0,
+        duration: float = TONE_DURATION,
+        sample_rate: int = SAMPLE_RATE,
+        waveform: str = "sine",
+    ) -> None:
+        self.gap = gap
+        self.duration = duration
+        self.sample_rate = sample_rate
+        self.waveform = waveform
+        self._notes: List[Note] = []
+        self._audio = None
+        self._length = 0
+
+    def __len__(self) -> int:
+        """已合成的音符数。"""
+        return len(self._notes)
+
+    def render(self, sequence: Sequence[Note]):
+        """返回整段序列的只读缓冲视图，只合成尚未合成的尾部。"""
+        np = _numpy()
+        done = len(self._notes)
+        if len(sequence) < done or list(sequence[:done]) != self._notes:
+            self.reset()
+            done = 0
+        tail = sequence[done:]
+        if tail:
+            chunk = render_sequence(tail, self.gap, self.duration, self.sample_rate, self.waveform)
+            needed = self._length + len(chunk)
+            if self._audio is None or needed > len(self._audio):
+                # 容量翻倍，追加的均摊成本为 O(新增样本数)
+                grown = np.zeros(max(needed, 2 * self._length), dtype=np.int16)
+                if self._audio is not None:
+                    grown[:self._length] = self._audio[:self._length]
+                self._audio = grown
+            self._audio[self._length:needed] = chunk
+            self._length = needed
+            self._notes.extend(tail)
+        if self._audio is None:
+            return np.zeros(0, dtype=np.int16)
+        view = self._audio[:self._length]
+        view.flags.writeable = False
+        return view
+
+    def reset(self) -> None:
+        """丢弃本局已合成的缓冲（游戏结束时调用）。"""
+        self._notes = []
+        self._audio = None
+        self._length = 0
+
+@timed("playback_seconds", "Time spent presenting a sequence, including audio")
+def play_sequence(
+    sequence: Sequence[Note],
+    use_audio: bool = False,
+    delay: float = 0.5,
+    gapless: bool = False,
+    renderer: Optional[SequenceRenderer] = None,
+) -> None:
+    """依次打印并（可选）播放序列。
+
+    gapless=True 且音频可用时，整段序列（含 delay 静音）合成为一个缓冲一次提交，
+    节奏精确到采样；超过 GAPLESS_CHUNK_NOTES 的长序列按块流式提交。
+    传入 renderer 时改用其增量缓冲（间隔取 renderer.gap），只合成新增的音符。
+    """
+    sa = _simpleaudio() if use_audio else None
+    if use_audio and renderer is not None and sa and _numpy():
+        audio = renderer.render(sequence)
+        for note in sequence:
+            print(note)
+        sa.play_buffer(audio, 1, 2, renderer.sample_rate).wait_done()
+        return
+    if use_audio and gapless and sa and _numpy():
+        starts = range(0, len(sequence), GAPLESS_CHUNK_NOTES)
+        chunks = iter_sequence_chunks(sequence, gap=delay, chunk_notes=GAPLESS_CHUNK_NOTES)
+        for start, audio in zip(starts, chunks):
+            for note in sequence[start:start + GAPLESS_CHUNK_NOTES]:
+                print(note)
+            sa.play_buffer(audio, 1, 2, SAMPLE_RATE).wait_done()
+        return
     for note in sequence:
         print(note)
         if use_audio:
@@ -68,11 +343,98 @@ def play_sequence(sequence: Sequence[Note], use_audio: bool = False, delay: floa
         else:
             time.sleep(delay)
 
+class PlaybackHandle:
+    """后台播放句柄：wait() 等待结束，cancel() 中止，position/total 查询进度。
+
+    播放在守护线程中进行，调用方（CLI 输入、GUI/Web 事件循环）不会被阻塞；
+    on_progress(index, note) 在每个音符开始时于播放线程中回调。
+    """
+
+    def __init__(
+        self,
+        sequence: Sequence[Note],
+        use_audio: bool = False,
+        delay: float = 0.5,
+        on_progress: Optional[Callable[[int, Note], None]] = None,
+    ) -> None:
+        self.sequence = tuple(sequence)
+        self.total = len(self.sequence)
+        self.position = 0
+        self._use_audio = use_audio
+        self._delay = delay
+        self._on_progress = on_progress
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._play_obj = None
+        self._thread = threading.Thread(target=self._run, name="musical-memory-playback", daemon=True)
+
+    def start(self) -> "PlaybackHandle":
+        self._thread.start()
+        return self
+
+    @timed("playback_seconds", "Time spent presenting a sequence, including audio")
+    def _run(self) -> None:
+        try:
+            sa = _simpleaudio() if self._use_audio else None
+            audio = sa and _numpy()
+            for index, note in enumerate(self.sequence):
+                if self._cancelled.is_set():
+                    break
+                if self._on_progress is not None:
+                    self._on_progress(index, note)
+                if audio:
+                    with self._lock:
+                        if self._cancelled.is_set():
+                            break
+                        self._play_obj = sa.play_buffer(TONE_CACHE.get(_freq_of(note)), 1, 2, SAMPLE_RATE)
+                    self._play_obj.wait_done()
+                else:
+                    # 可被 cancel() 立即唤醒的睡眠
+                    self._cancelled.wait(self._delay)
+                if not self._cancelled.is_set():
+                    self.position = index + 1
+        finally:
+            self._done.set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """阻塞直到播放结束或被取消；超时返回 False。"""
+        return self._done.wait(timeout)
+
+    def cancel(self) -> None:
+        """中止播放：停止当前音调并跳过剩余音符。"""
+        with self._lock:
+            self._cancelled.set()
+            if self._play_obj is not None:
+                self._play_obj.stop()
+
+def play_sequence_async(
+    sequence: Sequence[Note],
+    use_audio: bool = False,
+    delay: float = 0.5,
+    on_progress: Optional[Callable[[int, Note], None]] = None,
+) -> PlaybackHandle:
+    """在后台线程播放序列并立即返回 PlaybackHandle。"""
+    return PlaybackHandle(sequence, use_audio, delay, on_progress).start()
+
+def _note_pool(difficulty: str = "easy", notes: Optional[Sequence[Note]] = None) -> Sequence[Note]:
+    """返回可直接索引的音符池：自定义 notes 优先，否则按难度取数字音阶池。"""
+    pool = notes if notes is not None else DIFFICULTY_NOTES.get(difficulty, DIFFICULTY_NOTES["easy"])
+    return pool if isinstance(pool, (list, tuple)) else list(pool)
+
 def generate_next_note(difficulty: str = "easy", notes: Optional[Sequence[Note]] = None) -> Note:
     """随机生成下一个音符。优先使用自定义 notes；否则按难度用数字音阶池。"""
-    pool: Sequence[Note] = notes if notes is not None else DIFFICULTY_NOTES.get(difficulty, DIFFICULTY_NOTES["easy"])
-    return random.choice(list(pool))
+    return random.choice(_note_pool(difficulty, notes))
 
+@timed("generate_sequence_seconds", "generate_sequence latency")
 def generate_sequence(length: int, notes: Sequence[Note] = NOTES) -> List[Note]:
     """生成固定长度的随机序列（默认字母音名池）。"""
     if length < 0:
@@ -90,9 +452,191 @@ def generate_level_sequence(level: int, base_length: int = 3, step: int = 1, not
     """按关卡生成随机序列（默认字母音名池，可换成数字池）。"""
     return generate_sequence(sequence_length(level, base_length, step), notes)
 
+# ================== 可复现的种子序列 ==================
+# 第 i 个音符只取决于 (seed, i)：用 splitmix64 对计数器做哈希，
+# 因此任意关卡都能由 (seed, level) 重建，且更高关卡的序列以低关卡序列为前缀。
+
+_MASK64 = (1 << 64) - 1
+_GAMMA = 0x9E3779B97F4A7C15
+_MIX1 = 0xBF58476D1CE4E5B9
+_MIX2 = 0x94D049BB133111EB
+# 批量生成时每块的行数，限制中间 uint64 数组的内存
+_BATCH_ROWS = 65536
+
+def _seeded_index(seed: int, index: int, pool_size: int) -> int:
+    """纯 Python 版 splitmix64：返回第 index 个音符在池中的下标。"""
+    z = (seed + (index + 1) * _GAMMA) & _MASK64
+    z = ((z ^ (z >> 30)) * _MIX1) & _MASK64
+    z = ((z ^ (z >> 27)) * _MIX2) & _MASK64
+    return (z ^ (z >> 31)) % pool_size
+
+@timed("sequence_from_seed_seconds", "Time to rebuild a level's sequence from its seed")
+def sequence_from_seed(
+    seed: int,
+    level: int,
+    difficulty: str = "easy",
+    base_length: int = 3,
+    step: int = 1,
+    notes: Optional[Sequence[Note]] = None,
+) -> List[Note]:
+    """由 (seed, level) 重建关卡序列，无需存储；不依赖 numpy，结果与批量接口一致。"""
+    pool = _note_pool(difficulty, notes)
+    seed &= _MASK64
+    return [pool[_seeded_index(seed, i, len(pool))] for i in range(sequence_length(level, base_length, step))]
+
+class SeededSequence(_SequenceABC):
+    """sequence_from_seed 的惰性版本：按下标即时计算音符，不生成整张列表。
+
+    逐个校验（SequenceVerifier）时，成本只与实际比对的音符数成正比。
+    """
+
+    __slots__ = ("_seed", "_length", "_pool")
+
+    def __init__(
+        self,
+        seed: int,
+        level: int,
+        difficulty: str = "easy",
+        base_length: int = 3,
+        step: int = 1,
+        notes: Optional[Sequence[Note]] = None,
+    ) -> None:
+        self._seed = seed & _MASK64
+        self._length = sequence_length(level, base_length, step)
+        self._pool = _note_pool(difficulty, notes)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("sequence index out of range")
+        return self._pool[_seeded_index(self._seed, index, len(self._pool))]
+
+@timed("generate_batch_seconds", "generate_sequences_batch latency")
+def generate_sequences_batch(
+    seeds: Iterable[int],
+    length: int,
+    difficulty: str = "easy",
+    notes: Optional[Sequence[Note]] = None,
+):
+    """一次性为多局生成序列，返回形状 (len(seeds), length) 的 uint8 下标数组（需要 numpy）。
+
+    元素是音符池（_note_pool(difficulty, notes)）中的下标，用 decode_sequence 还原；
+    第 r 行与 sequence_from_seed(seeds[r], ...) 的同长度前缀一致。
+    """
+    np = _numpy()
+    if np is None:
+        raise RuntimeError("numpy is required for batch generation")
+    if length < 0:
+        raise ValueError("length must be non-negative")
+    pool_size = len(_note_pool(difficulty, notes))
+    if pool_size > 256:
+        raise ValueError("note pool too large for uint8 codes")
+    seed_arr = np.fromiter((s & _MASK64 for s in seeds), dtype=np.uint64)
+    out = np.empty((len(seed_arr), length), dtype=np.uint8)
+    counters = (np.arange(1, length + 1, dtype=np.uint64) * np.uint64(_GAMMA))[None, :]
+    for start in range(0, len(seed_arr), _BATCH_ROWS):
+        z = seed_arr[start:start + _BATCH_ROWS, None] + counters
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(_MIX1)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(_MIX2)
+        z ^= z >> np.uint64(31)
+        out[start:start + _BATCH_ROWS] = z % np.uint64(pool_size)
+    return out
+
+def decode_sequence(codes: Iterable[int], difficulty: str = "easy", notes: Optional[Sequence[Note]] = None) -> List[Note]:
+    """把 generate_sequences_batch 的一行下标还原为音符列表。"""
+    pool = _note_pool(difficulty, notes)
+    return [pool[int(code)] for code in codes]
+
+class SequenceVerifier:
+    """绑定到期望序列的增量校验器：逐个或成批喂入音符，遇到第一个错误即拒绝。
+
+    不复制期望序列，成本只与已输入的音符数成正比，适合键盘、套接字或 GUI
+    按键的实时校验::
+
+        verifier = SequenceVerifier(expected)
+        for note in keypresses:
+            if not verifier.feed(note):
+                break                      # verifier.error_index 为出错位置
+        verifier.complete                  # 全部正确且已输入完整
+
+    position 为已确认正确的音符数；从中途恢复（例如 Web 会话）时可直接传入。
+    超出期望长度的音符也算错误。
+    """
+
+    __slots__ = ("expected", "position", "error_index")
+
+    def __init__(self, expected: Sequence[Note], position: int = 0) -> None:
+        if not 0 <= position <= len(expected):
+            raise ValueError("position out of range")
+        self.expected = expected
+        self.position = position
+        self.error_index: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        """到目前为止没有错误。"""
+        return self.error_index is None
+
+    @property
+    def complete(self) -> bool:
+        """没有错误且整段序列都已输入。"""
+        return self.error_index is None and self.position == len(self.expected)
+
+    def feed(self, note: Note) -> bool:
+        """校验下一个音符；返回是否仍然正确（出错后恒为 False）。"""
+        if self.error_index is not None:
+            return False
+        position = self.position
+        if position < len(self.expected) and note == self.expected[position]:
+            self.position = position + 1
+            return True
+        self.error_index = position
+        return False
+
+    def feed_many(self, notes: Iterable[Note]) -> bool:
+        """依次校验一批音符，在第一个错误处停止（不再消费 notes 的剩余部分）。"""
+        if self.error_index is not None:
+            return False
+        expected = self.expected
+        position, end = self.position, len(expected)
+        for note in notes:
+            if position >= end or note != expected[position]:
+                self.position = self.error_index = position
+                return False
+            position += 1
+        self.position = position
+        return True
+
+    def reset(self, expected: Optional[Sequence[Note]] = None) -> None:
+        """从头开始校验（可换一个期望序列）。"""
+        if expected is not None:
+            self.expected = expected
+        self.position = 0
+        self.error_index = None
+
+    def __repr__(self) -> str:
+        return (
+            f"SequenceVerifier(position={self.position}/{len(self.expected)}, "
+            f"error_index={self.error_index})"
+        )
+
 def check_sequence(expected: Iterable[Note], actual: Iterable[Note]) -> bool:
-    """比较两个序列是否完全一致。"""
-    return list(expected) == list(actual)
+    """比较两个序列是否完全一致；长度不同立即返回，在第一个差异处停止。"""
+    if type(expected) is list and type(actual) is list:
+        # list 的 == 在 C 里先比长度、再逐项比较并提前退出
+        return expected == actual
+    if not isinstance(expected, _SequenceABC):
+        expected = list(expected)
+    if hasattr(actual, "__len__") and len(actual) != len(expected):
+        return False
+    verifier = SequenceVerifier(expected)
+    return verifier.feed_many(actual) and verifier.complete
 
 # ================== 分数保存（可选自动降级） ==================
 
@@ -0,0 +1,169 @@
+"""Bounded score history with running aggregates.
+
+:class:`ScoreHistory` keeps the most recent scores in an ``array('H')`` ring
+buffer of fixed capacity, so memory per player stops growing, while count,
+total, best and a per-level histogram are maintained for every score ever
+recorded. Statistics are answered from those aggregates without scanning the
+history.
+"""
+
+from array import array
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence
+
+# Number of recent scores retained per history by default.
+DEFAULT_HISTORY_LIMIT = 256
+_MAX_SCORE = 0xFFFF
+
+
+class ScoreHistory:
+    """Most recent ``capacity`` scores plus all-time aggregates.
+
+    The object behaves like a read-mostly list of the retained scores (oldest
+    first): it supports ``len``, iteration, indexing, ``append``, ``extend``
+    and equality with plain lists.
+    """
+
+    __slots__ = ("capacity", "_scores", "_start", "count", "total", "best", "_histogram")
+
+    def __init__(self, scores: Iterable[int] = (), capacity: int = DEFAULT_HISTORY_LIMIT) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._scores = array("H")
+        self._start = 0
+        self.count = 0
+        self.total = 0
+        self.best = 0
+        self._histogram: Dict[int, int] = {}
+        self.extend(scores)
+
+    @classmethod
+    def restore(
+        cls,
+        scores: Iterable[int],
+        stats: Optional[Dict[str, Any]] = None,
+        capacity: int = DEFAULT_HISTORY_LIMIT,
+    ) -> "ScoreHistory":
+        """Rebuild a history from stored scores and :meth:`stats_state`.
+
+        Without ``stats`` (files written before aggregates existed) the
+        aggregates are computed from ``scores``.
+        """
+        if not stats:
+            return cls(scores.tolist() if isinstance(scores, memoryview) else scores, capacity)
+        history = cls(capacity=capacity)
+        if isinstance(scores, memoryview):
+            # Binary files hand over a u16 view that can be copied in bulk.
+            retained = scores[-capacity:]
+            history._scores.frombytes(retained.cast("B"))
+        else:
+            retained = list(scores)[-capacity:]
+            history._scores.extend(retained)
+        history.count = stats.get("count", len(retained))
+        history.total = stats.get("total", sum(retained))
+        history.best = stats.get("best", max(retained, default=0))
+        history._histogram = {int(k): v for k, v in stats.get("histogram", {}).items()}
+        return history
+
+    # -- Recording -----------------------------------------------------------
+    def append(self, score: int) -> None:
+        """Record ``score``, dropping the oldest retained one when full."""
+        if not 0 <= score <= _MAX_SCORE:
+            raise ValueError(f"score must be between 0 and {_MAX_SCORE}")
+        if len(self._scores) < self.capacity:
+            self._scores.append(score)
+        else:
+            self._scores[self._start] = score
+            self._start = (self._start + 1) % self.capacity
+        self.count += 1
+        self.total += score
+        if score > self.best:
+            self.best = score
+        self._histogram[score] = self._histogram.get(score, 0) + 1
+
+    def extend(self, scores: Iterable[int]) -> None:
+        for score in scores:
+            self.append(score)
+
+    def merge(self, other: "ScoreHistory") -> None:
+        """Add ``other``'s aggregates and append its retained scores."""
+        count, total, best, histogram = self.count, self.total, self.best, dict(self._histogram)
+        self.extend(other)
+        self.count = count + other.count
+        self.total = total + other.total
+        self.best = max(best, other.best)
+        for score, n in other._histogram.items():
+            histogram[score] = histogram.get(score, 0) + n
+        self._histogram = histogram
+
+    # -- Statistics ----------------------------------------------------------
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def histogram(self) -> Dict[int, int]:
+        """How many recorded games ended at each score (level)."""
+        return dict(self._histogram)
+
+    def percentile(self, q: float) -> int:
+        """Nearest-rank percentile ``q`` (0-100) over every recorded score."""
+        if not self.count:
+            return 0
+        target = max(1, -(-q * self.count // 100))
+        seen = 0
+        for score in sorted(self._histogram):
+            seen += self._histogram[score]
+            if seen >= target:
+                return score
+        return self.best
+
+    def stats(self) -> Dict[str, Any]:
+        """Summary statistics computed from the aggregates."""
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "best": self.best,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "histogram": self.histogram,
+        }
+
+    def stats_state(self) -> Dict[str, Any]:
+        """JSON-serialisable aggregates understood by :meth:`restore`."""
+        return {
+            "count": self.count,
+            "total": self.total,
+            "best": self.best,
+            "histogram": {str(k): v for k, v in self._histogram.items()},
+        }
+
+    def to_array(self) -> array:
+        """Return the retained scores, oldest first, as a new ``array('H')``."""
+        return self._scores[self._start:] + self._scores[:self._start]
+
+    # -- Sequence behaviour --------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __iter__(self) -> Iterator[int]:
+        scores, start = self._scores, self._start
+        for i in range(len(scores)):
+            yield scores[(start + i) % len(scores)]
+
+    def __getitem__(self, index: int) -> int:
+        size = len(self._scores)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("history index out of range")
+        return self._scores[(self._start + index) % size]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (ScoreHistory, Sequence)):
+            return self.to_array().tolist() == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ScoreHistory({list(self)!r}, capacity={self.capacity})"
@@ -0,0 +1,183 @@
+"""In-memory leaderboard with logarithmic updates and rank lookups.
+
+:class:`Leaderboard` is an indexable skip list ordered by
+``(-high_score, name)``: best score first, ties broken alphabetically. Each
+link stores how many entries it skips, which makes positional queries
+(:meth:`Leaderboard.rank`, :meth:`Leaderboard.page`) as cheap as searches.
+"""
+
+import math
+import random
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+Entry = Tuple[str, int]
+
+_MAX_LEVELS = 32
+# Sorts after every real key (-score, name).
+_END_KEY = (math.inf, "")
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: Tuple[float, str], levels: int) -> None:
+        self.key = key
+        self.next: List[Optional["_Node"]] = [None] * levels
+        self.width = [1] * levels
+
+
+class Leaderboard:
+    """Sorted ``(name, high_score)`` entries supporting O(log n) updates.
+
+    :meth:`update`, :meth:`remove` and :meth:`rank` run in expected
+    O(log n); :meth:`top`, :meth:`page` and :meth:`neighbours` in
+    O(log n + k) for ``k`` returned entries.
+    """
+
+    def __init__(self, entries: Iterable[Entry] = (), seed: Optional[int] = None) -> None:
+        self._random = random.Random(seed)
+        self._end = _Node(_END_KEY, _MAX_LEVELS)
+        self.rebuild(entries)
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._scores
+
+    def __iter__(self) -> Iterator[Entry]:
+        node = self._head.next[0]
+        while node is not self._end:
+            yield node.key[1], -node.key[0]
+            node = node.next[0]
+
+    # -- Mutation ------------------------------------------------------------
+    def rebuild(self, entries: Iterable[Entry]) -> None:
+        """Replace the board with ``entries`` using one sort and a linear link pass."""
+        self._scores = dict(entries)
+        keys = sorted((-high_score, name) for name, high_score in self._scores.items())
+        self._head = _Node(_END_KEY, _MAX_LEVELS)
+        # Levels currently linked; higher head links are unused.
+        self._levels = 1
+        self._linked = len(keys)
+        last = [self._head] * _MAX_LEVELS
+        last_position = [0] * _MAX_LEVELS
+        for position, key in enumerate(keys, 1):
+            node = _Node(key, self._random_levels())
+            for level in range(len(node.next)):
+                last[level].next[level] = node
+                last[level].width[level] = position - last_position[level]
+                last[level] = node
+                last_position[level] = position
+            self._levels = max(self._levels, len(node.next))
+        for level in range(self._levels):
+            last[level].next[level] = self._end
+            last[level].width[level] = len(keys) + 1 - last_position[level]
+
+    def _random_levels(self) -> int:
+        return min(_MAX_LEVELS, 1 - int(math.log(1.0 - self._random.random(), 2.0)))
+
+    def update(self, name: str, high_score: int) -> None:
+        """Insert ``name`` or move it to its new ``high_score``."""
+        old = self._scores.get(name)
+        if old == high_score:
+            return
+        if old is not None:
+            self._unlink((-old, name))
+        self._insert((-high_score, name))
+        self._scores[name] = high_score
+
+    def remove(self, name: str) -> bool:
+        """Remove ``name``; returns ``False`` if it was not on the board."""
+        old = self._scores.pop(name, None)
+        if old is None:
+            return False
+        self._unlink((-old, name))
+        return True
+
+    def _insert(self, key: Tuple[float, str]) -> None:
+        levels = self._random_levels()
+        if levels > self._levels:
+            for level in range(self._levels, levels):
+                self._head.next[level] = self._end
+                self._head.width[level] = self._linked + 1
+            self._levels = levels
+        chain = [self._head] * self._levels
+        steps = [0] * self._levels
+        node = self._head
+        for level in reversed(range(self._levels)):
+            while node.next[level].key < key:
+                steps[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+        new = _Node(key, levels)
+        distance = 0
+        for level in range(levels):
+            prev = chain[level]
+            new.next[level] = prev.next[level]
+            prev.next[level] = new
+            new.width[level] = prev.width[level] - distance
+            prev.width[level] = distance + 1
+            distance += steps[level]
+        for level in range(levels, self._levels):
+            chain[level].width[level] += 1
+        self._linked += 1
+
+    def _unlink(self, key: Tuple[float, str]) -> None:
+        chain = [self._head] * self._levels
+        node = self._head
+        for level in reversed(range(self._levels)):
+            while node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+        target = chain[0].next[0]
+        for level in range(len(target.next)):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(len(target.next), self._levels):
+            chain[level].width[level] -= 1
+        self._linked -= 1
+
+    # -- Queries -------------------------------------------------------------
+    def rank(self, name: str) -> Optional[int]:
+        """Return the 1-based position of ``name`` or ``None``."""
+        high_score = self._scores.get(name)
+        if high_score is None:
+            return None
+        key = (-high_score, name)
+        node = self._head
+        position = 0
+        for level in reversed(range(self._levels)):
+            while node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        return position + 1
+
+    def page(self, offset: int, limit: int) -> List[Entry]:
+        """Return up to ``limit`` entries starting at 0-based ``offset``."""
+        if offset < 0 or limit <= 0 or offset >= len(self):
+            return []
+        node = self._head
+        remaining = offset + 1
+        for level in reversed(range(self._levels)):
+            while node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        entries: List[Entry] = []
+        while node is not self._end and len(entries) < limit:
+            entries.append((node.key[1], -node.key[0]))
+            node = node.next[0]
+        return entries
+
+    def top(self, k: int) -> List[Entry]:
+        """Return the ``k`` best entries."""
+        return self.page(0, k)
+
+    def neighbours(self, name: str, radius: int = 2) -> List[Entry]:
+        """Return ``name`` with up to ``radius`` entries either side of it."""
+        position = self.rank(name)
+        if position is None:
+            return []
+        start = max(0, position - 1 - radius)
+        return self.page(start, position - start + radius)
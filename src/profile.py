@@ -1,84 +1,463 @@
+import atexit
+import gzip
 import json
+import threading
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
+from typing import Callable, Dict, IO, Iterator, List, Any, Optional, Set, Tuple
+
+from . import metrics
+from .binfmt import choose_format, encode_profiles, iter_profile_records
+from .history import DEFAULT_HISTORY_LIMIT, ScoreHistory
+from .leaderboard import Leaderboard
+from .profile_index import IndexEntry, ProfileIndex, write_index
+from .storage import atomic_write_bytes, file_lock, file_stamp
+
+# Imports report progress (and let backends checkpoint) every this many profiles.
+IMPORT_CHUNK = 1000
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+def _encode_profiles(
+    records: List[Tuple[str, bytes, int]]
+) -> Tuple[bytes, List[IndexEntry]]:
+    """Serialise ``(name, json_bytes, high_score)`` records as ``profiles.json``.
+
+    Returns the document and the byte range of each profile's JSON object,
+    which is what the offset index stores.
+    """
+    parts = [b'{"profiles": {']
+    position = len(parts[0])
+    entries: List[IndexEntry] = []
+    for i, (name, raw, high_score) in enumerate(records):
+        key = ((", " if i else "") + json.dumps(name) + ": ").encode("utf-8")
+        position += len(key)
+        entries.append((name, position, len(raw), high_score))
+        parts += (key, raw)
+        position += len(raw)
+    parts.append(b"}}")
+    return b"".join(parts), entries
+
+
+def _open_dump(path: Path, mode: str) -> IO[str]:
+    """Open a profile dump for text ``mode`` ("r" or "w"), gzip-aware.
+
+    Writes are compressed when ``path`` ends in ``.gz``; reads detect gzip
+    from the file's magic bytes.
+    """
+    if mode == "w":
+        compressed = path.suffix == ".gz"
+    else:
+        with path.open("rb") as fh:
+            compressed = fh.read(2) == _GZIP_MAGIC
+    if compressed:
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return path.open(mode, encoding="utf-8")
+
+
+def _iter_dump(path: Path) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield ``(name, info)`` pairs from a profile dump.
+
+    Line-delimited dumps (one ``{"name": ..., ...}`` object per line) are
+    read one profile at a time; the original ``{"profiles": {...}}`` document
+    is parsed whole.
+    """
+    with _open_dump(path, "r") as fh:
+        first = fh.readline()
+        try:
+            record = json.loads(first)
+        except ValueError:
+            record = None
+        if isinstance(record, dict) and "name" in record and "profiles" not in record:
+            yield record.pop("name"), record
+            for line in fh:
+                if line.strip():
+                    record = json.loads(line)
+                    yield record.pop("name"), record
+        else:
+            data = json.loads(first + fh.read())
+            yield from data.get("profiles", {}).items()
 
 
 @dataclass
 class UserProfile:
-    """A single player's stored progress and settings."""
+    """A single player's stored progress and settings.
+
+    :attr:`history` retains only the most recent scores; all-time statistics
+    come from its running aggregates (see :meth:`ScoreHistory.stats`).
+    """
 
     name: str
     high_score: int = 0
-    history: List[int] = field(default_factory=list)
+    history: ScoreHistory = field(default_factory=ScoreHistory)
     settings: Dict[str, Any] = field(default_factory=dict)
 
+    def __post_init__(self) -> None:
+        if not isinstance(self.history, ScoreHistory):
+            self.history = ScoreHistory(self.history)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the stored representation used by ``profiles.json``."""
+        return {
+            "high_score": self.high_score,
+            "history": self.history.to_array().tolist(),
+            "stats": self.history.stats_state(),
+            "settings": self.settings,
+        }
+
+    @classmethod
+    def from_dict(
+        cls, name: str, info: Dict[str, Any], history_limit: int = DEFAULT_HISTORY_LIMIT
+    ) -> "UserProfile":
+        """Build a profile from its stored representation."""
+        return cls(
+            name=name,
+            high_score=info.get("high_score", 0),
+            history=ScoreHistory.restore(
+                info.get("history", []), info.get("stats"), history_limit
+            ),
+            settings=info.get("settings", {}),
+        )
+
 
 @dataclass
 class ProfileManager:
-    """Manage multiple :class:`UserProfile` instances."""
+    """Manage multiple :class:`UserProfile` instances.
+
+    High scores are mirrored in a :class:`~src.leaderboard.Leaderboard` that
+    the profile operations keep up to date, so leaderboard reads do not sort
+    every profile. Code that edits :attr:`profiles` directly should call
+    :meth:`rebuild_leaderboard` afterwards.
+
+    ``history_limit`` is the retention policy: how many recent scores each
+    profile keeps alongside its all-time aggregates.
+
+    Modified profiles are tracked as dirty and written by :meth:`flush`.
+    Updates made inside ``with manager.batch():`` are written once when the
+    outermost batch exits. With ``write_behind`` set to a number of seconds,
+    changes are instead flushed by a background timer and at interpreter
+    shutdown (or :meth:`close`).
+
+    Every save also writes an offset index (see :mod:`src.profile_index`).
+    With ``lazy=True``, :meth:`load` maps that index instead of parsing the
+    file and :meth:`get_profile` materialises profiles on first use, so
+    startup cost does not grow with the number of players. :attr:`profiles`
+    then only holds the profiles touched so far; use :meth:`iter_profiles`
+    to visit all of them.
+
+    ``file_format`` selects ``"json"`` or ``"binary"`` (see :mod:`src.binfmt`).
+    When ``None`` the format of an existing file is detected from its magic
+    bytes and new files use binary only for a ``.bin`` suffix. Lazy loading
+    applies to JSON files only.
+
+    Several processes may share one file. Saves take an advisory lock (see
+    :func:`~src.storage.file_lock`) and, if another process replaced the file
+    since this manager last read or wrote it, merge the disk copy first: the
+    scores, high score and settings changed here are applied on top of the
+    other process's profiles instead of overwriting them.
+    """
 
     file_path: Path = field(
         default_factory=lambda: Path(__file__).with_name("profiles.json")
     )
     profiles: Dict[str, UserProfile] = field(default_factory=dict)
+    history_limit: int = DEFAULT_HISTORY_LIMIT
+    write_behind: Optional[float] = None
+    lazy: bool = False
+    file_format: Optional[str] = None
+    _index: Optional[ProfileIndex] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _board_ready: bool = field(default=False, init=False, repr=False, compare=False)
+    _board: Leaderboard = field(
+        default_factory=Leaderboard, init=False, repr=False, compare=False
+    )
+    _dirty: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    # Scores recorded and profiles reset since the last write, replayed onto
+    # the disk copy when another process saved in between.
+    _pending: Dict[str, ScoreHistory] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _resets: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    _loaded: bool = field(default=False, init=False, repr=False, compare=False)
+    _disk_stamp: Optional[Tuple[int, int, int]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _batch_depth: int = field(default=0, init=False, repr=False, compare=False)
+    _timer: Optional[threading.Timer] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _lock: threading.RLock = field(
+        default_factory=threading.RLock, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        self.rebuild_leaderboard()
+        if self.write_behind is not None:
+            atexit.register(self.close)
 
     # -- Basic persistence -------------------------------------------------
+    @property
+    def index_path(self) -> Path:
+        """Path of the offset index written next to :attr:`file_path`."""
+        return self.file_path.with_name(self.file_path.name + ".idx")
+
+    @metrics.timed("profile_load_seconds", "Profile store load latency")
     def load(self) -> None:
-        """Load profile data from :attr:`file_path`."""
+        """Load profile data from :attr:`file_path`.
+
+        In lazy mode a valid index is mapped instead; without one (first run
+        or a file written elsewhere) the whole file is parsed as usual.
+        """
+        with self._lock, file_lock(self.file_path):
+            self._mark_clean()
+            self._close_index()
+            self._loaded = True
+            self._disk_stamp = file_stamp(self.file_path)
+            self._load_unlocked()
+
+    def _load_unlocked(self) -> None:
+        if choose_format(self.file_path, self.file_format) == "binary" and self.file_path.exists():
+            self.profiles = {
+                record.name: UserProfile(
+                    record.name,
+                    record.high_score,
+                    ScoreHistory.restore(record.history, record.stats, self.history_limit),
+                    record.settings,
+                )
+                for record in iter_profile_records(self.file_path.read_bytes())
+            }
+            self.rebuild_leaderboard()
+            return
+        if self.lazy:
+            self._index = ProfileIndex.open(self.index_path, self.file_path)
+            if self._index is not None:
+                self.profiles = {}
+                self._board_ready = False
+                return
         if self.file_path.exists():
             with self.file_path.open("r", encoding="utf-8") as fh:
                 data = json.load(fh)
             self.profiles = {
-                name: UserProfile(
-                    name=name,
-                    high_score=info.get("high_score", 0),
-                    history=info.get("history", []),
-                    settings=info.get("settings", {}),
-                )
+                name: UserProfile.from_dict(name, info, self.history_limit)
                 for name, info in data.get("profiles", {}).items()
             }
         else:
             self.profiles = {}
+        self.rebuild_leaderboard()
 
+    @metrics.timed("profile_save_seconds", "Profile store write latency")
     def save(self) -> None:
-        """Persist current profiles to :attr:`file_path`."""
-        data = {
-            "profiles": {
-                name: {
-                    "high_score": p.high_score,
-                    "history": p.history,
-                    "settings": p.settings,
-                }
-                for name, p in self.profiles.items()
-            }
-        }
-        with self.file_path.open("w", encoding="utf-8") as fh:
-            json.dump(data, fh)
+        """Persist current profiles to :attr:`file_path` and rewrite the index.
+
+        Profiles that were never materialised are copied byte for byte from
+        the previous file without being parsed.
+        """
+        with self._lock, file_lock(self.file_path):
+            cached = set(self.profiles)
+            merged = self._loaded and file_stamp(self.file_path) != self._disk_stamp
+            if merged:
+                self._merge_from_disk()
+            if choose_format(self.file_path, self.file_format) == "binary":
+                data = encode_profiles(self.iter_profiles())
+                self._close_index()
+                atomic_write_bytes(self.file_path, data)
+            else:
+                self._save_json()
+            self._disk_stamp = file_stamp(self.file_path)
+            self._mark_clean()
+            if merged and self._index is not None:
+                # Keep the lazy cache to what this process had touched.
+                for name in set(self.profiles) - cached - self._dirty:
+                    del self.profiles[name]
+                self._board_ready = False
+
+    def _save_json(self) -> None:
+        records = [
+            (p.name, json.dumps(p.to_dict()).encode("utf-8"), p.high_score)
+            for p in self.profiles.values()
+        ]
+        if self._index is not None:
+            index = self._index
+            records.extend(
+                (index.name(i), index.raw(i), index.high_score(i))
+                for i in index
+                if index.name(i) not in self.profiles
+            )
+        data, entries = _encode_profiles(records)
+        self._close_index()
+        atomic_write_bytes(self.file_path, data)
+        write_index(self.index_path, self.file_path, entries)
+        if self.lazy:
+            self._index = ProfileIndex.open(self.index_path, self.file_path)
+
+    def _merge_from_disk(self) -> None:
+        """Rebase this process's changes onto the profiles now on disk.
+
+        Clean profiles take the disk version. Dirty ones start from the disk
+        version (or an empty profile if reset here) and get the scores
+        recorded since the last write, the higher high score and our settings.
+        """
+        disk = ProfileManager(
+            self.file_path, history_limit=self.history_limit, file_format=self.file_format
+        )
+        disk._load_unlocked()
+        ours = self.profiles
+        self._close_index()
+        self.profiles = disk.profiles
+        for name in self._dirty:
+            mine = ours.get(name)
+            if mine is None:
+                continue
+            base = self.profiles.get(name)
+            if base is None or name in self._resets:
+                base = self._new_profile(name)
+            pending = self._pending.get(name)
+            if pending is not None:
+                base.history.merge(pending)
+            base.high_score = max(base.high_score, mine.high_score)
+            base.settings.update(mine.settings)
+            self.profiles[name] = base
+        self.rebuild_leaderboard()
+
+    def _mark_clean(self) -> None:
+        self._dirty.clear()
+        self._pending.clear()
+        self._resets.clear()
+
+    def _close_index(self) -> None:
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+
+    def _materialise(self, name: str) -> Optional[UserProfile]:
+        """Parse ``name``'s profile from the mapped index, if it has one."""
+        if self._index is None:
+            return None
+        i = self._index.find(name)
+        if i is None:
+            return None
+        return UserProfile.from_dict(name, json.loads(self._index.raw(i)), self.history_limit)
+
+    def _has_profile(self, name: str) -> bool:
+        return name in self.profiles or (self._index is not None and name in self._index)
+
+    # -- Write coalescing --------------------------------------------------
+    def mark_dirty(self, name: str) -> None:
+        """Flag ``name`` as modified, e.g. after editing its settings in place."""
+        self._dirty.add(name)
+        self._changed()
+
+    @property
+    def dirty(self) -> bool:
+        """``True`` while there are changes that have not been written."""
+        return bool(self._dirty)
+
+    def _changed(self) -> None:
+        """Write pending changes now unless a batch or write-behind defers them."""
+        if self._batch_depth:
+            return
+        if self.write_behind is not None:
+            if self._timer is None:
+                self._timer = threading.Timer(self.write_behind, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+            return
+        self.flush()
+
+    def _timed_flush(self) -> None:
+        with self._lock:
+            self._timer = None
+            self.flush()
+
+    def flush(self) -> None:
+        """Write dirty profiles, if any."""
+        with self._lock:
+            if self._dirty:
+                self._write_dirty()
+
+    def _write_dirty(self) -> None:
+        """Persist the dirty profiles; the JSON file is rewritten as a whole."""
+        self.save()
+
+    @contextmanager
+    def batch(self) -> Iterator["ProfileManager"]:
+        """Coalesce every update in the block into a single write on exit."""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self._changed()
+
+    def close(self) -> None:
+        """Cancel the write-behind timer and flush pending changes."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self.flush()
+
+    def iter_profiles(self) -> Iterator[UserProfile]:
+        """Yield every stored profile.
+
+        Storage backends that do not keep all profiles in :attr:`profiles`
+        override this so exports still see the complete data set. In lazy
+        mode profiles that are not cached are parsed one at a time and not
+        added to the cache.
+        """
+        yield from list(self.profiles.values())
+        index = self._index
+        if index is not None:
+            for i in index:
+                name = index.name(i)
+                if name not in self.profiles:
+                    yield UserProfile.from_dict(name, json.loads(index.raw(i)), self.history_limit)
 
     # -- Profile operations -----------------------------------------------
     def get_profile(self, name: str) -> UserProfile:
         """Return existing profile or create a new one."""
         profile = self.profiles.get(name)
         if profile is None:
-            profile = UserProfile(name)
-            self.profiles[name] = profile
+            with self._lock:
+                profile = self._materialise(name)
+                if profile is None:
+                    profile = self._new_profile(name)
+                    self._dirty.add(name)
+                self.profiles[name] = profile
+                self._score_changed(profile)
         return profile
 
+    def _new_profile(self, name: str) -> UserProfile:
+        return UserProfile(name, history=ScoreHistory(capacity=self.history_limit))
+
     def record_score(self, name: str, score: int) -> bool:
         """Record ``score`` for ``name`` and update high score.
 
         Returns ``True`` if ``score`` is a new high score for the player.
         """
-        profile = self.get_profile(name)
-        profile.history.append(score)
-        new_high = False
-        if score > profile.high_score:
-            profile.high_score = score
-            new_high = True
-        self.save()
+        with self._lock:
+            profile = self.get_profile(name)
+            profile.history.append(score)
+            self._pending_history(name).append(score)
+            new_high = False
+            if score > profile.high_score:
+                profile.high_score = score
+                new_high = True
+                self._score_changed(profile)
+            self.mark_dirty(name)
         return new_high
 
+    def update_settings(self, name: str, settings: Dict[str, Any]) -> None:
+        """Merge ``settings`` into ``name``'s profile settings."""
+        with self._lock:
+            self.get_profile(name).settings.update(settings)
+            self.mark_dirty(name)
+
     def reset_profile(self, name: str) -> bool:
         """Reset ``name`` back to an empty profile.
 
@@ -86,45 +465,134 @@ class ProfileManager:
         are left untouched and return ``False`` so callers can differentiate
         between "reset" and "nothing to do" states.
         """
-        if name not in self.profiles:
+        if not self._has_profile(name):
             return False
-        self.profiles[name] = UserProfile(name)
-        self.save()
+        with self._lock:
+            self.profiles[name] = self._new_profile(name)
+            self._resets.add(name)
+            self._pending.pop(name, None)
+            self._score_changed(self.profiles[name])
+            self.mark_dirty(name)
         return True
 
+    def _pending_history(self, name: str) -> ScoreHistory:
+        pending = self._pending.get(name)
+        if pending is None:
+            pending = self._pending[name] = ScoreHistory(capacity=self.history_limit)
+        return pending
+
+    # -- Leaderboard -------------------------------------------------------
+    def _score_changed(self, profile: UserProfile) -> None:
+        """Hook called whenever ``profile.high_score`` may have changed."""
+        if self._board_ready:
+            self._board.update(profile.name, profile.high_score)
+
+    @metrics.timed("leaderboard_rebuild_seconds", "Leaderboard rebuild latency")
+    def rebuild_leaderboard(self) -> None:
+        """Rebuild the leaderboard from :attr:`profiles` (and the lazy index)."""
+        scores = {p.name: p.high_score for p in self.profiles.values()}
+        if self._index is not None:
+            for i in self._index:
+                scores.setdefault(self._index.name(i), self._index.high_score(i))
+        self._board.rebuild(scores.items())
+        self._board_ready = True
+
+    @property
+    def board(self) -> Leaderboard:
+        """The leaderboard, built on first use after a lazy load."""
+        if not self._board_ready:
+            self.rebuild_leaderboard()
+        return self._board
+
     def leaderboard(self) -> List[Tuple[str, int]]:
-        """Return leaderboard as list of ``(name, high_score)`` tuples."""
-        return sorted(
-            ((p.name, p.high_score) for p in self.profiles.values()),
-            key=lambda item: item[1],
-            reverse=True,
-        )
+        """Return leaderboard as list of ``(name, high_score)`` tuples.
+
+        Entries are ordered by high score, ties broken by name.
+        """
+        return self.board.top(len(self.board))
+
+    @metrics.timed("leaderboard_top_seconds", "Leaderboard top-k query latency")
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        """Return the ``k`` best ``(name, high_score)`` entries."""
+        return self.board.top(k)
+
+    def rank(self, name: str) -> Optional[int]:
+        """Return the 1-based leaderboard position of ``name`` or ``None``."""
+        return self.board.rank(name)
+
+    def page(self, offset: int, limit: int) -> List[Tuple[str, int]]:
+        """Return ``limit`` leaderboard entries starting at 0-based ``offset``."""
+        return self.board.page(offset, limit)
+
+    def neighbours(self, name: str, radius: int = 2) -> List[Tuple[str, int]]:
+        """Return ``name``'s entry with up to ``radius`` entries either side."""
+        return self.board.neighbours(name, radius)
 
     # -- Import / Export ---------------------------------------------------
     def export_data(self, path: Path) -> None:
-        """Export all profile data to ``path``."""
-        data = {
-            "profiles": {
-                name: {
-                    "high_score": p.high_score,
-                    "history": p.history,
-                    "settings": p.settings,
-                }
-                for name, p in self.profiles.items()
-            }
-        }
-        with path.open("w", encoding="utf-8") as fh:
-            json.dump(data, fh)
+        """Export all profile data to ``path``.
+
+        ``.jsonl`` paths are streamed with one JSON object per profile per
+        line; any other path gets the ``{"profiles": {...}}`` document. A
+        trailing ``.gz`` compresses either format.
+        """
+        with _open_dump(path, "w") as fh:
+            if ".jsonl" in path.suffixes:
+                for p in self.iter_profiles():
+                    fh.write(json.dumps({"name": p.name, **p.to_dict()}) + "\n")
+            else:
+                data = {"profiles": {p.name: p.to_dict() for p in self.iter_profiles()}}
+                json.dump(data, fh)
+
+    def import_data(
+        self, path: Path, progress: Optional[Callable[[int], None]] = None
+    ) -> int:
+        """Import profile data from ``path`` and merge with existing data.
+
+        Both export formats are accepted (gzip-compressed or not). Line-based
+        dumps are merged profile by profile. ``progress`` is called with the
+        running count every :data:`IMPORT_CHUNK` profiles and once at the end.
+        Returns the number of imported profiles.
 
-    def import_data(self, path: Path) -> None:
-        """Import profile data from ``path`` and merge with existing data."""
+        Memory stays constant only with the SQLite backend, which writes and
+        evicts each chunk. The JSON and binary stores keep every profile in
+        :attr:`profiles` plus a pending copy of each imported history until
+        the single write at the end, so their memory grows with the dump.
+        """
         if not path.exists():
-            return
-        with path.open("r", encoding="utf-8") as fh:
-            data = json.load(fh)
-        for name, info in data.get("profiles", {}).items():
-            profile = self.get_profile(name)
-            profile.high_score = max(profile.high_score, info.get("high_score", 0))
-            profile.history.extend(info.get("history", []))
-            profile.settings.update(info.get("settings", {}))
-        self.save()
+            return 0
+        count = 0
+        fresh: List[str] = []
+        with self.batch():
+            for name, info in _iter_dump(path):
+                if name not in self.profiles:
+                    fresh.append(name)
+                self._merge_profile(name, info)
+                count += 1
+                if count % IMPORT_CHUNK == 0:
+                    self._import_checkpoint(fresh)
+                    fresh = []
+                    if progress is not None:
+                        progress(count)
+            self._import_checkpoint(fresh)
+        if progress is not None and count % IMPORT_CHUNK:
+            progress(count)
+        return count
+
+    def _merge_profile(self, name: str, info: Dict[str, Any]) -> None:
+        profile = self.get_profile(name)
+        profile.high_score = max(profile.high_score, info.get("high_score", 0))
+        imported = ScoreHistory.restore(info.get("history", []), info.get("stats"), self.history_limit)
+        profile.history.merge(imported)
+        self._pending_history(name).merge(imported)
+        profile.settings.update(info.get("settings", {}))
+        self._score_changed(profile)
+        self.mark_dirty(name)
+
+    def _import_checkpoint(self, fresh: List[str]) -> None:
+        """Hook run after each imported chunk.
+
+        ``fresh`` names the profiles the chunk loaded that were not cached
+        before. The JSON store keeps everything in memory and rewrites the
+        whole file on each write, so it writes once at the end instead.
+        """
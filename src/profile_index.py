@@ -0,0 +1,128 @@
+"""On-disk offset index for ``profiles.json``.
+
+:meth:`ProfileManager.save <src.profile.ProfileManager.save>` writes
+``profiles.json.idx`` next to the data file. For every profile the index
+records where its JSON object starts and ends in the data file together with
+its high score, sorted by a 64-bit hash of the name. A lazily loading
+manager memory-maps both files, finds a player with a binary search over the
+fixed-size records and parses just that player's slice of the data file.
+
+Layout (little endian)::
+
+    header   magic "MMIX", version u16, reserved u16, count u32,
+             data file size u64, data file mtime_ns u64
+    records  count x (name hash u64, offset u64, length u32,
+             high score u32, name offset u32, name length u16, 2 pad bytes)
+    names    UTF-8 names referenced by the records
+
+The data file's size and mtime are checked on open so an index left behind
+by a different writer is ignored instead of returning wrong slices.
+"""
+
+import hashlib
+import mmap
+import struct
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from .storage import atomic_write_bytes
+
+_MAGIC = b"MMIX"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHIQQ")
+_RECORD = struct.Struct("<QQIIIH2x")
+
+# (name, offset, length, high_score) of one profile inside the data file.
+IndexEntry = Tuple[str, int, int, int]
+
+
+def name_hash(name: str) -> int:
+    """Stable 64-bit hash used to order index records."""
+    return int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def write_index(path: Path, data_path: Path, entries: List[IndexEntry]) -> None:
+    """Write the index for ``entries`` describing the freshly saved ``data_path``."""
+    stat = data_path.stat()
+    keyed = sorted(((name_hash(name), name, offset, length, high) for name, offset, length, high in entries))
+    records = bytearray()
+    names = bytearray()
+    for key, name, offset, length, high in keyed:
+        encoded = name.encode("utf-8")
+        records += _RECORD.pack(key, offset, length, high, len(names), len(encoded))
+        names += encoded
+    header = _HEADER.pack(_MAGIC, _VERSION, 0, len(keyed), stat.st_size, stat.st_mtime_ns)
+    atomic_write_bytes(path, header + bytes(records) + bytes(names))
+
+
+class ProfileIndex:
+    """Read-only view of an index and its data file through ``mmap``."""
+
+    def __init__(self, index_map: mmap.mmap, data_map: mmap.mmap, count: int) -> None:
+        self._index = index_map
+        self._data = data_map
+        self._count = count
+        self._names_start = _HEADER.size + count * _RECORD.size
+
+    @classmethod
+    def open(cls, path: Path, data_path: Path) -> Optional["ProfileIndex"]:
+        """Map ``path`` and ``data_path``; ``None`` if the index is missing or stale."""
+        if not path.exists() or not data_path.exists():
+            return None
+        stat = data_path.stat()
+        with path.open("rb") as fh:
+            if fh.read(_HEADER.size)[:4] != _MAGIC:
+                return None
+            index_map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count, size, mtime_ns = _HEADER.unpack_from(index_map)
+        if version != _VERSION or size != stat.st_size or mtime_ns != stat.st_mtime_ns or not size:
+            index_map.close()
+            return None
+        with data_path.open("rb") as fh:
+            data_map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(index_map, data_map, count)
+
+    def close(self) -> None:
+        self._index.close()
+        self._data.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and self.find(name) is not None
+
+    def _record(self, i: int) -> Tuple[int, int, int, int, int, int]:
+        return _RECORD.unpack_from(self._index, _HEADER.size + i * _RECORD.size)
+
+    def name(self, i: int) -> str:
+        *_, name_offset, name_length = self._record(i)
+        start = self._names_start + name_offset
+        return self._index[start:start + name_length].decode("utf-8")
+
+    def high_score(self, i: int) -> int:
+        return self._record(i)[3]
+
+    def raw(self, i: int) -> bytes:
+        """Return record ``i``'s JSON object bytes from the data file."""
+        _, offset, length, *_ = self._record(i)
+        return self._data[offset:offset + length]
+
+    def find(self, name: str) -> Optional[int]:
+        """Binary-search the records for ``name``."""
+        key = name_hash(name)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._record(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        while lo < self._count and self._record(lo)[0] == key:
+            if self.name(lo) == name:
+                return lo
+            lo += 1
+        return None
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(self._count))
@@ -0,0 +1,221 @@
+"""Hash-sharded storage for :class:`~src.profile.ProfileManager`.
+
+Profiles are spread over ``shards`` files in one directory, keyed by the
+CRC-32 of the player name::
+
+    profiles.d/
+        shards.json         {"shards": 16}
+        shard-000.json
+        ...
+        shard-015.json
+
+Flushing rewrites only the shards holding dirty profiles, so writers that
+touch different players rarely contend on the same file. Full loads and
+exports work on every shard in parallel and merge the results. Threads are
+the default. With ``processes=True`` the work runs in a process pool
+instead, so parsing and encoding use several cores. The leaderboard is built
+in this process with one sort, like :class:`~src.profile.ProfileManager`.
+"""
+
+import json
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from . import metrics
+from .profile import ProfileManager, UserProfile, _open_dump
+from .storage import atomic_write_text
+
+DEFAULT_SHARDS = 16
+MANIFEST = "shards.json"
+
+
+def shard_of(name: str, shards: int) -> int:
+    """Return the shard number ``name`` is stored in."""
+    return zlib.crc32(name.encode("utf-8")) % shards
+
+
+class _ShardStore(ProfileManager):
+    """One shard file; the owning manager keeps the only leaderboard."""
+
+    # Timed once for the whole sharded load/save, not per shard.
+    load = ProfileManager.load.__wrapped__
+    save = ProfileManager.save.__wrapped__
+
+    def _score_changed(self, profile: UserProfile) -> None:
+        pass
+
+    def rebuild_leaderboard(self) -> None:
+        pass
+
+
+def _load_shard(
+    path: Path, history_limit: int, file_format: Optional[str]
+) -> Tuple[Optional[Tuple[int, int, int]], Dict[str, UserProfile]]:
+    """Process-pool worker: load one shard, return its file stamp and profiles."""
+    store = _ShardStore(path, history_limit=history_limit, file_format=file_format)
+    store.load()
+    return store._disk_stamp, store.profiles
+
+
+def _encode_shard(profiles: List[UserProfile], lines: bool) -> str:
+    if lines:
+        return "".join(json.dumps({"name": p.name, **p.to_dict()}) + "\n" for p in profiles)
+    return ", ".join(f"{json.dumps(p.name)}: {json.dumps(p.to_dict())}" for p in profiles)
+
+
+@dataclass
+class ShardedProfileManager(ProfileManager):
+    """:class:`ProfileManager` storing profiles in ``shards`` hash-keyed files.
+
+    :attr:`file_path` is the shard directory. The shard count is recorded in
+    its manifest on the first save and takes precedence over ``shards`` when
+    an existing directory is loaded. ``workers`` bounds the pool size
+    (``None`` lets :mod:`concurrent.futures` choose). Each shard file is
+    written with the same locking and read-merge-write as a plain
+    ``profiles.json``. Lazy loading is not used for shards.
+    """
+
+    file_path: Path = field(
+        default_factory=lambda: Path(__file__).with_name("profiles.d")
+    )
+    shards: int = DEFAULT_SHARDS
+    workers: Optional[int] = None
+    processes: bool = False
+    _stores: List[ProfileManager] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.shards < 1:
+            raise ValueError("shards must be at least 1")
+        super().__post_init__()
+
+    @property
+    def manifest_path(self) -> Path:
+        """Path of the manifest recording the shard count."""
+        return self.file_path / MANIFEST
+
+    def shard_path(self, shard: int) -> Path:
+        """Path of shard file number ``shard``."""
+        suffix = ".bin" if self.file_format == "binary" else ".json"
+        return self.file_path / f"shard-{shard:03d}{suffix}"
+
+    def _pool(self) -> Executor:
+        if self.processes:
+            return ProcessPoolExecutor(self.workers)
+        return ThreadPoolExecutor(self.workers)
+
+    def _open_stores(self) -> None:
+        if self.manifest_path.exists():
+            self.shards = json.loads(self.manifest_path.read_text(encoding="utf-8"))["shards"]
+        self._stores = [
+            _ShardStore(self.shard_path(i), history_limit=self.history_limit, file_format=self.file_format)
+            for i in range(self.shards)
+        ]
+
+    def _groups(self) -> List[List[UserProfile]]:
+        """Bucket the cached profiles by shard."""
+        groups: List[List[UserProfile]] = [[] for _ in range(self.shards)]
+        for profile in self.profiles.values():
+            groups[shard_of(profile.name, self.shards)].append(profile)
+        return groups
+
+    # -- Basic persistence -------------------------------------------------
+    @metrics.timed("profile_load_seconds", "Profile store load latency")
+    def load(self) -> None:
+        """Load every shard in parallel and merge them into :attr:`profiles`."""
+        with self._lock:
+            self._mark_clean()
+            # Shard locks live next to the shard files.
+            self.file_path.mkdir(parents=True, exist_ok=True)
+            self._open_stores()
+            stores = self._stores
+            with self._pool() as pool:
+                if self.processes:
+                    results = pool.map(
+                        _load_shard,
+                        [store.file_path for store in stores],
+                        repeat(self.history_limit),
+                        repeat(self.file_format),
+                    )
+                    for store, (stamp, profiles) in zip(stores, results):
+                        store.profiles = profiles
+                        store._loaded = True
+                        store._disk_stamp = stamp
+                else:
+                    list(pool.map(_ShardStore.load, stores))
+            self.profiles = {}
+            for store in stores:
+                self.profiles.update(store.profiles)
+            self.rebuild_leaderboard()
+
+    @metrics.timed("profile_save_seconds", "Profile store write latency")
+    def save(self) -> None:
+        """Write every shard, merging changes other processes made meanwhile.
+
+        Like :meth:`ProfileManager.save`, this writes every cached profile,
+        including ones edited in :attr:`profiles` directly.
+        """
+        with self._lock:
+            if not self._stores:
+                self._open_stores()
+            for name, profile in self.profiles.items():
+                self._stores[shard_of(name, self.shards)].profiles[name] = profile
+            self._write_shards(range(self.shards))
+
+    @metrics.timed("profile_save_seconds", "Profile store write latency")
+    def _write_dirty(self) -> None:
+        """Write only the shards that hold dirty profiles."""
+        if not self._stores:
+            self._open_stores()
+        self._write_shards({shard_of(name, self.shards) for name in self._dirty})
+
+    def _write_shards(self, shards: Iterable[int]) -> None:
+        self.file_path.mkdir(parents=True, exist_ok=True)
+        if not self.manifest_path.exists():
+            atomic_write_text(self.manifest_path, json.dumps({"shards": self.shards}))
+        # Hand this manager's changes to the shard stores that own them.
+        for name in self._dirty:
+            profile = self.profiles.get(name)
+            if profile is None:
+                continue
+            store = self._stores[shard_of(name, self.shards)]
+            store.profiles[name] = profile
+            store._dirty.add(name)
+            if name in self._pending:
+                store._pending[name] = self._pending[name]
+            if name in self._resets:
+                store._resets.add(name)
+        stores = [self._stores[i] for i in sorted(shards)]
+        if len(stores) == 1:
+            stores[0].save()
+        else:
+            # Shard files are independent; overlap their I/O and lock waits.
+            with ThreadPoolExecutor(self.workers) as pool:
+                list(pool.map(_ShardStore.save, stores))
+        self._mark_clean()
+        # Pick up profiles other processes wrote to the same shards.
+        for store in stores:
+            for name, profile in store.profiles.items():
+                if self.profiles.get(name) is not profile:
+                    self.profiles[name] = profile
+                    self._score_changed(profile)
+
+    # -- Import / Export ---------------------------------------------------
+    def export_data(self, path: Path) -> None:
+        """Export all profiles, encoding each shard in parallel.
+
+        Formats follow :meth:`ProfileManager.export_data`.
+        """
+        lines = ".jsonl" in path.suffixes
+        with self._pool() as pool:
+            chunks = list(pool.map(_encode_shard, self._groups(), repeat(lines)))
+        with _open_dump(path, "w") as fh:
+            if lines:
+                fh.writelines(chunks)
+            else:
+                fh.write('{"profiles": {' + ", ".join(c for c in chunks if c) + "}}")
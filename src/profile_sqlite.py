@@ -0,0 +1,270 @@
+"""SQLite storage backend for :class:`~src.profile.ProfileManager`.
+
+The backend keeps the :class:`ProfileManager` API but stores one row per
+player in a SQLite database running in WAL mode. Profiles are read on demand
+by :meth:`SQLiteProfileManager.get_profile`, :meth:`record_score` upserts a
+single row, and leaderboard queries walk an index on ``high_score`` instead
+of sorting every profile.
+
+Existing ``profiles.json`` files can be migrated with::
+
+    python -m src.profile_sqlite src/profiles.json src/profiles.db
+"""
+
+import argparse
+import json
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from . import metrics
+from .history import ScoreHistory
+from .profile import ProfileManager, UserProfile
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    name TEXT PRIMARY KEY,
+    high_score INTEGER NOT NULL DEFAULT 0,
+    history TEXT NOT NULL DEFAULT '[]',
+    settings TEXT NOT NULL DEFAULT '{}',
+    stats TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS profiles_by_high_score ON profiles (high_score DESC, name);
+"""
+
+_UPSERT = """
+INSERT INTO profiles (name, high_score, history, settings, stats) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(name) DO UPDATE SET
+    high_score = excluded.high_score,
+    history = excluded.history,
+    settings = excluded.settings,
+    stats = excluded.stats
+"""
+
+_COLUMNS = "name, high_score, history, settings, stats"
+
+# Leaderboard order: highest score first, ties broken by name.
+_ORDER = "ORDER BY high_score DESC, name"
+
+
+@dataclass
+class SQLiteProfileManager(ProfileManager):
+    """:class:`ProfileManager` backed by a SQLite database.
+
+    :attr:`profiles` acts as a cache of the profiles touched in this process;
+    the database is the source of truth for the leaderboard and exports.
+    Flushing writes only the rows of dirty profiles, and leaderboard reads
+    flush pending changes first so they always see this process's updates.
+    Concurrent processes are serialised by SQLite's own locking, so no file
+    lock is taken; each process upserts whole rows for the profiles it owns.
+    """
+
+    file_path: Path = field(
+        default_factory=lambda: Path(__file__).with_name("profiles.db")
+    )
+    _conn: Optional[sqlite3.Connection] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Open (once) and return the database connection."""
+        if self._conn is None:
+            # Write-behind flushes run on a timer thread; access is serialised
+            # by the manager's lock.
+            conn = sqlite3.connect(str(self.file_path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(profiles)")}
+            if "stats" not in columns:
+                # Databases created before history aggregates were stored.
+                conn.execute("ALTER TABLE profiles ADD COLUMN stats TEXT NOT NULL DEFAULT '{}'")
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """Flush pending changes and close the database connection."""
+        super().close()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # -- Basic persistence -------------------------------------------------
+    @metrics.timed("profile_load_seconds", "Profile store load latency")
+    def load(self) -> None:
+        """Open the database and drop cached profiles.
+
+        Rows are only materialised when :meth:`get_profile` asks for them.
+        """
+        self.connection
+        self.profiles = {}
+        self._mark_clean()
+
+    @metrics.timed("profile_save_seconds", "Profile store write latency")
+    def save(self) -> None:
+        """Upsert every cached profile in a single transaction."""
+        with self._lock:
+            self._upsert(self.profiles.values())
+            self._mark_clean()
+
+    @metrics.timed("profile_save_seconds", "Profile store write latency")
+    def _write_dirty(self) -> None:
+        """Upsert only the dirty profiles."""
+        self._upsert([self.profiles[name] for name in self._dirty if name in self.profiles])
+        self._mark_clean()
+
+    def _upsert(self, profiles: Iterable[UserProfile]) -> None:
+        rows = [
+            (
+                p.name,
+                p.high_score,
+                json.dumps(list(p.history)),
+                json.dumps(p.settings),
+                json.dumps(p.history.stats_state()),
+            )
+            for p in profiles
+        ]
+        with self.connection:
+            self.connection.executemany(_UPSERT, rows)
+
+    def _from_row(self, row: Tuple[str, int, str, str, str]) -> UserProfile:
+        name, high_score, history, settings, stats = row
+        return UserProfile(
+            name,
+            high_score,
+            ScoreHistory.restore(json.loads(history), json.loads(stats), self.history_limit),
+            json.loads(settings),
+        )
+
+    def _fetch(self, name: str) -> Optional[UserProfile]:
+        row = self.connection.execute(
+            f"SELECT {_COLUMNS} FROM profiles WHERE name = ?",
+            (name,),
+        ).fetchone()
+        return self._from_row(row) if row else None
+
+    def iter_profiles(self) -> Iterator[UserProfile]:
+        """Yield every stored profile, preferring cached copies."""
+        self.flush()
+        cursor = self.connection.execute(
+            f"SELECT {_COLUMNS} FROM profiles"
+        )
+        for row in cursor:
+            yield self.profiles.get(row[0]) or self._from_row(row)
+
+    def _fetch_high_score(self, name: str) -> Optional[int]:
+        row = self.connection.execute(
+            "SELECT high_score FROM profiles WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0] if row else None
+
+    # -- Profile operations -----------------------------------------------
+    def get_profile(self, name: str) -> UserProfile:
+        """Return existing profile or create a new (dirty) one."""
+        profile = self.profiles.get(name)
+        if profile is None:
+            with self._lock:
+                profile = self._fetch(name)
+                if profile is None:
+                    profile = self._new_profile(name)
+                    self._dirty.add(name)
+                self.profiles[name] = profile
+        return profile
+
+    def reset_profile(self, name: str) -> bool:
+        """Reset ``name`` back to an empty profile if it exists."""
+        if name not in self.profiles and self._fetch_high_score(name) is None:
+            return False
+        with self._lock:
+            self.profiles[name] = self._new_profile(name)
+            self.mark_dirty(name)
+        return True
+
+    def _score_changed(self, profile: UserProfile) -> None:
+        """The ``high_score`` index replaces the in-memory leaderboard."""
+
+    def rebuild_leaderboard(self) -> None:
+        """Nothing to rebuild; the database index is always current."""
+
+    def leaderboard(self) -> List[Tuple[str, int]]:
+        """Return leaderboard as list of ``(name, high_score)`` tuples."""
+        self.flush()
+        return self.connection.execute(f"SELECT name, high_score FROM profiles {_ORDER}").fetchall()
+
+    @metrics.timed("leaderboard_top_seconds", "Leaderboard top-k query latency")
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        """Return the ``k`` best ``(name, high_score)`` entries via the index."""
+        self.flush()
+        return self.connection.execute(
+            f"SELECT name, high_score FROM profiles {_ORDER} LIMIT ?", (k,)
+        ).fetchall()
+
+    def page(self, offset: int, limit: int) -> List[Tuple[str, int]]:
+        """Return ``limit`` entries starting at 0-based ``offset``."""
+        self.flush()
+        return self.connection.execute(
+            f"SELECT name, high_score FROM profiles {_ORDER} LIMIT ? OFFSET ?",
+            (limit, offset),
+        ).fetchall()
+
+    def neighbours(self, name: str, radius: int = 2) -> List[Tuple[str, int]]:
+        """Return ``name``'s entry with up to ``radius`` entries either side."""
+        position = self.rank(name)
+        if position is None:
+            return []
+        start = max(0, position - 1 - radius)
+        return self.page(start, position - start + radius)
+
+    def rank(self, name: str) -> Optional[int]:
+        """Return the 1-based leaderboard position of ``name`` or ``None``."""
+        self.flush()
+        high_score = self._fetch_high_score(name)
+        if high_score is None:
+            return None
+        (ahead,) = self.connection.execute(
+            "SELECT COUNT(*) FROM profiles WHERE high_score > ? OR (high_score = ? AND name < ?)",
+            (high_score, high_score, name),
+        ).fetchone()
+        return ahead + 1
+
+    def _import_checkpoint(self, fresh: List[str]) -> None:
+        """Write the imported chunk and evict it from the cache.
+
+        This keeps imports at constant memory however large the dump is.
+        """
+        self._write_dirty()
+        for name in fresh:
+            self.profiles.pop(name, None)
+
+    # -- Migration ---------------------------------------------------------
+    def migrate_from_json(self, path: Path) -> int:
+        """Copy every profile from a ``profiles.json`` file into the database.
+
+        Existing rows with the same name are overwritten. Returns the number of
+        migrated profiles.
+        """
+        source = ProfileManager(path, history_limit=self.history_limit)
+        source.load()
+        self._upsert(source.profiles.values())
+        for name in source.profiles:
+            self.profiles.pop(name, None)
+        return len(source.profiles)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Migrate a JSON profile file into a SQLite database."""
+    parser = argparse.ArgumentParser(description="Migrate profiles.json to SQLite")
+    parser.add_argument("source", type=Path, help="existing profiles.json")
+    parser.add_argument("target", type=Path, help="SQLite database to create or update")
+    args = parser.parse_args(argv)
+    manager = SQLiteProfileManager(args.target)
+    manager.load()
+    count = manager.migrate_from_json(args.source)
+    manager.close()
+    print(f"Migrated {count} profiles to {args.target}")
+
+
+if __name__ == "__main__":
+    main()
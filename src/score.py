@@ -1,55 +1,209 @@
 import json
+import os
+import threading
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import List
+from typing import Optional, Tuple
+
+from . import metrics
+from .binfmt import choose_format, decode_scores, encode_scores
+from .history import DEFAULT_HISTORY_LIMIT, ScoreHistory
+from .storage import atomic_write_bytes, file_lock, file_stamp
+
 
 @dataclass
 class ScoreManager:
-    """Manage game scores stored in a JSON file.
+    """Manage game scores stored in a JSON snapshot plus an append-only log.
 
-    The data layout is:
+    The snapshot layout is:
     {
         "high_score": int,
-        "history": [int, ...]
+        "history": [int, ...],
+        "stats": {"count": int, "total": int, "best": int, "histogram": {...}},
+        "seq": int
     }
+
+    ``history`` keeps the latest ``history_limit`` scores; ``stats`` holds the
+    all-time aggregates behind :meth:`ScoreHistory.stats`.
+
+    Each :meth:`record` appends one ``{"seq": int, "score": int}`` line to
+    ``<file_path>.log`` instead of rewriting the snapshot. :meth:`load` reads the
+    snapshot and replays only log records whose ``seq`` is newer than the
+    snapshot's. Once ``compact_every`` records have accumulated the log is
+    folded into a fresh snapshot on a background thread; pass ``None`` to only
+    compact on :meth:`save`/:meth:`compact`.
+
+    ``file_format`` selects a ``"json"`` or ``"binary"`` snapshot (see
+    :mod:`src.binfmt`); by default it is detected from an existing file or
+    chosen by suffix. The log is JSON lines either way.
+
+    Several processes may share the same files. Writes happen under an
+    advisory lock (:func:`~src.storage.file_lock`); before appending, a
+    manager first replays records other processes added since it last looked,
+    so ``seq`` stays globally ordered and no score is lost.
     """
 
     file_path: Path = field(default_factory=lambda: Path(__file__).with_name("scores.json"))
     high_score: int = 0
-    history: List[int] = field(default_factory=list)
+    history: ScoreHistory = None  # type: ignore[assignment]  # built in __post_init__
+    compact_every: Optional[int] = 100
+    history_limit: int = DEFAULT_HISTORY_LIMIT
+    file_format: Optional[str] = None
+    _seq: int = field(default=0, init=False, repr=False)
+    _pending: int = field(default=0, init=False, repr=False)
+    _snapshot_stamp: Optional[Tuple[int, int, int]] = field(default=None, init=False, repr=False)
+    _log_inode: Optional[int] = field(default=None, init=False, repr=False)
+    _log_offset: int = field(default=0, init=False, repr=False)
+    _log_torn: bool = field(default=False, init=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    _compactor: Optional[threading.Thread] = field(default=None, init=False, repr=False, compare=False)
 
+    def __post_init__(self) -> None:
+        if self.history is None:
+            self.history = ScoreHistory(capacity=self.history_limit)
+        elif not isinstance(self.history, ScoreHistory):
+            self.history = ScoreHistory(self.history, self.history_limit)
+
+    @property
+    def log_path(self) -> Path:
+        """Path of the append-only log next to :attr:`file_path`."""
+        return self.file_path.with_name(self.file_path.name + ".log")
+
+    @metrics.timed("score_load_seconds", "ScoreManager.load latency")
     def load(self) -> None:
-        """Load score data from ``file_path``.
+        """Load score data from ``file_path`` and replay the log tail.
 
         If the file does not exist an empty structure is created so that the
-        manager can be used immediately.
+        manager can be used immediately. A torn log line left by a crash
+        mid-append is skipped.
         """
-        if self.file_path.exists():
+        with self._lock, file_lock(self.file_path):
+            self._load_snapshot()
+
+    def _load_snapshot(self) -> None:
+        self._snapshot_stamp = file_stamp(self.file_path)
+        binary = choose_format(self.file_path, self.file_format) == "binary"
+        if self.file_path.exists() and binary:
+            self.high_score, self._seq, stats, history = decode_scores(
+                self.file_path.read_bytes()
+            )
+            self.history = ScoreHistory.restore(history, stats, self.history_limit)
+        elif self.file_path.exists():
             with self.file_path.open("r", encoding="utf-8") as fh:
                 data = json.load(fh)
             self.high_score = data.get("high_score", 0)
-            self.history = data.get("history", [])
+            self.history = ScoreHistory.restore(
+                data.get("history", []), data.get("stats"), self.history_limit
+            )
+            self._seq = data.get("seq", 0)
         else:
             self.high_score = 0
-            self.history = []
+            self.history = ScoreHistory(capacity=self.history_limit)
+            self._seq = 0
+        self._pending = 0
+        self._log_inode = None
+        self._log_offset = 0
+        self._replay_log()
+
+    def _replay_log(self) -> None:
+        """Apply complete log lines past :attr:`_log_offset` newer than our seq."""
+        try:
+            fh = self.log_path.open("rb")
+        except FileNotFoundError:
+            self._log_inode, self._log_offset, self._log_torn = None, 0, False
+            return
+        with fh:
+            inode = os.fstat(fh.fileno()).st_ino
+            if inode != self._log_inode:
+                self._log_inode, self._log_offset = inode, 0
+            fh.seek(self._log_offset)
+            self._log_torn = False
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    self._log_torn = True
+                    break
+                self._log_offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record["seq"] > self._seq:
+                    self._apply(record["score"])
+                    self._seq = record["seq"]
+                    self._pending += 1
+
+    def _sync(self) -> None:
+        """Catch up with other writers; the caller holds the file lock."""
+        if file_stamp(self.file_path) != self._snapshot_stamp:
+            self._load_snapshot()
+        else:
+            self._replay_log()
+
+    def _apply(self, score: int) -> bool:
+        self.history.append(score)
+        if score > self.high_score:
+            self.high_score = score
+            return True
+        return False
 
     def save(self) -> None:
-        """Persist current score data to ``file_path``."""
-        data = {"high_score": self.high_score, "history": self.history}
-        with self.file_path.open("w", encoding="utf-8") as fh:
-            json.dump(data, fh)
+        """Persist current score data to ``file_path`` as a new snapshot."""
+        self.compact()
 
+    @metrics.timed("score_compact_seconds", "ScoreManager.compact latency")
+    def compact(self) -> None:
+        """Fold the log into a new snapshot written with an atomic rename."""
+        with self._lock, file_lock(self.file_path):
+            self._sync()
+            if choose_format(self.file_path, self.file_format) == "binary":
+                payload = encode_scores(self.high_score, self._seq, self.history)
+            else:
+                payload = json.dumps(
+                    {
+                        "high_score": self.high_score,
+                        "history": self.history.to_array().tolist(),
+                        "stats": self.history.stats_state(),
+                        "seq": self._seq,
+                    }
+                ).encode("utf-8")
+            atomic_write_bytes(self.file_path, payload)
+            self._snapshot_stamp = file_stamp(self.file_path)
+            # Everything in the log is now in the snapshot.
+            if self.log_path.exists():
+                self.log_path.unlink()
+            self._log_inode, self._log_offset, self._log_torn = None, 0, False
+            self._pending = 0
+
+    def wait_for_compaction(self) -> None:
+        """Block until a running background compaction has finished."""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+
+    @metrics.timed("score_record_seconds", "ScoreManager.record latency")
     def record(self, score: int) -> bool:
         """Record ``score`` and update high score.
 
         Returns ``True`` if ``score`` is a new high score.
         """
-        self.history.append(score)
-        new_high = False
-        if score > self.high_score:
-            self.high_score = score
-            new_high = True
-        self.save()
+        with self._lock, file_lock(self.file_path):
+            self._sync()
+            new_high = self._apply(score)
+            self._seq += 1
+            line = json.dumps({"seq": self._seq, "score": score}) + "\n"
+            if self._log_torn:
+                # Terminate a line left half-written by a crashed writer.
+                line = "\n" + line
+            with self.log_path.open("ab") as fh:
+                fh.write(line.encode("utf-8"))
+                self._log_inode = os.fstat(fh.fileno()).st_ino
+                self._log_offset = fh.tell()
+            self._log_torn = False
+            self._pending += 1
+            due = self.compact_every is not None and self._pending >= self.compact_every
+        if due and (self._compactor is None or not self._compactor.is_alive()):
+            self._compactor = threading.Thread(target=self.compact, daemon=True)
+            self._compactor.start()
         return new_high
 
     def save_score(self, score: int) -> bool:
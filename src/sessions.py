@@ -0,0 +1,294 @@
+"""Session stores for the server modes.
+
+A game in progress is stored as a :class:`GameState`: the user, the game
+options, a 64-bit seed, the current level, the score and how many notes of
+the current level have been entered and verified so far. The notes are not
+stored. :meth:`GameState.sequence` rebuilds them with
+:func:`~src.game.sequence_from_seed`, so a session stays the same small size
+however far the player gets.
+
+:class:`MemorySessionStore` keeps sessions in one process. Sessions expire
+``ttl`` seconds after they were last used. The least recently used ones are
+evicted once ``max_sessions`` or the ``max_bytes`` memory cap is exceeded.
+:class:`FileSessionStore` also journals every change to a local file so
+games survive a server restart.
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .game import Note, SeededSequence, sequence_from_seed
+from .storage import atomic_write_text
+
+DEFAULT_TTL = 30 * 60.0
+DEFAULT_MAX_SESSIONS = 100_000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Rough per-entry cost of the OrderedDict slot and its link node.
+_ENTRY_OVERHEAD = 112
+
+
+class GameState:
+    """Compact state of one game; the notes are regenerated from ``seed``."""
+
+    __slots__ = ("user", "difficulty", "step", "levels", "seed", "level", "score", "entered")
+
+    def __init__(
+        self,
+        user: str,
+        difficulty: str,
+        step: int,
+        levels: int,
+        seed: int,
+        level: int = 1,
+        score: int = 0,
+        entered: int = 0,
+    ) -> None:
+        self.user = user
+        self.difficulty = difficulty
+        self.step = step
+        self.levels = levels
+        self.seed = seed
+        self.level = level
+        self.score = score
+        self.entered = entered
+
+    def sequence(self) -> List[Note]:
+        """The notes to repeat at the current level (``level * step`` of them).
+
+        Matches the sequence of a seeded :class:`~src.engine.GameSession`.
+        """
+        return sequence_from_seed(
+            self.seed, self.level, self.difficulty, base_length=self.step, step=self.step
+        )
+
+    def expected(self) -> SeededSequence:
+        """:meth:`sequence` as a lazy sequence, computed only where it is read."""
+        return SeededSequence(
+            self.seed, self.level, self.difficulty, base_length=self.step, step=self.step
+        )
+
+    def to_list(self) -> list:
+        """Positional form used by the session journal."""
+        return [getattr(self, name) for name in self.__slots__]
+
+    @classmethod
+    def from_list(cls, values: list) -> "GameState":
+        # Journals written before ``entered`` existed have one value less.
+        return cls(*values)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, GameState):
+            return NotImplemented
+        return self.to_list() == other.to_list()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"GameState({fields})"
+
+
+def _footprint(key: str, state: GameState) -> int:
+    """Approximate bytes held for one session."""
+    return (
+        _ENTRY_OVERHEAD
+        + sys.getsizeof(key)
+        + sys.getsizeof(state)
+        + sys.getsizeof(state.user)
+        + sys.getsizeof(state.seed)
+    )
+
+
+class MemorySessionStore:
+    """In-process session store with sliding TTL, LRU eviction and a memory cap.
+
+    Expiry is checked lazily. Every operation first drops expired sessions
+    from the least recently used end, so abandoned games do not pile up.
+    Thread-safe. ``clock`` may be replaced in tests.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        max_sessions: int = DEFAULT_MAX_SESSIONS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if ttl <= 0 or max_sessions < 1 or max_bytes < 1:
+            raise ValueError("ttl, max_sessions and max_bytes must be positive")
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        # key -> (state, expires_at, footprint), least recently used first
+        self._sessions: "OrderedDict[str, Tuple[GameState, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._sessions
+
+    def get(self, key: str) -> Optional[GameState]:
+        """Return the session for ``key`` and refresh its TTL, or ``None``."""
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            entry = self._sessions.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._sessions[key] = (entry[0], now + self.ttl, entry[2])
+            self._sessions.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, state: GameState) -> None:
+        """Store (or update) ``key``'s session as the most recently used."""
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            old = self._sessions.pop(key, None)
+            if old is not None:
+                self.bytes -= old[2]
+            size = _footprint(key, state)
+            self._sessions[key] = (state, now + self.ttl, size)
+            self.bytes += size
+            self._stored(key, state, now + self.ttl)
+            while len(self._sessions) > self.max_sessions or self.bytes > self.max_bytes:
+                self._drop(next(iter(self._sessions)))
+                self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        """Remove ``key``; returns ``True`` if it was present."""
+        with self._lock:
+            if key not in self._sessions:
+                return False
+            self._drop(key)
+            return True
+
+    def _expire(self, now: float) -> None:
+        # The TTL is sliding and uniform, so expiry order is LRU order.
+        while self._sessions:
+            key, (_, expires_at, _) = next(iter(self._sessions.items()))
+            if expires_at > now:
+                break
+            self._drop(key)
+            self.expired += 1
+
+    def _drop(self, key: str) -> None:
+        _, _, size = self._sessions.pop(key)
+        self.bytes -= size
+        self._removed(key)
+
+    def _stored(self, key: str, state: GameState, expires_at: float) -> None:
+        """Hook called after ``key`` was stored; persistent stores journal it."""
+
+    def _removed(self, key: str) -> None:
+        """Hook called after ``key`` was deleted, expired or evicted."""
+
+    def info(self) -> Dict[str, int]:
+        """Return live session count, memory use and eviction counters."""
+        with self._lock:
+            self._expire(self.clock())
+            return {
+                "live": len(self._sessions),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+            }
+
+    def close(self) -> None:
+        """Release resources; nothing to do for the in-memory store."""
+
+
+class FileSessionStore(MemorySessionStore):
+    """:class:`MemorySessionStore` journaled to ``path`` to survive restarts.
+
+    Each store or removal appends one JSON line, either
+    ``{"key", "state", "expires"}`` or ``{"key", "deleted": true}``. On
+    start-up the journal is replayed, expired sessions are skipped and the
+    file is rewritten with only the live ones. It is also rewritten whenever
+    it grows past twice the live sessions. Refreshing a TTL on :meth:`get`
+    is not journaled, so after a restart a session expires ``ttl`` after its
+    last change. One server process owns the file.
+    """
+
+    def __init__(self, path: Path, **options) -> None:
+        super().__init__(**options)
+        self.path = Path(path)
+        self._lines = 0
+        self._fh = None
+        self._replay()
+        self._rewrite()
+
+    def _replay(self) -> None:
+        if not self.path.exists():
+            return
+        now = self.clock()
+        entries: Dict[str, Tuple[GameState, float]] = {}
+        with self.path.open("r", encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn line from a crash mid-append.
+                    continue
+                if record.get("deleted"):
+                    entries.pop(record["key"], None)
+                else:
+                    entries.pop(record["key"], None)
+                    entries[record["key"]] = (GameState.from_list(record["state"]), record["expires"])
+        for key, (state, expires_at) in entries.items():
+            if expires_at > now:
+                size = _footprint(key, state)
+                self._sessions[key] = (state, expires_at, size)
+                self.bytes += size
+        while len(self._sessions) > self.max_sessions or self.bytes > self.max_bytes:
+            _, _, size = self._sessions.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def _rewrite(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+        lines = [
+            json.dumps({"key": key, "state": state.to_list(), "expires": expires_at}) + "\n"
+            for key, (state, expires_at, _) in self._sessions.items()
+        ]
+        atomic_write_text(self.path, "".join(lines))
+        self._lines = len(lines)
+        self._fh = self.path.open("a", encoding="utf-8")
+
+    def _append(self, record: dict) -> None:
+        self._fh.write(json.dumps(record) + "\n")
+        self._fh.flush()
+        self._lines += 1
+        if self._lines > 2 * len(self._sessions) + 1000:
+            self._rewrite()
+
+    def _stored(self, key: str, state: GameState, expires_at: float) -> None:
+        self._append({"key": key, "state": state.to_list(), "expires": expires_at})
+
+    def _removed(self, key: str) -> None:
+        self._append({"key": key, "deleted": True})
+
+    def close(self) -> None:
+        """Compact the journal and close it."""
+        with self._lock:
+            if self._fh is not None:
+                self._rewrite()
+                self._fh.close()
+                self._fh = None
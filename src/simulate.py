@@ -0,0 +1,260 @@
+"""Monte Carlo difficulty calibration with simulated players.
+
+Plays many games per (difficulty, step) through :class:`~src.engine.GameSession`
+with a player-memory model answering each level, and reports how many levels
+the players passed::
+
+    python -m src.simulate --games 1000000 --levels 10 --model span
+    python -m src.simulate --difficulties easy,hard --steps 1,2 --base-length 3 \\
+        --model recall --recall 0.97 --json calibration.json
+
+Models (``--model``):
+
+* ``perfect`` always repeats the sequence; a throughput baseline.
+* ``span`` draws a memory span in bits per player from a normal distribution
+  (``--span-mean``, ``--span-sd``) and repeats a sequence only while it fits:
+  a note costs ``log2(pool size)`` bits, so larger pools shorten the span.
+* ``recall`` remembers each note with probability ``--recall`` and otherwise
+  guesses it from the pool.
+
+The games are split into shards of ``--shard-size`` games that run on a
+:class:`~concurrent.futures.ProcessPoolExecutor`. Each shard has its own
+:class:`random.Random` seeded from ``--seed`` and the shard's position, so the
+merged counts depend only on the seed, never on ``--workers``. Shards share
+nothing, so throughput grows with the number of cores.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .engine import GameSession, perfect_bot
+from .game import DIFFICULTY_NOTES, _note_pool
+
+SHARD_SIZE = 20000
+
+
+@dataclass(frozen=True)
+class PerfectModel:
+    """A player who never forgets."""
+
+    def play(self, game: GameSession, rng: random.Random) -> int:
+        return perfect_bot(game)
+
+
+@dataclass(frozen=True)
+class SpanModel:
+    """A player with a fixed memory span of ``N(mean_bits, sd_bits)`` bits."""
+
+    mean_bits: float = 16.0
+    sd_bits: float = 4.0
+
+    def play(self, game: GameSession, rng: random.Random) -> int:
+        limit = rng.gauss(self.mean_bits, self.sd_bits) / math.log2(len(_note_pool(game.difficulty)))
+        while not game.finished:
+            sequence = game.next_level()
+            game.submit(sequence if len(sequence) <= limit else ())
+        return game.score
+
+
+@dataclass(frozen=True)
+class RecallModel:
+    """A player who recalls each note with probability ``recall``, else guesses."""
+
+    recall: float = 0.95
+
+    def play(self, game: GameSession, rng: random.Random) -> int:
+        pool = _note_pool(game.difficulty)
+        size = len(pool)
+        recall, draw = self.recall, rng.random
+        while not game.finished:
+            sequence = game.next_level()
+            game.submit([note if draw() < recall else pool[int(draw() * size)] for note in sequence])
+        return game.score
+
+
+Model = Union[PerfectModel, SpanModel, RecallModel]
+MODELS = {"perfect": PerfectModel, "span": SpanModel, "recall": RecallModel}
+
+
+class _Shard(NamedTuple):
+    difficulty: str
+    step: int
+    base_length: Optional[int]
+    levels: int
+    games: int
+    model: Model
+    seed: str
+
+
+def _run_shard(shard: _Shard) -> List[int]:
+    """Play one shard; returns the number of games per levels passed."""
+    rng = random.Random(shard.seed)
+    game = GameSession(shard.levels, shard.step, shard.difficulty, seed=0, base_length=shard.base_length)
+    counts = [0] * (shard.levels + 1)
+    play, getrandbits = shard.model.play, rng.getrandbits
+    for _ in range(shard.games):
+        game.reset()
+        game.seed = getrandbits(64)
+        counts[play(game, rng)] += 1
+    return counts
+
+
+def _shards(
+    games: int,
+    difficulties: Iterable[str],
+    steps: Iterable[int],
+    base_length: Optional[int],
+    levels: int,
+    model: Model,
+    seed: int,
+    shard_size: int,
+) -> List[_Shard]:
+    shards = []
+    for difficulty in difficulties:
+        for step in steps:
+            for index, start in enumerate(range(0, games, shard_size)):
+                shards.append(_Shard(
+                    difficulty, step, base_length, levels, min(shard_size, games - start), model,
+                    f"{seed}:{difficulty}:{step}:{index}",
+                ))
+    return shards
+
+
+def simulate(
+    games: int,
+    difficulties: Sequence[str] = tuple(DIFFICULTY_NOTES),
+    steps: Sequence[int] = (1,),
+    base_length: Optional[int] = None,
+    levels: int = 10,
+    model: Optional[Model] = None,
+    seed: int = 0,
+    workers: Optional[int] = None,
+    shard_size: int = SHARD_SIZE,
+) -> Dict[Tuple[str, int], List[int]]:
+    """Play ``games`` games for every difficulty and step.
+
+    Returns ``{(difficulty, step): counts}`` where ``counts[n]`` is the number
+    of games in which exactly ``n`` levels were passed. ``workers`` defaults
+    to the number of CPUs; with one worker the shards run in this process.
+    """
+    if games < 1 or shard_size < 1:
+        raise ValueError("games and shard_size must be at least 1")
+    unknown = set(difficulties) - set(DIFFICULTY_NOTES)
+    if unknown:
+        raise ValueError(f"unknown difficulty: {', '.join(sorted(unknown))}")
+    shards = _shards(
+        games, difficulties, steps, base_length, levels, model or SpanModel(), seed, shard_size
+    )
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results: Iterable[List[int]] = map(_run_shard, shards)
+        return _merge(shards, results)
+    with ProcessPoolExecutor(min(workers, len(shards))) as pool:
+        return _merge(shards, pool.map(_run_shard, shards))
+
+
+def _merge(shards: List[_Shard], results: Iterable[List[int]]) -> Dict[Tuple[str, int], List[int]]:
+    merged: Dict[Tuple[str, int], List[int]] = {}
+    for shard, counts in zip(shards, results):
+        total = merged.setdefault((shard.difficulty, shard.step), [0] * len(counts))
+        for passed, count in enumerate(counts):
+            total[passed] += count
+    return merged
+
+
+def summary(counts: Sequence[int]) -> Dict[str, float]:
+    """Mean levels passed, median and the share of games completed."""
+    games = sum(counts)
+    median, seen = 0, 0
+    for passed, count in enumerate(counts):
+        seen += count
+        if seen * 2 >= games:
+            median = passed
+            break
+    return {
+        "mean": sum(passed * count for passed, count in enumerate(counts)) / games,
+        "median": median,
+        "completed": counts[-1] / games,
+    }
+
+
+def format_table(results: Dict[Tuple[str, int], List[int]]) -> str:
+    """Render the distributions as percentages of games per levels passed."""
+    levels = len(next(iter(results.values()))) - 1
+    header = f"{'difficulty':<10}{'step':>5}{'mean':>7}{'median':>7}{'done':>7} |" + "".join(
+        f"{passed:>6}" for passed in range(levels + 1)
+    )
+    lines = [header, "-" * len(header)]
+    for (difficulty, step), counts in results.items():
+        games = sum(counts)
+        stats = summary(counts)
+        lines.append(
+            f"{difficulty:<10}{step:>5}{stats['mean']:>7.2f}{stats['median']:>7}"
+            f"{stats['completed']:>7.1%} |" + "".join(f"{count / games:>6.1%}" for count in counts)
+        )
+    return "\n".join(lines)
+
+
+def _model(args: argparse.Namespace) -> Model:
+    if args.model == "span":
+        return SpanModel(args.span_mean, args.span_sd)
+    if args.model == "recall":
+        return RecallModel(args.recall)
+    return PerfectModel()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the simulation and print the levels-passed distributions."""
+    parser = argparse.ArgumentParser(description="Monte Carlo difficulty calibration")
+    parser.add_argument("--games", type=int, default=100000, help="games per difficulty and step")
+    parser.add_argument("--difficulties", default=",".join(DIFFICULTY_NOTES))
+    parser.add_argument("--steps", default="1", help="comma-separated notes added per level")
+    parser.add_argument("--base-length", type=int, default=None, help="first level length (default: step)")
+    parser.add_argument("--levels", type=int, default=10)
+    parser.add_argument("--model", choices=sorted(MODELS), default="span")
+    parser.add_argument("--span-mean", type=float, default=16.0, help="span model: mean bits")
+    parser.add_argument("--span-sd", type=float, default=4.0, help="span model: bits std dev")
+    parser.add_argument("--recall", type=float, default=0.95, help="recall model: per-note recall")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE)
+    parser.add_argument("--json", type=Path, default=None, help="also write the counts here")
+    args = parser.parse_args(argv)
+
+    model = _model(args)
+    difficulties = args.difficulties.split(",")
+    steps = [int(step) for step in args.steps.split(",")]
+    start = time.perf_counter()
+    results = simulate(
+        args.games, difficulties, steps, args.base_length, args.levels, model,
+        args.seed, args.workers, args.shard_size,
+    )
+    elapsed = time.perf_counter() - start
+    total = args.games * len(results)
+    print(format_table(results))
+    print(f"{total:,} games in {elapsed:.2f} s ({total / elapsed:,.0f} games/s)", file=sys.stderr)
+    if args.json is not None:
+        args.json.write_text(json.dumps({
+            "games": args.games,
+            "levels": args.levels,
+            "base_length": args.base_length,
+            "seed": args.seed,
+            "model": {"name": args.model, **asdict(model)},
+            "results": [
+                {"difficulty": difficulty, "step": step, "counts": counts, **summary(counts)}
+                for (difficulty, step), counts in results.items()
+            ],
+        }, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""File helpers shared by the score and profile stores."""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+try:  # pragma: no cover - platform specific
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Replace ``path`` with ``data`` atomically.
+
+    The bytes are written to a temporary file in the same directory, flushed
+    to disk and renamed over ``path``, so readers see either the old or the new
+    content but never a truncated file.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write_text(path: Path, text: str, encoding: str = "utf-8") -> None:
+    """Text counterpart of :func:`atomic_write_bytes`."""
+    atomic_write_bytes(path, text.encode(encoding))
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive advisory lock on ``path`` across processes.
+
+    The lock is taken on a ``<name>.lock`` side file so it is unaffected by
+    atomic renames of ``path`` itself. It is not re-entrant: do not nest two
+    locks on the same path. Where :mod:`fcntl` is unavailable (Windows) the
+    lock only documents intent.
+    """
+    if fcntl is None:  # pragma: no cover - platform specific
+        yield
+        return
+    with open(path.with_name(path.name + ".lock"), "a") as fh:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def file_stamp(path: Path) -> Optional[Tuple[int, int, int]]:
+    """Return ``(inode, mtime_ns, size)`` for ``path`` or ``None`` if missing.
+
+    Every atomic write produces a new inode, so comparing stamps tells whether
+    another process replaced the file since it was last read.
+    """
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,449 @@
+"""Asyncio web server behind ``--mode web``.
+
+One event loop hosts any number of concurrent games. The JSON API is:
+
+``POST /api/games``
+    Start a game. The optional body ``{"user", "difficulty", "step", "levels"}``
+    defaults to the CLI options; ``step``, ``levels`` and the final sequence
+    length are capped (:data:`MAX_STEP`, :data:`MAX_LEVELS`,
+    :data:`MAX_NOTES`). Returns ``{"id", "level", "levels"}``.
+``GET /api/games/{id}/sequence``
+    The notes to repeat for the current level.
+``POST /api/games/{id}/guess``
+    Body ``{"guess": [note, ...]}``. Returns ``{"correct", "level", "score",
+    "finished"}``. A finished game also reports ``high_score`` and, after a
+    mistake, the ``expected`` sequence. Its score is recorded with the
+    :class:`~src.score.ScoreManager` and :class:`~src.profile.ProfileManager`.
+``POST /api/games/{id}/notes``
+    Body ``{"notes": [note, ...]}``: the next notes as they are typed, one
+    or a few at a time. Returns ``{"ok", "position"}`` plus ``error_index``
+    for a wrong note. A wrong note or the last note answers the level and
+    adds the ``/guess`` fields; otherwise ``{"level", "finished": false}``.
+``GET /api/leaderboard?limit=10``
+    The best ``{"name", "high_score"}`` entries, at most
+    :data:`MAX_LEADERBOARD_LIMIT`.
+``GET /api/games/{id}/audio?format=wav&tempo=0.5&rate=44100``
+    The current sequence rendered as WAV or raw 16-bit PCM (``format=pcm``),
+    served from a content-addressed cache (see :mod:`src.clips`) with a
+    strong ``ETag``. ``If-None-Match`` gets ``304 Not Modified``.
+``GET /api/stats``
+    Session store and clip cache counters.
+``GET /metrics``
+    Request, game, storage and synthesis metrics in the Prometheus text
+    format (see :mod:`src.metrics`).
+
+Games live in a pluggable session store (see :mod:`src.sessions`) as a seed
+plus level, so abandoned games expire instead of leaking memory.
+
+The HTTP/1.1 handling is deliberately small and uses only the stdlib.
+Connections are kept alive between requests unless the client asks
+otherwise. Errors are answered with ``{"error": message}``, and a bug in a
+handler with a ``500`` rather than a dropped connection.
+Storage calls run in worker threads so file I/O never stalls the loop.
+"""
+
+import asyncio
+import json
+import logging
+import secrets
+import time
+from http import HTTPStatus
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+from . import game as _game
+from . import metrics
+from .clips import FORMATS, ClipCache, clip_key, clip_length, iter_clip
+from .engine import GAMES_STARTED, GameSession, record_game
+from .game import SequenceVerifier
+from .profile import ProfileManager
+from .score import ScoreManager
+from .sessions import GameState, MemorySessionStore
+
+# Requests with larger bodies are rejected; guesses are tiny.
+MAX_BODY = 64 * 1024
+# Seconds an idle keep-alive connection is held open.
+IDLE_TIMEOUT = 30.0
+LEADERBOARD_LIMIT = 10
+MAX_LEADERBOARD_LIMIT = 100
+# Accepted ranges for the audio endpoint's query parameters.
+MIN_RATE, MAX_RATE = 8000, 48000
+MAX_TEMPO = 2.0
+# Sequences are regenerated on the loop for every request, so keep them short.
+MAX_STEP = 16
+MAX_LEVELS = 100
+MAX_NOTES = 500
+
+PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REQUESTS = metrics.counter("http_requests_total", "HTTP requests served")
+ERRORS = metrics.counter("http_errors_total", "HTTP responses with a 4xx or 5xx status")
+# Until the response head is ready; streamed audio bodies are not included.
+REQUEST_SECONDS = metrics.histogram("http_request_seconds", "HTTP request handling latency")
+
+_log = logging.getLogger(__name__)
+
+_INDEX = b"""<!doctype html>
+<html><body><h1>Musical Memory</h1>
+<p>JSON API: <code>POST /api/games</code>, <code>GET /api/games/{id}/sequence</code>,
+<code>POST /api/games/{id}/guess</code>, <code>GET /api/leaderboard</code>.</p>
+</body></html>
+"""
+
+
+class HTTPError(Exception):
+    """Raised by request handlers to answer with an error status."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Streamed:
+    """A response body produced chunk by chunk from a blocking iterator."""
+
+    __slots__ = ("content_type", "length", "chunks", "headers")
+
+    def __init__(
+        self,
+        content_type: Optional[str],
+        length: int,
+        chunks: Iterator[bytes],
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.content_type = content_type
+        self.length = length
+        self.chunks = chunks
+        self.headers = headers or {}
+
+
+class WebApp:
+    """Route API requests to the session store and the score/profile stores.
+
+    ``difficulty``, ``step`` and ``levels`` are the defaults for new games.
+    ``sessions`` defaults to a :class:`~src.sessions.MemorySessionStore`
+    and ``clips`` to a :class:`~src.clips.ClipCache` in its default directory.
+    """
+
+    def __init__(
+        self,
+        scores: ScoreManager,
+        profiles: ProfileManager,
+        difficulty: str = "easy",
+        step: int = 1,
+        levels: int = 5,
+        sessions: Optional[MemorySessionStore] = None,
+        clips: Optional[ClipCache] = None,
+    ) -> None:
+        self.scores = scores
+        self.profiles = profiles
+        self.defaults = {"difficulty": difficulty, "step": step, "levels": levels}
+        self.sessions = sessions if sessions is not None else MemorySessionStore()
+        self.clips = clips if clips is not None else ClipCache()
+
+    # -- Routing -------------------------------------------------------------
+    async def dispatch(
+        self, method: str, target: str, body: bytes, headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, Any]:
+        """Return ``(status, payload)`` for one request.
+
+        ``payload`` is JSON-serialisable, ``bytes`` for the HTML index,
+        ``str`` for the metrics text or a :class:`Streamed` body. ``headers``
+        are the request headers with lower-case names.
+        """
+        try:
+            url = urlsplit(target)
+            parts = [p for p in url.path.split("/") if p]
+            if method == "GET" and not parts:
+                return 200, _INDEX
+            if parts == ["metrics"] and method == "GET":
+                return 200, metrics.REGISTRY.render_prometheus()
+            if parts[:1] != ["api"]:
+                raise HTTPError(404, "not found")
+            route = parts[1:]
+            if route == ["games"] and method == "POST":
+                return 201, self.start_game(_json_body(body))
+            if len(route) == 3 and route[0] == "games":
+                game = self._game(route[1])
+                if route[2] == "sequence" and method == "GET":
+                    return 200, {"level": game.level, "sequence": game.sequence()}
+                if route[2] == "guess" and method == "POST":
+                    return 200, await self.guess(route[1], game, _json_body(body))
+                if route[2] == "notes" and method == "POST":
+                    return 200, await self.notes(route[1], game, _json_body(body))
+                if route[2] == "audio" and method == "GET":
+                    return self.audio(game, parse_qs(url.query), headers or {})
+            if route == ["leaderboard"] and method == "GET":
+                return 200, await self.leaderboard(parse_qs(url.query))
+            if route == ["stats"] and method == "GET":
+                return 200, {"sessions": self.sessions.info(), "clips": self.clips.info()}
+            raise HTTPError(404, "not found")
+        except HTTPError as exc:
+            return exc.status, {"error": exc.message}
+        except Exception:
+            _log.exception("error handling %s %s", method, target)
+            return 500, {"error": "internal server error"}
+
+    def _game(self, game_id: str) -> GameState:
+        game = self.sessions.get(game_id)
+        if game is None:
+            raise HTTPError(404, "unknown game")
+        return game
+
+    # -- Handlers --------------------------------------------------------------
+    def start_game(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        options = {**self.defaults, **{k: data[k] for k in self.defaults if k in data}}
+        try:
+            game = GameState(
+                user=str(data.get("user", "player")),
+                difficulty=str(options["difficulty"]),
+                step=int(options["step"]),
+                levels=int(options["levels"]),
+                seed=secrets.randbits(64),
+            )
+        except (TypeError, ValueError) as exc:
+            raise HTTPError(400, f"invalid game options: {exc}") from None
+        if game.difficulty not in _game.DIFFICULTY_NOTES:
+            raise HTTPError(400, f"unknown difficulty: {game.difficulty}")
+        if game.step < 1 or game.levels < 1:
+            raise HTTPError(400, "step and levels must be at least 1")
+        if game.step > MAX_STEP or game.levels > MAX_LEVELS or game.step * game.levels > MAX_NOTES:
+            raise HTTPError(
+                400, f"step <= {MAX_STEP}, levels <= {MAX_LEVELS} and step * levels <= {MAX_NOTES}"
+            )
+        game_id = secrets.token_urlsafe(12)
+        self.sessions.put(game_id, game)
+        GAMES_STARTED.inc()
+        return {"id": game_id, "level": game.level, "levels": game.levels}
+
+    async def guess(self, game_id: str, game: GameState, data: Dict[str, Any]) -> Dict[str, Any]:
+        guess = data.get("guess")
+        if not isinstance(guess, list):
+            raise HTTPError(400, "guess must be a list of notes")
+        return await self._answer(game_id, game, guess)
+
+    async def notes(self, game_id: str, game: GameState, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Verify the next typed notes, continuing where the last request stopped.
+
+        Only the notes sent are generated and compared. The level is
+        answered as soon as a note is wrong or the sequence is complete.
+        """
+        notes = data.get("notes")
+        if not isinstance(notes, list):
+            raise HTTPError(400, "notes must be a list of notes")
+        verifier = SequenceVerifier(game.expected(), game.entered)
+        progress: Dict[str, Any] = {"ok": verifier.feed_many(notes), "position": verifier.position}
+        if not verifier.ok:
+            progress["error_index"] = verifier.error_index
+        elif not verifier.complete:
+            game.entered = verifier.position
+            self.sessions.put(game_id, game)
+            progress.update(level=game.level, finished=False)
+            return progress
+        result = await self._answer(game_id, game, verifier)
+        result.update(progress)
+        return result
+
+    async def _answer(
+        self, game_id: str, game: GameState, guess: Union[List[Any], SequenceVerifier]
+    ) -> Dict[str, Any]:
+        """Submit a whole guess for the current level and store the outcome."""
+        session = GameSession.resume(
+            game.seed, game.level, game.score, game.levels, game.step, game.difficulty
+        )
+        result: Dict[str, Any] = {"correct": session.submit(guess)}
+        if not result["correct"]:
+            result["expected"] = session.sequence
+        elif not session.finished:
+            session.next_level()
+        game.level, game.score, game.entered = session.level, session.score, 0
+        finished = session.finished
+        result.update(level=game.level, score=game.score, finished=finished)
+        if finished:
+            # Drop the game before awaiting so a repeated guess cannot record twice.
+            self.sessions.delete(game_id)
+            result["high_score"] = await asyncio.to_thread(self._record, game)
+        else:
+            self.sessions.put(game_id, game)
+        return result
+
+    def _record(self, game: GameState) -> bool:
+        settings = {"difficulty": game.difficulty, "step": game.step}
+        return record_game(self.scores, self.profiles, game.user, game.score, settings)
+
+    def audio(
+        self, game: GameState, query: Dict[str, List[str]], headers: Dict[str, str]
+    ) -> Tuple[int, Any]:
+        fmt = query.get("format", ["wav"])[0]
+        if fmt not in FORMATS:
+            raise HTTPError(400, f"format must be one of {', '.join(FORMATS)}")
+        try:
+            tempo = float(query.get("tempo", ["0.5"])[0])
+            rate = int(query.get("rate", [str(_game.SAMPLE_RATE)])[0])
+        except ValueError:
+            raise HTTPError(400, "tempo and rate must be numbers") from None
+        if not 0 <= tempo <= MAX_TEMPO or not MIN_RATE <= rate <= MAX_RATE:
+            raise HTTPError(400, f"tempo must be 0-{MAX_TEMPO} and rate {MIN_RATE}-{MAX_RATE}")
+        sequence = game.sequence()
+        key = clip_key(sequence, tempo, rate, fmt)
+        etag = f'"{key}"'
+        cache_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in [tag.strip() for tag in headers.get("if-none-match", "").split(",")]:
+            return 304, Streamed(None, 0, iter(()), cache_headers)
+        if key not in self.clips and _game.np is None:
+            raise HTTPError(503, "rendering audio requires numpy")
+        chunks = self.clips.stream(key, iter_clip(sequence, tempo, rate, fmt))
+        length = clip_length(len(sequence), tempo, rate, fmt)
+        return 200, Streamed(FORMATS[fmt], length, chunks, cache_headers)
+
+    async def leaderboard(self, query: Dict[str, List[str]]) -> Dict[str, Any]:
+        try:
+            limit = int(query.get("limit", [LEADERBOARD_LIMIT])[0])
+        except ValueError:
+            raise HTTPError(400, "limit must be an integer") from None
+        if limit < 0:
+            raise HTTPError(400, "limit must not be negative")
+        entries = await asyncio.to_thread(self.profiles.top, min(limit, MAX_LEADERBOARD_LIMIT))
+        return {"leaderboard": [{"name": n, "high_score": hs} for n, hs in entries]}
+
+    # -- HTTP ------------------------------------------------------------------
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve requests on one connection until it closes or goes idle."""
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(_read_request(reader), IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                except HTTPError as exc:
+                    writer.write(_response(exc.status, {"error": exc.message}, False))
+                    break
+                if request is None:
+                    break
+                method, target, keep_alive, headers, body = request
+                start = time.perf_counter()
+                status, payload = await self.dispatch(method, target, body, headers)
+                REQUEST_SECONDS.observe(time.perf_counter() - start)
+                REQUESTS.inc()
+                if status >= 400:
+                    ERRORS.inc()
+                writer.write(_response(status, payload, keep_alive))
+                if isinstance(payload, Streamed):
+                    await _write_stream(writer, payload.chunks)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000) -> asyncio.AbstractServer:
+        """Start listening and return the server (``port=0`` picks a free port)."""
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+
+async def _read_request(
+    reader: asyncio.StreamReader,
+) -> Optional[Tuple[str, str, bool, Dict[str, str], bytes]]:
+    """Read one request; ``None`` when the client closed the connection."""
+    try:
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "malformed request line") from None
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+    except ValueError:
+        # StreamReader's line limit was exceeded.
+        raise HTTPError(431, "request header too large") from None
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HTTPError(400, "invalid Content-Length") from None
+    if length > MAX_BODY:
+        raise HTTPError(413, "request body too large")
+    body = await reader.readexactly(length) if length > 0 else b""
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        keep_alive = connection == "keep-alive"
+    else:
+        keep_alive = connection != "close"
+    return method.upper(), target, keep_alive, headers, body
+
+
+async def _write_stream(writer: asyncio.StreamWriter, chunks: Iterator[bytes]) -> None:
+    """Send ``chunks``, producing each one off the loop and honouring back-pressure."""
+    try:
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            writer.write(chunk)
+            await writer.drain()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            await asyncio.to_thread(close)
+
+
+def _json_body(body: bytes) -> Dict[str, Any]:
+    if not body:
+        return {}
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise HTTPError(400, "body must be JSON") from None
+    if not isinstance(data, dict):
+        raise HTTPError(400, "body must be a JSON object")
+    return data
+
+
+def _response(status: int, payload: Any, keep_alive: bool) -> bytes:
+    """Serialise the status line and headers, plus the body unless it is streamed."""
+    headers: Dict[str, str] = {}
+    if isinstance(payload, Streamed):
+        body, length = b"", payload.length
+        if payload.content_type is not None:
+            headers["Content-Type"] = payload.content_type
+        headers.update(payload.headers)
+    else:
+        if isinstance(payload, bytes):
+            body, headers["Content-Type"] = payload, "text/html; charset=utf-8"
+        elif isinstance(payload, str):
+            body, headers["Content-Type"] = payload.encode("utf-8"), PROMETHEUS_TYPE
+        else:
+            body, headers["Content-Type"] = json.dumps(payload).encode("utf-8"), "application/json"
+        length = len(body)
+    if status != 304:
+        headers["Content-Length"] = str(length)
+    headers["Connection"] = "keep-alive" if keep_alive else "close"
+    head = f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n" + "".join(
+        f"{name}: {value}\r\n" for name, value in headers.items()
+    )
+    return (head + "\r\n").encode("latin-1") + body
+
+
+def run(app: WebApp, host: str = "127.0.0.1", port: int = 8000) -> None:
+    """Serve ``app`` until interrupted."""
+
+    async def main() -> None:
+        server = await app.serve(host, port)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,11 @@
+from benchmarks.run import compare
+
+
+def test_compare_reports_only_regressions_beyond_threshold() -> None:
+    baseline = {"fast": 1.0, "slow": 1.0, "new_only": 1.0, "tiny": 0.0001}
+    results = {"fast": 1.2, "slow": 1.3, "added": 5.0, "tiny": 0.001}
+    assert compare(results, baseline, 0.25) == [("slow", 1.0, 1.3), ("tiny", 0.0001, 0.001)]
+    assert compare(results, baseline, 0.25, min_seconds=0.001) == [("slow", 1.0, 1.3)]
+    assert compare(results, baseline, 0.5) == [("tiny", 0.0001, 0.001)]
+    # Exactly at the threshold is not a regression.
+    assert compare({"fast": 1.25}, baseline, 0.25) == []
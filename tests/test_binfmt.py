@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import pytest
+
+from src import binfmt
+from src.profile import ProfileManager
+from src.score import ScoreManager
+
+
+def _sample_profiles(path: Path, **kwargs) -> ProfileManager:
+    manager = ProfileManager(path, **kwargs)
+    manager.load()
+    with manager.batch():
+        manager.record_score("alice", 4)
+        manager.record_score("alice", 8)
+        manager.record_score("bób", 2)
+        manager.update_settings("alice", {"difficulty": "hard"})
+    return manager
+
+
+def test_binary_profiles_roundtrip_and_detection(tmp_path: Path) -> None:
+    path = tmp_path / "profiles.bin"
+    _sample_profiles(path)
+    assert binfmt.is_binary(path)
+
+    records = list(binfmt.iter_profile_records(path.read_bytes()))
+    assert [r.name for r in records] == ["alice", "bób"]
+    assert isinstance(records[0].history, memoryview)
+    assert records[0].history.tolist() == [4, 8]
+
+    loaded = ProfileManager(path)
+    loaded.load()
+    alice = loaded.get_profile("alice")
+    assert alice.history == [4, 8]
+    assert alice.history.stats()["count"] == 2
+    assert alice.settings == {"difficulty": "hard"}
+    assert loaded.leaderboard() == [("alice", 8), ("bób", 2)]
+
+
+def test_binary_scores_roundtrip(tmp_path: Path) -> None:
+    path = tmp_path / "scores.dat"
+    manager = ScoreManager(path, file_format="binary", compact_every=None)
+    manager.load()
+    for score in (3, 9, 1):
+        manager.record(score)
+    manager.save()
+    manager.record(2)
+
+    reloaded = ScoreManager(path)
+    reloaded.load()
+    assert reloaded.history == [3, 9, 1, 2]
+    assert reloaded.high_score == 9
+
+
+def test_convert_between_formats(tmp_path: Path) -> None:
+    source = tmp_path / "profiles.json"
+    _sample_profiles(source)
+    binary = tmp_path / "profiles.bin"
+    assert binfmt.convert(source, binary, "binary") == 2
+    back = tmp_path / "back.json"
+    binfmt.main(["to-json", str(binary), str(back)])
+    assert not binfmt.is_binary(back)
+    loaded = ProfileManager(back)
+    loaded.load()
+    assert loaded.get_profile("alice").history == [4, 8]
+
+
+def test_rejects_wrong_kind(tmp_path: Path) -> None:
+    path = tmp_path / "profiles.bin"
+    _sample_profiles(path)
+    with pytest.raises(ValueError):
+        binfmt.decode_scores(path.read_bytes())
@@ -1,6 +1,10 @@
 import builtins
+import contextlib
+import json
 from typing import List
 
+import pytest
+
 from src import cli
 
 
@@ -29,8 +33,9 @@ def _make_dummy_profile_manager():
     class DummyProfileManager:
         instances: List["DummyProfileManager"] = []
 
-        def __init__(self):
+        def __init__(self, *args, **kwargs):
             self.saved: dict[str, List[int]] = {}
+            self.closed = False
             DummyProfileManager.instances.append(self)
 
         def load(self) -> None:  # pragma: no cover - trivial
@@ -50,9 +55,29 @@ def _make_dummy_profile_manager():
         def save(self) -> None:  # pragma: no cover - trivial
             pass
 
+        @contextlib.contextmanager
+        def batch(self):
+            yield self
+
+        def update_settings(self, name: str, settings) -> None:
+            pass
+
+        def close(self) -> None:
+            self.closed = True
+
         def leaderboard(self):  # pragma: no cover - minimal
             return [(name, max(scores)) for name, scores in self.saved.items()]
 
+        def top(self, k: int):
+            return sorted(self.leaderboard(), key=lambda item: -item[1])[:k]
+
+        def rank(self, name: str):
+            names = [entry[0] for entry in self.top(len(self.saved))]
+            return names.index(name) + 1 if name in names else None
+
+        def neighbours(self, name: str, radius: int = 2):  # pragma: no cover
+            return []
+
         def import_data(self, path):  # pragma: no cover - trivial
             pass
 
@@ -76,7 +101,7 @@ def test_cli_invalid_input(monkeypatch, capsys):
     monkeypatch.setattr(cli, "ScoreManager", Dummy)
     monkeypatch.setattr(cli, "ProfileManager", DummyProfile)
     monkeypatch.setattr(cli, "generate_next_note", lambda diff: 1)
-    monkeypatch.setattr(cli, "play_sequence", lambda seq, use_audio=False, delay=0: None)
+    monkeypatch.setattr(cli, "play_sequence", lambda seq, **_: None)
 
     inputs = iter(["not numbers", "n"])
     monkeypatch.setattr(builtins, "input", lambda _: next(inputs))
@@ -95,7 +120,7 @@ def test_cli_level_progress_and_score_update(monkeypatch, capsys):
 
     notes = iter([1, 2])
     monkeypatch.setattr(cli, "generate_next_note", lambda diff: next(notes))
-    monkeypatch.setattr(cli, "play_sequence", lambda seq, use_audio=False, delay=0: None)
+    monkeypatch.setattr(cli, "play_sequence", lambda seq, **_: None)
 
     inputs = iter(["1", "1 2", "n"])
     monkeypatch.setattr(builtins, "input", lambda _: next(inputs))
@@ -106,3 +131,95 @@ def test_cli_level_progress_and_score_update(monkeypatch, capsys):
     assert "Congratulations! You completed all levels." in out
     assert "New high score: 2!" in out
     assert Dummy.instances[0].saved == [2]
+
+
+def test_cli_closes_profiles_when_input_ends(monkeypatch):
+    DummyProfile = _make_dummy_profile_manager()
+    monkeypatch.setattr(cli, "ScoreManager", _make_dummy_manager())
+    monkeypatch.setattr(cli, "ProfileManager", DummyProfile)
+    monkeypatch.setattr(cli, "play_sequence", lambda seq, **_: None)
+
+    def no_input(_):
+        raise EOFError
+
+    monkeypatch.setattr(builtins, "input", no_input)
+    with pytest.raises(EOFError):
+        cli.main(["--levels", "2"])
+    assert DummyProfile.instances[0].closed
+
+
+def test_cli_type_ahead_cancels_background_playback(monkeypatch, capsys):
+    Dummy = _make_dummy_manager()
+    DummyProfile = _make_dummy_profile_manager()
+    monkeypatch.setattr(cli, "ScoreManager", Dummy)
+    monkeypatch.setattr(cli, "ProfileManager", DummyProfile)
+    monkeypatch.setattr(cli, "generate_next_note", lambda diff: 3)
+
+    handles = []
+    real_async = cli.play_sequence_async
+
+    def spy(seq, **kwargs):
+        kwargs["delay"] = 10  # would block for a long time if not cancelled
+        handles.append(real_async(seq, **kwargs))
+        return handles[-1]
+
+    monkeypatch.setattr(cli, "play_sequence_async", spy)
+    inputs = iter(["3", "n"])
+    monkeypatch.setattr(builtins, "input", lambda _: next(inputs))
+
+    cli.main(["--levels", "1", "--type-ahead"])
+    assert handles[0].done and handles[0].cancelled
+    assert "Congratulations! You completed all levels." in capsys.readouterr().out
+
+
+def test_cli_metrics_dump(monkeypatch, tmp_path):
+    from src import metrics
+
+    Dummy = _make_dummy_manager()
+    DummyProfile = _make_dummy_profile_manager()
+    monkeypatch.setattr(cli, "ScoreManager", Dummy)
+    monkeypatch.setattr(cli, "ProfileManager", DummyProfile)
+    monkeypatch.setattr(cli, "generate_next_note", lambda diff: 1)
+    monkeypatch.setattr(cli, "play_sequence", lambda seq, **_: None)
+    inputs = iter(["1", "n"])
+    monkeypatch.setattr(builtins, "input", lambda _: next(inputs))
+
+    metrics.REGISTRY.reset()
+    dump = tmp_path / "metrics.json"
+    try:
+        cli.main(["--levels", "1", "--metrics-dump", str(dump)])
+    finally:
+        metrics.disable()
+    counters = json.loads(dump.read_text())["counters"]
+    assert counters["games_started_total"] == 1
+    assert counters["games_finished_total"] == 1
+
+
+def test_startup_skips_optional_dependencies():
+    import subprocess
+    import sys
+
+    code = (
+        "import sys, src.main, src.cli; src.cli.parse_args([]); "
+        "print(sorted({'numpy', 'simpleaudio', 'colorama', 'asyncio'} & set(sys.modules)))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    assert out.strip() == "[]"
+
+
+def test_cli_wrong_note_ends_before_rest_is_parsed(monkeypatch, capsys):
+    Dummy = _make_dummy_manager()
+    DummyProfile = _make_dummy_profile_manager()
+    monkeypatch.setattr(cli, "ScoreManager", Dummy)
+    monkeypatch.setattr(cli, "ProfileManager", DummyProfile)
+    monkeypatch.setattr(cli, "generate_next_note", lambda diff: 1)
+    monkeypatch.setattr(cli, "play_sequence", lambda seq, **_: None)
+    inputs = iter(["2 not-a-number", "n"])
+    monkeypatch.setattr(builtins, "input", lambda _: next(inputs))
+
+    cli.main(["--levels", "1"])
+    out = capsys.readouterr().out
+    assert "Wrong sequence. Game over. Expected 1" in out
+    assert Dummy.instances[0].saved == [0]
@@ -0,0 +1,47 @@
+import struct
+from pathlib import Path
+
+from src.clips import ClipCache, clip_key, clip_length, default_directory, wav_header
+
+
+def test_key_and_length_depend_on_the_content() -> None:
+    assert clip_key([1, 2], 0.5, 8000) == clip_key([1, 2], 0.5, 8000)
+    assert clip_key([1, 2], 0.5, 8000) != clip_key([2, 1], 0.5, 8000)
+    assert clip_key([1, 2], 0.5, 8000, "wav") != clip_key([1, 2], 0.5, 8000, "pcm")
+    assert clip_length(2, 0.1, 8000, "pcm", duration=0.4) == 2 * (3200 + 800) * 2
+    assert clip_length(2, 0.1, 8000, "wav", duration=0.4) == 44 + 2 * (3200 + 800) * 2
+    header = wav_header(100, 8000)
+    assert len(header) == 44
+    assert struct.unpack_from("<4sI4s", header) == (b"RIFF", 136, b"WAVE")
+
+
+def test_cache_fills_once_and_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = ClipCache(tmp_path, max_bytes=10)
+    assert b"".join(cache.stream("aa1", iter([b"abc", b"def"]))) == b"abcdef"
+    assert b"".join(cache.stream("aa1", iter([b"unused"]))) == b"abcdef"
+    b"".join(cache.stream("bb2", iter([b"1234"])))
+    assert "aa1" in cache and cache.bytes == 10
+    # Touch aa1 so bb2 is the one evicted.
+    b"".join(cache.stream("aa1", iter(())))
+    b"".join(cache.stream("cc3", iter([b"xy"])))
+    assert "bb2" not in cache and not cache.path("bb2").exists()
+    assert cache.info()["evictions"] == 1
+
+    reopened = ClipCache(tmp_path, max_bytes=10)
+    assert "aa1" in reopened and "cc3" in reopened and reopened.bytes == 8
+
+
+def test_abandoned_stream_leaves_no_entry(tmp_path: Path) -> None:
+    cache = ClipCache(tmp_path)
+    stream = cache.stream("dd4", iter([b"a", b"b", b"c"]))
+    assert next(stream) == b"a"
+    stream.close()
+    assert "dd4" not in cache
+    assert list((tmp_path / "dd").iterdir()) == []
+
+
+def test_default_directory_is_outside_the_package(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert ClipCache().directory == default_directory() == tmp_path / "musical-memory" / "clips"
+    monkeypatch.delenv("XDG_CACHE_HOME")
+    assert default_directory() == Path.home() / ".cache" / "musical-memory" / "clips"
@@ -36,3 +36,67 @@ def test_clear_memory():
     memory.add_note("G")
     memory.clear()
     assert memory.recall() == []
+
+
+def test_extend_and_len():
+    memory = MusicalMemory()
+    memory.add_note("C")
+    memory.extend(["D", "E", "C"])
+    assert len(memory) == 4
+    assert memory.recall() == ["C", "D", "E", "C"]
+
+
+def test_extend_is_all_or_nothing():
+    memory = MusicalMemory()
+    memory.add_note("C")
+    with pytest.raises(ValueError):
+        memory.extend(["D", ""])
+    assert memory.recall() == ["C"]
+
+
+def test_recall_view_is_read_only_and_live():
+    memory = MusicalMemory()
+    memory.extend(["A", "B"])
+    view = memory.recall_view()
+    assert view == ["A", "B"] and view[-1] == "B" and view[0:1] == ["A"]
+    with pytest.raises(TypeError):
+        view[0] = "C"  # type: ignore[index]
+    memory.add_note("C")
+    assert list(view) == ["A", "B", "C"] and "C" in view
+    memory.clear()
+    assert len(view) == 0
+
+
+def test_many_distinct_notes_widen_codes():
+    memory = MusicalMemory()
+    memory.add_note("C")
+    names = [f"note-{i}" for i in range(300)]
+    memory.extend(names)
+    assert memory.recall() == ["C"] + names
+    assert memory.recall_view()[-1] == "note-299"
+
+
+def test_full_alphabet_falls_back_to_strings(monkeypatch):
+    from musical_memory import core
+
+    before = MusicalMemory()
+    before.extend(["C", "D"])
+    monkeypatch.setattr(core, "_MAX_CODES", len(core._ALPHABET))
+    memory = MusicalMemory()
+    memory.extend(["C", "never-seen-1"])
+    memory.add_note("never-seen-2")
+    memory.add_note("D")
+    assert memory.recall() == ["C", "never-seen-1", "never-seen-2", "D"]
+    view = memory.recall_view()
+    assert view[1] == "never-seen-1" and view[2:] == ["never-seen-2", "D"]
+    assert view[:1] == before.recall_view()[:1] and view != before.recall_view()
+    before.add_note("never-seen-3")
+    assert before.recall() == ["C", "D", "never-seen-3"]
+    with pytest.raises(ValueError):
+        memory.add_note("")
+
+
+def test_slots_keep_instances_small():
+    memory = MusicalMemory()
+    with pytest.raises(AttributeError):
+        memory.extra = 1  # type: ignore[attr-defined]
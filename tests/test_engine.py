@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from src.engine import GameSession, iter_guess, parse_guess, perfect_bot, random_bot, record_game
+from src.game import sequence_from_seed
+from src.profile import ProfileManager
+from src.score import ScoreManager
+
+
+def test_levels_grow_by_step_and_score_on_correct_guesses() -> None:
+    notes = iter(range(100))
+    game = GameSession(levels=3, step=2, note_source=lambda difficulty: next(notes))
+    assert game.next_level() == [0, 1]
+    assert game.submit((0, 1)) is True and game.score == 1 and not game.finished
+    assert game.next_level() == [0, 1, 2, 3]
+    assert game.submit([0, 1, 2]) is False
+    assert game.finished and game.score == 1 and not game.completed
+    with pytest.raises(RuntimeError):
+        game.next_level()
+
+
+def test_base_length_sets_the_first_level() -> None:
+    notes = iter(range(100))
+    game = GameSession(levels=3, step=2, note_source=lambda difficulty: next(notes), base_length=3)
+    assert game.next_level() == [0, 1, 2]
+    assert game.submit([0, 1, 2])
+    assert game.next_level() == [0, 1, 2, 3, 4]
+    with pytest.raises(ValueError):
+        GameSession(base_length=0)
+
+
+def test_completing_every_level_and_reset() -> None:
+    game = GameSession(levels=4, seed=7)
+    assert perfect_bot(game) == 4 and game.completed
+    sequence = game.sequence
+    game.reset()
+    assert game.sequence is sequence and game.sequence == [] and not game.finished
+    assert game.finish() == 0 and game.finished
+
+
+def test_seeded_sessions_match_sequence_from_seed_and_resume() -> None:
+    game = GameSession(levels=5, step=3, difficulty="hard", seed=99)
+    for _ in range(4):
+        game.next_level()
+    assert game.sequence == sequence_from_seed(99, 4, "hard", base_length=3, step=3)
+
+    resumed = GameSession.resume(99, level=4, score=3, levels=5, step=3, difficulty="hard")
+    assert resumed.sequence == game.sequence and resumed.score == 3
+
+
+def test_random_bot_and_guess_parsing() -> None:
+    rng = random.Random(1)
+    game = GameSession(levels=50)
+    assert random_bot(game, 0.0, rng) == 0
+    game.reset()
+    assert random_bot(game, 1.0, rng) == 50
+    assert parse_guess(" 1 2  3 ") == [1, 2, 3]
+    with pytest.raises(ValueError):
+        parse_guess("1 a")
+    with pytest.raises(ValueError):
+        GameSession(levels=0)
+
+
+def test_typed_guess_is_verified_note_by_note() -> None:
+    game = GameSession(levels=2, seed=3)
+    sequence = list(game.next_level())
+    verifier = game.verifier()
+    assert verifier.feed_many(iter_guess(" ".join(map(str, sequence))))
+    assert game.submit(verifier) and game.score == 1
+    game.next_level()
+    verifier = game.verifier()
+    # The wrong first note stops parsing before the non-number.
+    wrong = 1 if game.sequence[0] != 1 else 2
+    assert not verifier.feed_many(iter_guess(f"{wrong} oops"))
+    assert verifier.error_index == 0
+    assert not game.submit(verifier) and game.finished
+
+
+def test_record_game_updates_scores_and_profile(tmp_path) -> None:
+    scores = ScoreManager(tmp_path / "scores.json")
+    scores.load()
+    profiles = ProfileManager(tmp_path / "profiles.json")
+    assert record_game(scores, profiles, "ann", 3, {"difficulty": "easy"}) is True
+    assert record_game(scores, profiles, "ann", 2, {"difficulty": "hard"}) is False
+    profile = profiles.get_profile("ann")
+    assert profile.history == [3, 2] and profile.settings == {"difficulty": "hard"}
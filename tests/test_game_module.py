@@ -33,3 +33,173 @@ def test_play_sequence_uses_mocked_audio(monkeypatch):
 def test_check_sequence():
     assert game.check_sequence([1, 2], [1, 2])
     assert not game.check_sequence([1, 2], [2, 1])
+
+
+def test_tone_cache_hits_and_lru_eviction():
+    pytest.importorskip("numpy")
+    cache = game.ToneCache(maxsize=2)
+    first = cache.get(440.0)
+    assert cache.get(440.0) is first
+    cache.get(261.63)
+    cache.get(293.66)  # evicts 440.0, the least recently used entry
+    assert cache.info() == {"hits": 1, "misses": 3, "evictions": 1, "size": 2, "maxsize": 2}
+    assert cache.get(440.0) is not first
+    assert not first.flags.writeable
+
+
+def test_tone_cache_warm_up_renders_difficulty_pool():
+    pytest.importorskip("numpy")
+    cache = game.ToneCache()
+    assert cache.warm_up("medium") == len(game.DIFFICULTY_NOTES["medium"])
+    for note in game.DIFFICULTY_NOTES["medium"]:
+        cache.get(game._freq_of(note))
+    assert cache.info()["hits"] == len(game.DIFFICULTY_NOTES["medium"])
+
+
+def test_render_sequence_is_contiguous_with_gaps():
+    np = pytest.importorskip("numpy")
+    rate, duration, gap = 8000, 0.05, 0.025
+    audio = game.render_sequence([1, 2, 3], gap=gap, duration=duration, sample_rate=rate)
+    note_len, stride = int(rate * duration), int(rate * (duration + gap))
+    assert audio.dtype == np.int16
+    assert len(audio) == 3 * stride
+    tone = game.TONE_CACHE.get(game._freq_of(2), duration, rate)
+    assert np.array_equal(audio[stride:stride + note_len], tone)
+    assert not audio[note_len:stride].any()
+
+
+def test_iter_sequence_chunks_matches_full_render():
+    np = pytest.importorskip("numpy")
+    seq = [1, 2, 3, 4, 5]
+    chunks = list(game.iter_sequence_chunks(seq, gap=0.01, sample_rate=8000, chunk_notes=2))
+    assert len(chunks) == 3
+    full = game.render_sequence(seq, gap=0.01, sample_rate=8000)
+    assert np.array_equal(np.concatenate(chunks), full)
+
+
+def test_gapless_playback_streams_chunks(monkeypatch, capsys):
+    np = pytest.importorskip("numpy")
+    played = []
+
+    class FakeAudio:
+        @staticmethod
+        def play_buffer(audio, *args):
+            played.append(audio)
+            return FakeAudio
+
+        @staticmethod
+        def wait_done():
+            pass
+
+    monkeypatch.setattr(game, "_simpleaudio", lambda: FakeAudio)
+    monkeypatch.setattr(game, "GAPLESS_CHUNK_NOTES", 2)
+    seq = [1, 2, 3, 4, 5]
+    game.play_sequence(seq, use_audio=True, delay=0.01, gapless=True)
+    assert capsys.readouterr().out.split() == ["1", "2", "3", "4", "5"]
+    assert [len(audio) for audio in played] == [len(c) for c in game.iter_sequence_chunks(seq, 0.01, chunk_notes=2)]
+    assert np.array_equal(np.concatenate(played), game.render_sequence(seq, gap=0.01))
+
+
+def test_sequence_renderer_only_renders_new_tail(monkeypatch):
+    np = pytest.importorskip("numpy")
+    rendered = []
+    real_render = game.render_sequence
+
+    def spy(seq, *args, **kwargs):
+        rendered.append(list(seq))
+        return real_render(seq, *args, **kwargs)
+
+    monkeypatch.setattr(game, "render_sequence", spy)
+    renderer = game.SequenceRenderer(gap=0.01, sample_rate=8000)
+    renderer.render([1, 2])
+    audio = renderer.render([1, 2, 3])
+    assert rendered == [[1, 2], [3]]
+    assert np.array_equal(audio, real_render([1, 2, 3], gap=0.01, sample_rate=8000))
+
+    renderer.render([4])  # not an extension of the prefix: start over
+    assert rendered[-1] == [4]
+    assert len(renderer) == 1
+
+
+def test_play_sequence_async_reports_progress():
+    seen = []
+    handle = game.play_sequence_async([1, 2, 3], delay=0, on_progress=lambda i, n: seen.append((i, n)))
+    assert handle.wait(timeout=5)
+    assert seen == [(0, 1), (1, 2), (2, 3)]
+    assert handle.position == handle.total == 3
+    assert not handle.cancelled
+
+
+def test_play_sequence_async_cancel_stops_early():
+    handle = game.play_sequence_async(list(range(1, 9)), delay=10)
+    handle.cancel()
+    assert handle.wait(timeout=5)
+    assert handle.cancelled
+    assert handle.position < handle.total
+
+
+def test_sequence_from_seed_is_reproducible_and_prefix_stable():
+    level2 = game.sequence_from_seed(1234, 2, difficulty="hard")
+    level5 = game.sequence_from_seed(1234, 5, difficulty="hard")
+    assert level2 == game.sequence_from_seed(1234, 2, difficulty="hard")
+    assert len(level5) == game.sequence_length(5)
+    assert level5[: len(level2)] == level2
+    assert set(level5) <= set(game.DIFFICULTY_NOTES["hard"])
+
+
+def test_generate_sequences_batch_matches_seeded_sequences():
+    np = pytest.importorskip("numpy")
+    seeds = [0, 1, 2**63 + 5, 987654321]
+    codes = game.generate_sequences_batch(seeds, 7, difficulty="medium")
+    assert codes.shape == (4, 7) and codes.dtype == np.uint8
+    for seed, row in zip(seeds, codes):
+        expected = game.sequence_from_seed(seed, 5, difficulty="medium")
+        assert game.decode_sequence(row, difficulty="medium") == expected
+
+
+def test_numpy_is_imported_on_first_use(monkeypatch):
+    np = pytest.importorskip("numpy")
+    monkeypatch.delitem(game.__dict__, "np", raising=False)
+    assert "np" not in game.__dict__
+    assert game.np is np
+    assert game._render_tone(440.0, 0.01, 8000).dtype == np.int16
+
+
+def test_sequence_verifier_stops_at_first_mismatch():
+    verifier = game.SequenceVerifier([1, 2, 3])
+    assert verifier.feed(1) and verifier.ok and not verifier.complete
+    consumed = []
+
+    def notes():
+        for note in (2, 4, 5):
+            consumed.append(note)
+            yield note
+
+    assert not verifier.feed_many(notes())
+    assert consumed == [2, 4]  # nothing read after the wrong note
+    assert verifier.error_index == 2 and verifier.position == 2
+    assert not verifier.feed(3)
+    verifier.reset()
+    assert verifier.feed_many([1, 2, 3]) and verifier.complete
+    assert not verifier.feed(1) and verifier.error_index == 3  # too long
+
+
+def test_sequence_verifier_resumes_from_position():
+    verifier = game.SequenceVerifier("CDE", position=2)
+    assert verifier.feed("E") and verifier.complete
+    with pytest.raises(ValueError):
+        game.SequenceVerifier([1], position=2)
+
+
+def test_check_sequence_accepts_any_iterables():
+    assert game.check_sequence((1, 2), iter([1, 2]))
+    assert not game.check_sequence(iter([1, 2]), [1, 2, 3])
+    assert not game.check_sequence([1, 2], iter([1]))
+
+
+def test_seeded_sequence_matches_sequence_from_seed():
+    lazy = game.SeededSequence(7, 4, "hard", base_length=2, step=2)
+    assert list(lazy) == game.sequence_from_seed(7, 4, "hard", base_length=2, step=2)
+    assert lazy[-1] == lazy[len(lazy) - 1] and lazy[1:3] == list(lazy)[1:3]
+    with pytest.raises(IndexError):
+        lazy[len(lazy)]
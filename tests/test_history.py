@@ -0,0 +1,38 @@
+import pytest
+
+from src.history import ScoreHistory
+
+
+def test_ring_buffer_keeps_latest_scores():
+    history = ScoreHistory(range(1, 8), capacity=3)
+    assert history == [5, 6, 7]
+    assert len(history) == 3
+    assert history[0] == 5 and history[-1] == 7
+    with pytest.raises(ValueError):
+        history.append(-1)
+
+
+def test_aggregates_and_percentiles():
+    history = ScoreHistory([1, 1, 2, 3, 3, 3, 4, 5, 8, 10], capacity=4)
+    stats = history.stats()
+    assert stats["count"] == 10
+    assert stats["best"] == 10
+    assert stats["mean"] == 4.0
+    assert stats["p50"] == 3
+    assert stats["p90"] == 8
+    assert stats["histogram"][3] == 3
+
+
+def test_restore_and_merge():
+    source = ScoreHistory([2, 9, 4], capacity=2)
+    restored = ScoreHistory.restore(list(source), source.stats_state(), capacity=2)
+    assert restored == [9, 4]
+    assert restored.stats() == source.stats()
+
+    legacy = ScoreHistory.restore([1, 2, 3], None, capacity=2)
+    assert legacy.count == 3 and legacy == [2, 3]
+
+    restored.merge(legacy)
+    assert restored.count == 6
+    assert restored.best == 9
+    assert restored == [2, 3]
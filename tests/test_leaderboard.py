@@ -0,0 +1,37 @@
+import random
+
+from src.leaderboard import Leaderboard
+
+
+def _expected(scores):
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+
+def test_leaderboard_matches_sorted_reference_under_random_updates():
+    rng = random.Random(7)
+    scores = {f"p{i}": rng.randrange(20) for i in range(50)}
+    board = Leaderboard(scores.items(), seed=1)
+    for _ in range(2000):
+        name = f"p{rng.randrange(80)}"
+        if rng.random() < 0.1:
+            assert board.remove(name) == (name in scores)
+            scores.pop(name, None)
+        else:
+            scores[name] = rng.randrange(20)
+            board.update(name, scores[name])
+    expected = _expected(scores)
+    assert list(board) == expected
+    assert len(board) == len(expected)
+    assert board.page(5, 10) == expected[5:15]
+    for position, (name, _) in enumerate(expected, 1):
+        assert board.rank(name) == position
+
+
+def test_leaderboard_edges():
+    board = Leaderboard([("a", 3), ("b", 2), ("c", 1)])
+    assert board.top(10) == [("a", 3), ("b", 2), ("c", 1)]
+    assert board.neighbours("a", radius=1) == [("a", 3), ("b", 2)]
+    assert board.neighbours("c", radius=5) == [("a", 3), ("b", 2), ("c", 1)]
+    assert board.neighbours("missing") == []
+    assert board.page(3, 2) == []
+    assert board.rank("missing") is None
@@ -0,0 +1,95 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from src import metrics
+from src.profile import ProfileManager
+from src.score import ScoreManager
+
+
+@pytest.fixture
+def recording():
+    metrics.REGISTRY.reset()
+    metrics.enable()
+    yield metrics.REGISTRY
+    metrics.disable()
+    metrics.REGISTRY.reset()
+
+
+def test_disabled_metrics_record_nothing() -> None:
+    counter = metrics.Counter("c", "help")
+    histogram = metrics.Histogram("h", "help")
+    calls = []
+
+    @metrics.timed("test_disabled_seconds", "help")
+    def work(x: int) -> int:
+        calls.append(x)
+        return x * 2
+
+    assert not metrics.enabled()
+    counter.inc()
+    histogram.observe(0.5)
+    assert work(21) == 42 and calls == [21]
+    assert counter.value == 0 and histogram.count == 0
+    assert metrics.REGISTRY.snapshot()["histograms"]["test_disabled_seconds"]["count"] == 0
+
+
+def test_histogram_buckets_and_prometheus_text(recording) -> None:
+    histogram = recording.histogram("test_latency_seconds", "Test latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+    recording.counter("test_events_total", "Test events").inc(3)
+
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 4 and snapshot["sum"] == pytest.approx(2.65)
+    assert snapshot["buckets"] == [["0.1", 2], ["1.0", 3], ["+Inf", 4]]
+    text = recording.render_prometheus()
+    assert "# TYPE musical_memory_test_latency_seconds histogram" in text
+    assert 'musical_memory_test_latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "musical_memory_test_latency_seconds_count 4" in text
+    assert "musical_memory_test_events_total 3" in text
+    with pytest.raises(ValueError):
+        recording.counter("test_latency_seconds", "clash")
+
+
+def test_storage_calls_are_timed_and_dumped(recording, tmp_path: Path) -> None:
+    scores = ScoreManager(tmp_path / "scores.json")
+    scores.load()
+    for score in (1, 2, 3):
+        scores.record(score)
+    profiles = ProfileManager(tmp_path / "profiles.json")
+    profiles.record_score("ann", 3)
+    profiles.top(5)
+
+    recording.dump(tmp_path / "metrics.json")
+    data = json.loads((tmp_path / "metrics.json").read_text())
+    histograms = data["histograms"]
+    assert histograms["score_load_seconds"]["count"] == 1
+    assert histograms["score_record_seconds"]["count"] == 3
+    assert histograms["profile_save_seconds"]["count"] >= 1
+    assert histograms["leaderboard_top_seconds"]["count"] == 1
+
+
+def test_web_serves_metrics(recording, tmp_path: Path) -> None:
+    from src.web import WebApp, _response
+
+    scores = ScoreManager(tmp_path / "scores.json")
+    profiles = ProfileManager(tmp_path / "profiles.json")
+    app = WebApp(scores, profiles, levels=1)
+
+    async def scenario() -> str:
+        game = app.start_game({"user": "ann"})
+        _, sequence = await app.dispatch("GET", f"/api/games/{game['id']}/sequence", b"")
+        body = json.dumps({"guess": sequence["sequence"]}).encode()
+        await app.dispatch("POST", f"/api/games/{game['id']}/guess", body)
+        status, text = await app.dispatch("GET", "/metrics", b"")
+        assert status == 200
+        return text
+
+    text = asyncio.run(scenario())
+    assert "musical_memory_games_started_total 1" in text
+    assert "musical_memory_games_finished_total 1" in text
+    assert "musical_memory_sequence_from_seed_seconds_count" in text
+    assert b"Content-Type: text/plain; version=0.0.4" in _response(200, text, True)
@@ -1,5 +1,7 @@
 from pathlib import Path
 
+import pytest
+
 from src.profile import ProfileManager
 
 
@@ -47,3 +49,163 @@ def test_reset_profile(tmp_path: Path) -> None:
     manager.load()
     assert manager.get_profile("alice").high_score == 0
     assert manager.reset_profile("bob") is False
+
+
+def test_leaderboard_queries_track_updates(tmp_path: Path) -> None:
+    manager = ProfileManager(tmp_path / "profiles.json")
+    manager.load()
+    for name, score in [("alice", 5), ("bob", 7), ("carol", 3), ("dave", 9), ("erin", 5)]:
+        manager.record_score(name, score)
+    assert manager.top(2) == [("dave", 9), ("bob", 7)]
+    assert manager.rank("erin") == 4
+    assert manager.page(2, 2) == [("alice", 5), ("erin", 5)]
+    assert manager.neighbours("alice", radius=1) == [("bob", 7), ("alice", 5), ("erin", 5)]
+
+    manager.record_score("carol", 10)
+    manager.reset_profile("dave")
+    assert manager.top(2) == [("carol", 10), ("bob", 7)]
+    assert manager.rank("dave") == 5
+
+    reloaded = ProfileManager(tmp_path / "profiles.json")
+    reloaded.load()
+    assert reloaded.leaderboard() == manager.leaderboard()
+
+
+def test_history_limit_keeps_all_time_stats(tmp_path: Path) -> None:
+    path = tmp_path / "profiles.json"
+    manager = ProfileManager(path, history_limit=2)
+    manager.load()
+    for score in (3, 6, 1, 2):
+        manager.record_score("alice", score)
+
+    reloaded = ProfileManager(path, history_limit=2)
+    reloaded.load()
+    history = reloaded.get_profile("alice").history
+    assert history == [1, 2]
+    assert history.stats()["count"] == 4
+    assert history.stats()["best"] == 6
+
+
+def test_batch_coalesces_writes(tmp_path: Path, monkeypatch) -> None:
+    manager = ProfileManager(tmp_path / "profiles.json")
+    manager.load()
+    writes = []
+    real_save = manager.save
+    monkeypatch.setattr(manager, "save", lambda: (writes.append(1), real_save()))
+
+    with manager.batch():
+        manager.record_score("alice", 4)
+        manager.update_settings("alice", {"difficulty": "hard"})
+        with manager.batch():
+            manager.record_score("bob", 2)
+        assert writes == []
+    assert writes == [1]
+    assert not manager.dirty
+
+    reloaded = ProfileManager(tmp_path / "profiles.json")
+    reloaded.load()
+    assert reloaded.get_profile("alice").settings == {"difficulty": "hard"}
+    assert reloaded.leaderboard() == [("alice", 4), ("bob", 2)]
+
+
+def test_write_behind_defers_until_close(tmp_path: Path) -> None:
+    path = tmp_path / "profiles.json"
+    manager = ProfileManager(path, write_behind=60)
+    manager.load()
+    manager.record_score("alice", 3)
+    manager.record_score("alice", 5)
+    assert not path.exists() and manager.dirty
+    manager.close()
+    assert not manager.dirty
+
+    reloaded = ProfileManager(path)
+    reloaded.load()
+    assert reloaded.get_profile("alice").history == [3, 5]
+
+
+@pytest.mark.parametrize("name", ["export.jsonl", "export.jsonl.gz", "export.json.gz"])
+def test_streaming_export_import_roundtrip(tmp_path: Path, name: str) -> None:
+    manager = ProfileManager(tmp_path / "profiles.json")
+    manager.load()
+    manager.record_score("alice", 4)
+    manager.record_score("bob", 6)
+    manager.update_settings("bob", {"difficulty": "hard"})
+    export_path = tmp_path / name
+    manager.export_data(export_path)
+    if name.endswith(".gz"):
+        assert export_path.read_bytes()[:2] == b"\x1f\x8b"
+
+    seen = []
+    target = ProfileManager(tmp_path / "other.json")
+    target.load()
+    target.record_score("alice", 9)
+    assert target.import_data(export_path, progress=seen.append) == 2
+    assert seen == [2]
+    assert target.leaderboard() == [("alice", 9), ("bob", 6)]
+    assert target.get_profile("alice").history == [9, 4]
+    assert target.get_profile("bob").settings == {"difficulty": "hard"}
+
+
+def test_lazy_load_materialises_on_demand(tmp_path: Path) -> None:
+    path = tmp_path / "profiles.json"
+    manager = ProfileManager(path)
+    manager.load()
+    with manager.batch():
+        for name, score in [("alice", 5), ("bob", 7), ("carol", 3), ("dave", 1)]:
+            manager.record_score(name, score)
+        manager.update_settings("dave", {"tempo": 0.2})
+
+    lazy = ProfileManager(path, lazy=True)
+    lazy.load()
+    assert lazy.profiles == {}
+    assert lazy.get_profile("bob").history == [7]
+    assert list(lazy.profiles) == ["bob"]
+    assert lazy.leaderboard() == [("bob", 7), ("alice", 5), ("carol", 3), ("dave", 1)]
+
+    lazy.record_score("alice", 9)
+    assert lazy.rank("alice") == 1
+    assert lazy.reset_profile("carol") is True
+    assert sorted(p.name for p in lazy.iter_profiles()) == ["alice", "bob", "carol", "dave"]
+    assert "dave" not in lazy.profiles
+
+    full = ProfileManager(path)
+    full.load()
+    assert full.leaderboard() == [("alice", 9), ("bob", 7), ("dave", 1), ("carol", 0)]
+    assert full.get_profile("dave").settings == {"tempo": 0.2}
+
+
+def test_lazy_load_falls_back_when_index_is_stale(tmp_path: Path) -> None:
+    path = tmp_path / "profiles.json"
+    manager = ProfileManager(path)
+    manager.load()
+    manager.record_score("alice", 5)
+    path.write_text('{"profiles": {"zoe": {"high_score": 2, "history": [2]}}}')
+
+    lazy = ProfileManager(path, lazy=True)
+    lazy.load()
+    assert list(lazy.profiles) == ["zoe"]
+    assert lazy.leaderboard() == [("zoe", 2)]
+
+
+def test_save_merges_changes_from_another_writer(tmp_path: Path) -> None:
+    path = tmp_path / "profiles.json"
+    seed = ProfileManager(path)
+    seed.record_score("alice", 4)
+
+    first = ProfileManager(path)
+    second = ProfileManager(path)
+    first.load()
+    second.load()
+    first.record_score("alice", 6)
+    first.record_score("bob", 2)
+    second.record_score("alice", 9)
+    second.update_settings("alice", {"tempo": 0.3})
+
+    reloaded = ProfileManager(path)
+    reloaded.load()
+    alice = reloaded.get_profile("alice")
+    assert sorted(alice.history) == [4, 6, 9]
+    assert alice.high_score == 9
+    assert alice.settings == {"tempo": 0.3}
+    assert reloaded.get_profile("bob").history == [2]
+    assert reloaded.leaderboard() == [("alice", 9), ("bob", 2)]
@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import pytest
+
+from src.profile import ProfileManager, UserProfile
+from src.profile_shards import ShardedProfileManager, shard_of
+
+
+def _populate(manager: ProfileManager, count: int) -> None:
+    with manager.batch():
+        for i in range(count):
+            manager.record_score(f"player{i}", i % 7)
+
+
+def test_write_touches_only_the_players_shard(tmp_path: Path) -> None:
+    path = tmp_path / "profiles.d"
+    manager = ShardedProfileManager(path, shards=4)
+    _populate(manager, 40)
+    stamps = {i: manager.shard_path(i).stat().st_ino for i in range(4)}
+
+    manager.record_score("player3", 50)
+    changed = [i for i in range(4) if manager.shard_path(i).stat().st_ino != stamps[i]]
+    assert changed == [shard_of("player3", 4)]
+    assert manager.rank("player3") == 1
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_parallel_load_matches_written_profiles(tmp_path: Path, processes: bool) -> None:
+    path = tmp_path / "profiles.d"
+    manager = ShardedProfileManager(path, shards=4)
+    _populate(manager, 40)
+
+    # The manifest's shard count wins over the constructor argument.
+    loaded = ShardedProfileManager(path, shards=9, processes=processes, workers=2)
+    loaded.load()
+    assert loaded.shards == 4
+    assert loaded.profiles == manager.profiles
+    assert loaded.leaderboard() == manager.leaderboard()
+    assert loaded.top(3) == [("player13", 6), ("player20", 6), ("player27", 6)]
+
+
+@pytest.mark.parametrize("name", ["dump.json", "dump.jsonl"])
+def test_export_matches_single_file_manager(tmp_path: Path, name: str) -> None:
+    sharded = ShardedProfileManager(tmp_path / "profiles.d", shards=3)
+    _populate(sharded, 20)
+    sharded.export_data(tmp_path / name)
+
+    single = ProfileManager(tmp_path / "profiles.json")
+    assert single.import_data(tmp_path / name) == 20
+    assert single.leaderboard() == sharded.leaderboard()
+
+
+def test_shard_saves_merge_other_writers(tmp_path: Path) -> None:
+    path = tmp_path / "profiles.d"
+    first = ShardedProfileManager(path, shards=2)
+    second = ShardedProfileManager(path, shards=2)
+    first.load()
+    second.load()
+    first.record_score("alice", 3)
+    second.record_score("alice", 5)
+
+    reloaded = ShardedProfileManager(path)
+    reloaded.load()
+    assert sorted(reloaded.get_profile("alice").history) == [3, 5]
+    assert reloaded.leaderboard() == [("alice", 5)]
+
+
+def test_save_writes_profiles_edited_directly(tmp_path: Path) -> None:
+    path = tmp_path / "profiles.d"
+    manager = ShardedProfileManager(path, shards=3)
+    _populate(manager, 6)
+    manager.profiles["zoe"] = UserProfile("zoe", high_score=9)
+    manager.profiles["player1"].settings["difficulty"] = "hard"
+    manager.save()
+
+    reloaded = ShardedProfileManager(path)
+    reloaded.load()
+    assert reloaded.get_profile("zoe").high_score == 9
+    assert reloaded.get_profile("player1").settings == {"difficulty": "hard"}
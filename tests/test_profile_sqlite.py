@@ -0,0 +1,90 @@
+from pathlib import Path
+
+from src.profile import ProfileManager
+from src.profile_sqlite import SQLiteProfileManager
+
+
+def test_sqlite_record_and_leaderboard(tmp_path: Path) -> None:
+    manager = SQLiteProfileManager(tmp_path / "profiles.db")
+    manager.load()
+    manager.record_score("alice", 5)
+    manager.record_score("bob", 7)
+    manager.record_score("carol", 5)
+    assert manager.leaderboard() == [("bob", 7), ("alice", 5), ("carol", 5)]
+    assert manager.top(2) == [("bob", 7), ("alice", 5)]
+    assert manager.rank("carol") == 3
+    assert manager.rank("nobody") is None
+
+    profile = manager.get_profile("alice")
+    profile.settings["difficulty"] = "hard"
+    manager.save()
+    manager.close()
+
+    reopened = SQLiteProfileManager(tmp_path / "profiles.db")
+    reopened.load()
+    alice = reopened.get_profile("alice")
+    assert alice.history == [5]
+    assert alice.settings == {"difficulty": "hard"}
+    assert reopened.reset_profile("bob") is True
+    assert reopened.reset_profile("dave") is False
+    assert reopened.top(1) == [("alice", 5)]
+
+
+def test_sqlite_migration_and_export(tmp_path: Path) -> None:
+    legacy = ProfileManager(tmp_path / "profiles.json")
+    legacy.load()
+    legacy.record_score("alice", 4)
+    legacy.record_score("alice", 9)
+
+    manager = SQLiteProfileManager(tmp_path / "profiles.db")
+    manager.load()
+    assert manager.migrate_from_json(legacy.file_path) == 1
+    assert manager.get_profile("alice").history == [4, 9]
+
+    export_path = tmp_path / "export.json"
+    manager.export_data(export_path)
+    roundtrip = ProfileManager(tmp_path / "other.json")
+    roundtrip.load()
+    roundtrip.import_data(export_path)
+    assert roundtrip.leaderboard() == [("alice", 9)]
+
+
+def test_sqlite_page_and_neighbours(tmp_path: Path) -> None:
+    manager = SQLiteProfileManager(tmp_path / "profiles.db")
+    manager.load()
+    for name, score in [("a", 4), ("b", 3), ("c", 2), ("d", 1)]:
+        manager.record_score(name, score)
+    assert manager.page(1, 2) == [("b", 3), ("c", 2)]
+    assert manager.neighbours("c", radius=1) == [("b", 3), ("c", 2), ("d", 1)]
+
+
+def test_sqlite_batch_writes_dirty_rows_once(tmp_path: Path) -> None:
+    manager = SQLiteProfileManager(tmp_path / "profiles.db")
+    manager.load()
+    manager.record_score("alice", 1)
+    upserts = []
+    real_upsert = manager._upsert
+    manager._upsert = lambda profiles: (upserts.append([p.name for p in profiles]), real_upsert(profiles))
+
+    with manager.batch():
+        manager.record_score("bob", 3)
+        manager.update_settings("bob", {"tempo": 0.3})
+    assert upserts == [["bob"]]
+    assert manager.top(1) == [("bob", 3)]
+
+
+def test_sqlite_import_evicts_imported_profiles(tmp_path: Path, monkeypatch) -> None:
+    import src.profile as profile_module
+
+    monkeypatch.setattr(profile_module, "IMPORT_CHUNK", 2)
+    dump = tmp_path / "dump.jsonl"
+    dump.write_text(
+        "".join(f'{{"name": "p{i}", "high_score": {i}, "history": [{i}]}}\n' for i in range(5))
+    )
+    manager = SQLiteProfileManager(tmp_path / "profiles.db")
+    manager.load()
+    seen = []
+    assert manager.import_data(dump, progress=seen.append) == 5
+    assert seen == [2, 4, 5]
+    assert manager.profiles == {}
+    assert manager.top(2) == [("p4", 4), ("p3", 3)]
@@ -17,3 +17,116 @@ def test_record_updates_high_score(tmp_path: Path) -> None:
 
     # History should record all scores
     assert manager.history == [10, 5]
+
+
+def test_record_appends_to_log_and_load_replays_tail(tmp_path: Path) -> None:
+    file_path = tmp_path / "scores.json"
+    manager = ScoreManager(file_path, compact_every=None)
+    manager.load()
+    manager.record(3)
+    manager.record(7)
+    assert not file_path.exists()
+    assert len(manager.log_path.read_text().splitlines()) == 2
+
+    manager.compact()
+    assert not manager.log_path.exists()
+    manager.record(4)
+
+    reloaded = ScoreManager(file_path)
+    reloaded.load()
+    assert reloaded.history == [3, 7, 4]
+    assert reloaded.high_score == 7
+
+
+def test_load_ignores_torn_log_line_and_stale_records(tmp_path: Path) -> None:
+    file_path = tmp_path / "scores.json"
+    file_path.write_text('{"high_score": 5, "history": [5], "seq": 1}')
+    log = file_path.with_name("scores.json.log")
+    log.write_text('{"seq": 1, "score": 5}\n{"seq": 2, "score": 9}\n{"seq": 3, "sco')
+    manager = ScoreManager(file_path)
+    manager.load()
+    assert manager.history == [5, 9]
+    assert manager.high_score == 9
+
+
+def test_background_compaction(tmp_path: Path) -> None:
+    file_path = tmp_path / "scores.json"
+    manager = ScoreManager(file_path, compact_every=3)
+    manager.load()
+    for score in (1, 2, 3):
+        manager.record(score)
+    manager.wait_for_compaction()
+    assert file_path.exists()
+    reloaded = ScoreManager(file_path)
+    reloaded.load()
+    assert reloaded.history == [1, 2, 3]
+
+
+def test_history_is_bounded_but_stats_cover_everything(tmp_path: Path) -> None:
+    file_path = tmp_path / "scores.json"
+    manager = ScoreManager(file_path, history_limit=3)
+    manager.load()
+    for score in (1, 2, 3, 4, 5):
+        manager.record(score)
+    manager.save()
+    assert manager.history == [3, 4, 5]
+
+    reloaded = ScoreManager(file_path, history_limit=3)
+    reloaded.load()
+    stats = reloaded.history.stats()
+    assert reloaded.history == [3, 4, 5]
+    assert (stats["count"], stats["total"], stats["best"], stats["p50"]) == (5, 15, 5, 3)
+
+
+def test_history_limit_applies_before_load(tmp_path: Path) -> None:
+    manager = ScoreManager(tmp_path / "scores.json", history_limit=3)
+    assert manager.history.capacity == 3
+    for score in (1, 2, 3, 4):
+        manager.record(score)
+    assert manager.history == [2, 3, 4]
+
+
+def _record_many(path: str, scores: list) -> None:
+    manager = ScoreManager(Path(path), compact_every=7)
+    manager.load()
+    for score in scores:
+        manager.record(score)
+    manager.wait_for_compaction()
+
+
+def test_concurrent_processes_do_not_lose_scores(tmp_path: Path) -> None:
+    import multiprocessing
+
+    file_path = tmp_path / "scores.json"
+    procs = [
+        multiprocessing.Process(target=_record_many, args=(str(file_path), [w + 1] * 20))
+        for w in range(2)
+    ]
+    for proc in procs:
+        proc.start()
+    for proc in procs:
+        proc.join()
+
+    manager = ScoreManager(file_path)
+    manager.load()
+    assert manager.history.count == 40
+    assert sorted(manager.history) == [1] * 20 + [2] * 20
+    assert manager.high_score == 2
+
+
+def test_managers_sharing_a_file_see_each_others_records(tmp_path: Path) -> None:
+    file_path = tmp_path / "scores.json"
+    first = ScoreManager(file_path, compact_every=None)
+    second = ScoreManager(file_path, compact_every=None)
+    first.load()
+    second.load()
+    first.record(5)
+    second.record(3)
+    first.compact()
+    second.record(9)
+
+    assert first.history == [5, 3]
+    assert second.history == [5, 3, 9]
+    reloaded = ScoreManager(file_path)
+    reloaded.load()
+    assert reloaded.history == [5, 3, 9]
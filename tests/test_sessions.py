@@ -0,0 +1,93 @@
+from pathlib import Path
+
+import pytest
+
+from src.game import sequence_from_seed
+from src.sessions import FileSessionStore, GameState, MemorySessionStore
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _state(user: str = "ann", level: int = 1) -> GameState:
+    return GameState(user, "easy", 2, 5, seed=42, level=level)
+
+
+def test_state_regenerates_its_sequence() -> None:
+    state = _state(level=3)
+    assert state.sequence() == sequence_from_seed(42, 3, "easy", base_length=2, step=2)
+    assert len(state.sequence()) == 6
+    assert GameState.from_list(state.to_list()) == state
+    # Journals from before ``entered`` was stored still load.
+    assert GameState.from_list(state.to_list()[:-1]) == state
+
+
+def test_ttl_is_sliding_and_expired_sessions_are_dropped() -> None:
+    clock = Clock()
+    store = MemorySessionStore(ttl=10, clock=clock)
+    store.put("a", _state())
+    store.put("b", _state("bob"))
+    clock.now += 8
+    assert store.get("a") is not None
+    clock.now += 8
+    assert store.get("a") is not None
+    assert store.get("b") is None
+    info = store.info()
+    assert info["live"] == 1 and info["expired"] == 1 and info["misses"] == 1
+
+
+def test_lru_eviction_by_count_and_memory() -> None:
+    store = MemorySessionStore(max_sessions=2)
+    store.put("a", _state())
+    store.put("b", _state())
+    store.get("a")
+    store.put("c", _state())
+    assert "b" not in store and "a" in store and "c" in store
+    assert store.evictions == 1
+
+    one = store.info()["bytes"] // 2
+    capped = MemorySessionStore(max_bytes=one * 3)
+    for i in range(10):
+        capped.put(str(i), _state())
+    assert len(capped) == 3 and capped.bytes <= one * 3
+    capped.delete("9")
+    assert len(capped) == 2 and capped.bytes <= one * 2
+
+
+def test_file_store_survives_restart(tmp_path: Path) -> None:
+    clock = Clock()
+    path = tmp_path / "sessions.jsonl"
+    store = FileSessionStore(path, ttl=10, clock=clock)
+    store.put("a", _state(level=1))
+    store.put("b", _state("bob"))
+    store.put("a", _state(level=4))
+    store.delete("b")
+    with path.open("a") as fh:
+        fh.write('{"key": "torn"')
+
+    # Reopen while the first store still holds the raw journal, as after a crash.
+    reopened = FileSessionStore(path, ttl=10, clock=clock)
+    try:
+        assert reopened.get("a") == _state(level=4)
+        assert "b" not in reopened
+        assert len(path.read_text().splitlines()) == 1
+    finally:
+        reopened.close()
+        store.close()
+
+    clock.now += 11
+    expired = FileSessionStore(path, ttl=10, clock=clock)
+    try:
+        assert len(expired) == 0
+    finally:
+        expired.close()
+
+
+def test_invalid_limits_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        MemorySessionStore(ttl=0)
@@ -0,0 +1,33 @@
+import json
+
+from src.simulate import PerfectModel, RecallModel, SpanModel, main, simulate, summary
+
+
+def test_perfect_players_complete_every_game() -> None:
+    results = simulate(50, ["easy", "hard"], [1, 2], levels=4, model=PerfectModel(), workers=1)
+    assert results == {(d, s): [0, 0, 0, 0, 50] for d in ("easy", "hard") for s in (1, 2)}
+
+
+def test_results_depend_on_the_seed_not_the_workers() -> None:
+    args = dict(games=300, difficulties=["easy", "medium"], steps=[1, 2], levels=6,
+                model=RecallModel(0.9), shard_size=70)
+    serial = simulate(**args, workers=1)
+    assert simulate(**args, workers=2) == serial
+    assert all(sum(counts) == 300 for counts in serial.values())
+    assert simulate(**args, workers=1, seed=1) != serial
+
+
+def test_span_model_finds_larger_pools_harder() -> None:
+    results = simulate(2000, ["easy", "hard"], levels=10, model=SpanModel(16, 2), workers=1)
+    assert summary(results["easy", 1])["mean"] > summary(results["hard", 1])["mean"]
+
+
+def test_main_prints_a_table_and_writes_json(tmp_path, capsys) -> None:
+    out = tmp_path / "calibration.json"
+    main(["--games", "100", "--difficulties", "easy", "--steps", "1,3", "--base-length", "2",
+          "--levels", "3", "--model", "perfect", "--workers", "1", "--json", str(out)])
+    table = capsys.readouterr().out
+    assert "easy" in table and "100.0%" in table
+    data = json.loads(out.read_text())
+    assert data["model"] == {"name": "perfect"}
+    assert [(r["step"], r["counts"]) for r in data["results"]] == [(1, [0, 0, 0, 100]), (3, [0, 0, 0, 100])]
@@ -0,0 +1,208 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import pytest
+
+from src import web
+from src.clips import ClipCache
+from src.profile import ProfileManager
+from src.score import ScoreManager
+
+
+def _make_app(tmp_path: Path, **defaults: Any) -> web.WebApp:
+    scores = ScoreManager(tmp_path / "scores.json")
+    scores.load()
+    profiles = ProfileManager(tmp_path / "profiles.json")
+    profiles.load()
+    return web.WebApp(scores, profiles, clips=ClipCache(tmp_path / "clips"), **defaults)
+
+
+async def _request(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    method: str,
+    path: str,
+    data: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> Tuple[int, Dict[str, str], Any]:
+    body = json.dumps(data).encode() if data is not None else b""
+    extra = "".join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n{extra}\r\n".encode()
+        + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode()
+        if line == "\r\n":
+            break
+        name, _, value = line.partition(":")
+        headers[name.lower()] = value.strip()
+    payload = await reader.readexactly(int(headers.get("content-length", 0)))
+    if headers.get("content-type") == "application/json":
+        return status, headers, json.loads(payload)
+    return status, headers, payload
+
+
+def test_game_over_one_keep_alive_connection(tmp_path: Path) -> None:
+    app = _make_app(tmp_path, levels=2)
+
+    async def scenario() -> None:
+        server = await app.serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        status, headers, game = await _request(reader, writer, "POST", "/api/games", {"user": "ann"})
+        assert status == 201 and headers["connection"] == "keep-alive"
+        path = f"/api/games/{game['id']}"
+
+        _, _, first = await _request(reader, writer, "GET", path + "/sequence")
+        assert first["level"] == 1 and len(first["sequence"]) == 1
+        guess = {"guess": first["sequence"]}
+        _, _, result = await _request(reader, writer, "POST", path + "/guess", guess)
+        assert result == {"correct": True, "level": 2, "score": 1, "finished": False}
+        _, _, second = await _request(reader, writer, "GET", path + "/sequence")
+        # Later levels extend the earlier sequence.
+        assert second["sequence"][:1] == first["sequence"]
+        guess = {"guess": second["sequence"]}
+        _, _, result = await _request(reader, writer, "POST", path + "/guess", guess)
+        assert result["finished"] and result["score"] == 2 and result["high_score"]
+
+        status, _, _ = await _request(reader, writer, "GET", path + "/sequence")
+        assert status == 404
+        _, _, board = await _request(reader, writer, "GET", "/api/leaderboard?limit=5")
+        assert board == {"leaderboard": [{"name": "ann", "high_score": 2}]}
+        writer.close()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(scenario())
+    assert app.scores.history == [2]
+    assert app.profiles.get_profile("ann").history == [2]
+
+
+def test_concurrent_games_are_independent(tmp_path: Path) -> None:
+    app = _make_app(tmp_path, levels=3)
+
+    async def scenario() -> None:
+        games = [app.start_game({"user": f"p{i}"}) for i in range(50)]
+        assert len({g["id"] for g in games}) == 50
+        wrong = await app.dispatch(
+            "POST", f"/api/games/{games[0]['id']}/guess", json.dumps({"guess": ["x"]}).encode()
+        )
+        assert wrong[0] == 200 and wrong[1]["finished"] and "expected" in wrong[1]
+        assert app.sessions.info()["live"] == 49
+
+    asyncio.run(scenario())
+
+
+def test_bad_requests_get_json_errors(tmp_path: Path) -> None:
+    app = _make_app(tmp_path)
+
+    async def scenario() -> None:
+        assert (await app.dispatch("GET", "/api/nope", b""))[0] == 404
+        assert (await app.dispatch("POST", "/api/games", b"not json"))[0] == 400
+        game = app.start_game({})
+        status, payload = await app.dispatch(
+            "POST", f"/api/games/{game['id']}/guess", b'{"guess": "1 2"}'
+        )
+        assert status == 400 and "error" in payload
+        for options in ({"step": 10**7}, {"levels": web.MAX_LEVELS + 1}, {"step": 10, "levels": 60},
+                        {"difficulty": "impossible"}):
+            status, payload = await app.dispatch("POST", "/api/games", json.dumps(options).encode())
+            assert status == 400 and "error" in payload
+        for limit in ("-1", "abc"):
+            assert (await app.dispatch("GET", f"/api/leaderboard?limit={limit}", b""))[0] == 400
+
+    asyncio.run(scenario())
+
+
+def test_leaderboard_limit_is_capped(tmp_path: Path, monkeypatch) -> None:
+    app = _make_app(tmp_path)
+    asked = []
+    monkeypatch.setattr(app.profiles, "top", lambda n: asked.append(n) or [])
+    status, _ = asyncio.run(app.dispatch("GET", "/api/leaderboard?limit=10000000", b""))
+    assert status == 200 and asked == [web.MAX_LEADERBOARD_LIMIT]
+
+
+def test_handler_bugs_get_a_json_500(tmp_path: Path, monkeypatch) -> None:
+    app = _make_app(tmp_path)
+
+    def broken(query: Any) -> None:
+        raise KeyError("oops")
+
+    monkeypatch.setattr(app, "leaderboard", broken)
+    status, payload = asyncio.run(app.dispatch("GET", "/api/leaderboard", b""))
+    assert status == 500 and payload == {"error": "internal server error"}
+
+
+def test_audio_is_streamed_cached_and_revalidated(tmp_path: Path) -> None:
+    pytest.importorskip("numpy")
+    import wave
+
+    app = _make_app(tmp_path, step=3)
+
+    async def scenario() -> None:
+        server = await app.serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        _, _, game = await _request(reader, writer, "POST", "/api/games", {})
+        audio = f"/api/games/{game['id']}/audio?tempo=0.1&rate=8000"
+
+        status, headers, clip = await _request(reader, writer, "GET", audio)
+        assert status == 200 and headers["content-type"] == "audio/wav"
+        (tmp_path / "clip.wav").write_bytes(clip)
+        with wave.open(str(tmp_path / "clip.wav"), "rb") as wav:
+            assert wav.getframerate() == 8000
+            assert wav.getnframes() == 3 * (3200 + 800)
+
+        status, again, cached = await _request(reader, writer, "GET", audio)
+        assert cached == clip and again["etag"] == headers["etag"]
+        status, _, body = await _request(
+            reader, writer, "GET", audio, headers={"If-None-Match": headers["etag"]}
+        )
+        assert status == 304 and body == b""
+        status, _, pcm = await _request(reader, writer, "GET", audio + "&format=pcm")
+        assert pcm == clip[44:]
+        writer.close()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(scenario())
+    info = app.clips.info()
+    assert info["hits"] == 1 and info["misses"] == 2 and info["entries"] == 2
+
+
+def test_notes_are_verified_as_they_are_typed(tmp_path: Path) -> None:
+    app = _make_app(tmp_path, levels=2, step=3)
+
+    async def post(game_id: str, notes: Any) -> Dict[str, Any]:
+        status, payload = await app.dispatch(
+            "POST", f"/api/games/{game_id}/notes", json.dumps({"notes": notes}).encode()
+        )
+        assert status == 200
+        return payload
+
+    async def scenario() -> None:
+        game = app.start_game({"user": "kim"})
+        _, first = await app.dispatch("GET", f"/api/games/{game['id']}/sequence", b"")
+        notes = first["sequence"]
+        assert await post(game["id"], notes[:1]) == {
+            "ok": True, "position": 1, "level": 1, "finished": False
+        }
+        done = await post(game["id"], notes[1:])
+        assert done["ok"] and done["correct"] and done["level"] == 2 and done["position"] == 3
+
+        _, second = await app.dispatch("GET", f"/api/games/{game['id']}/sequence", b"")
+        wrong = [second["sequence"][0], "x"]
+        result = await post(game["id"], wrong)
+        assert not result["ok"] and result["error_index"] == 1 and result["finished"]
+        assert result["expected"] == second["sequence"] and result["score"] == 1
+        status, _ = await app.dispatch("POST", f"/api/games/{game['id']}/notes", b'{"notes": [1]}')
+        assert status == 404
+
+    asyncio.run(scenario())
+    assert app.profiles.get_profile("kim").history == [1]